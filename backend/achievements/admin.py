@@ -1,25 +1,104 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from jobs.models import Job
+from content.staging import stage
+from jobs.queue import enqueue
 from .models import Certificate
 
 # import S3AdminUploadMixin from content admin to reuse upload behavior
 try:
-    from content.admin import S3AdminUploadMixin
+    from content.admin import S3AdminUploadMixin, image_preview
 except Exception:
     S3AdminUploadMixin = object
 
+    def image_preview(obj, field_name, style='object-fit:cover;'):
+        return '-'
+
+
+class CertificateImportForm(forms.Form):
+    zip_file = forms.FileField(label='ZIP', help_text='Images, and the CSV unless it is uploaded separately')
+    csv_file = forms.FileField(label='CSV', required=False,
+                               help_text='Columns: image, title, year, category, level, order (UTF-8)')
+    dry_run = forms.BooleanField(label='Only validate', required=False)
+
+    def clean_zip_file(self):
+        file = self.cleaned_data['zip_file']
+        if not file.name.lower().endswith('.zip'):
+            raise forms.ValidationError('Upload a .zip file')
+        return file
+
+
 @admin.register(Certificate)
 class CertificateAdmin(S3AdminUploadMixin, admin.ModelAdmin):
-    list_display = ['title', 'year', 'category', 'level', 'order', 'created_at']
+    list_display = ['title', 'image_tag', 'year', 'category', 'level', 'order', 'created_at']
     list_filter = ['category', 'level', 'year']
     search_fields = ['title', 'year']
     list_editable = ['order']
     ordering = ['order', '-created_at']
+    readonly_fields = ['image_tag']
 
     fieldsets = (
         ('Негізгі ақпарат', {
-            'fields': ('title', 'year', 'image')
+            'fields': ('title', 'year', 'image', 'image_tag')
         }),
         ('Жіктеу', {
             'fields': ('category', 'level', 'order')
         }),
-    )
\ No newline at end of file
+    )
+
+    def image_tag(self, obj):
+        return image_preview(obj, 'image')
+    image_tag.short_description = 'Алдын ала көрініс'
+
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='achievements_certificate_import'),
+        ] + super().get_urls()
+
+    def _run_import(self, request, data):
+        """Stage the files and run the import job; returns its report when it finished."""
+        payload = {
+            'zip': stage(data['zip_file'], '.zip')[0],
+            'csv': stage(data['csv_file'], '.csv')[0] if data['csv_file'] else None,
+            'dry_run': data['dry_run'],
+        }
+        # a failed import is reported, not retried: the editor fixes the CSV and uploads again
+        job = enqueue('certificates.import', payload, max_attempts=1)
+        if job.status == Job.SUCCEEDED:
+            report = job.result
+            verb = 'valid' if payload['dry_run'] else 'imported'
+            count = report['rows'] - len(report['errors']) if payload['dry_run'] else report['created']
+            level = messages.WARNING if report['errors'] else messages.SUCCESS
+            self.message_user(request, f'{count} of {report["rows"]} certificates {verb}', level=level)
+            return report
+        if job.status == Job.FAILED:
+            self.message_user(request, (job.last_error.strip().splitlines() or ['import failed'])[-1], level=messages.ERROR)
+        else:
+            link = reverse('admin:jobs_job_change', args=[job.pk])
+            self.message_user(request, format_html('Import queued as <a href="{}">job #{}</a>', link, job.pk))
+        return None
+
+    def import_view(self, request):
+        """Bulk import from a ZIP + CSV, run as a `certificates.import` job (inline in eager mode)."""
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = CertificateImportForm(request.POST or None, request.FILES or None)
+        report = None
+        if request.method == 'POST' and form.is_valid():
+            try:
+                report = self._run_import(request, form.cleaned_data)
+            except Exception as e:
+                self.message_user(request, f'Could not stage the upload: {e}', level=messages.ERROR)
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Import certificates',
+            'form': form,
+            'report': report,
+        }
+        return TemplateResponse(request, 'admin/achievements/certificate/import.html', context)
@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class AchievementsConfig(AppConfig):
     name = 'achievements'
+
+    def ready(self):
+        from content.cache import connect_invalidation
+        from content.images import connect_variants
+        connect_invalidation(self.get_models())
+        connect_variants(self.get_models())
@@ -0,0 +1,14 @@
+from django.urls import path, include
+from content.async_views import viewset_urls
+from .async_views import AsyncCertificateFacetsView
+from .urls import router
+
+# before the detail route, which would take `facets` for a pk
+urlpatterns = [
+    path('certificates/facets/', AsyncCertificateFacetsView.as_view(), name='certificate-facets'),
+]
+for prefix, viewset, basename in router.registry:
+    urlpatterns += viewset_urls(prefix, viewset, basename)
+
+# API root and format-suffix routes stay on the DRF views
+urlpatterns.append(path('', include('achievements.urls')))
@@ -0,0 +1,24 @@
+"""Async certificate views beyond list/detail (see content/async_views.py)."""
+from asgiref.sync import sync_to_async
+from django.views import View
+from rest_framework.request import Request
+
+from content.async_views import json_response, wants_json
+from content.cache import acached_response
+from .facets import acertificate_facets
+from .views import CertificateViewSet
+
+
+class AsyncCertificateFacetsView(View):
+    """Async CertificateViewSet.facets: same aggregate and cache entries."""
+    http_method_names = ['get', 'head', 'options']
+
+    async def get(self, request, *args, **kwargs):
+        if not wants_json(request):
+            view = CertificateViewSet.as_view({'get': 'facets'})
+            return await sync_to_async(view)(request, *args, **kwargs)
+        viewset = CertificateViewSet(action='facets', request=Request(request), args=args, kwargs=kwargs, format_kwarg=None)
+        return await acached_response(request, viewset.get_cache_models(), self._get, viewset)
+
+    async def _get(self, request, viewset):
+        return json_response(await acertificate_facets(viewset.filter_queryset(viewset.get_queryset())))
@@ -0,0 +1,46 @@
+"""Certificate counts per category, level and year for the achievements filters.
+
+All three facets come from one GROUP BY (category, level, year) query; the
+groups (categories x levels x years) are few, so they are folded in Python.
+"""
+from collections import Counter
+
+from django.db.models import Count
+
+from .models import Certificate
+
+FACET_FIELDS = ('category', 'level', 'year')
+
+
+def facet_rows(queryset):
+    # order_by() drops the default ordering, which would otherwise join the GROUP BY
+    return queryset.order_by().values_list(*FACET_FIELDS).annotate(count=Count('pk'))
+
+
+def build_facets(rows):
+    """{total, category, level, year} from (category, level, year, count) rows.
+
+    category and level list every choice (with zero counts), year the years present, newest first.
+    """
+    counts = {field: Counter() for field in FACET_FIELDS}
+    total = 0
+    for *values, count in rows:
+        total += count
+        for field, value in zip(FACET_FIELDS, values):
+            counts[field][value] += count
+    return {
+        'total': total,
+        'category': [{'value': code, 'label': label, 'count': counts['category'][code]}
+                     for code, label in Certificate.CATEGORY_CHOICES],
+        'level': [{'value': code, 'label': label, 'count': counts['level'][code]}
+                  for code, label in Certificate.LEVEL_CHOICES],
+        'year': [{'value': year, 'count': count} for year, count in sorted(counts['year'].items(), reverse=True)],
+    }
+
+
+def certificate_facets(queryset):
+    return build_facets(facet_rows(queryset))
+
+
+async def acertificate_facets(queryset):
+    return build_facets([row async for row in facet_rows(queryset)])
@@ -0,0 +1,180 @@
+"""Bulk import of certificates from a ZIP of images and a CSV.
+
+The CSV has a header row with the columns `image` (file name inside the ZIP),
+`title`, `year`, `category`, `level` and optional `order`; category and level
+take either the code (`students`) or the label (`Оқушылар`). The CSV can be
+passed separately or be the only .csv file inside the ZIP.
+
+Rows are validated first. Images of valid rows are then decoded, stored and
+turned into variants/metadata on a thread pool (Pillow and the storage
+backend release the GIL), and all certificates are inserted with one
+bulk_create in one transaction. Rows that fail are reported with their CSV
+line number and skipped; the others are imported.
+"""
+import csv
+import io
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from content.cache import bulk_saved, mark_changed
+from content.images import decode_image, generate_variants, image_metadata
+from .models import Certificate
+
+REQUIRED_COLUMNS = ('image', 'title', 'year', 'category', 'level')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tif', '.tiff')
+DEFAULT_WORKERS = 8
+
+
+class CertificateImportError(Exception):
+    """The ZIP or CSV as a whole cannot be read."""
+
+
+def _choice_lookup(choices):
+    lookup = {}
+    for code, label in choices:
+        lookup[code.lower()] = code
+        lookup[label.lower()] = code
+    return lookup
+
+
+CATEGORIES = _choice_lookup(Certificate.CATEGORY_CHOICES)
+LEVELS = _choice_lookup(Certificate.LEVEL_CHOICES)
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.created = []
+        self.errors = []
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': len(self.created),
+            'errors': [{'line': line, 'error': error} for line, error in self.errors],
+        }
+
+
+def read_csv(fileobj):
+    """[(line number, {column: value})] from a CSV file object (UTF-8, with or without BOM; , ; or tab)."""
+    try:
+        text = fileobj.read().decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise CertificateImportError('CSV must be UTF-8 encoded')
+    try:
+        dialect = csv.Sniffer().sniff(text[:4096], delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(io.StringIO(text, newline=''), dialect=dialect)
+    reader.fieldnames = [(name or '').strip().lower() for name in reader.fieldnames or ()]
+    missing = [c for c in REQUIRED_COLUMNS if c not in reader.fieldnames]
+    if missing:
+        raise CertificateImportError(f'CSV is missing columns: {", ".join(missing)}')
+    rows = []
+    for row in reader:
+        values = {key: (value or '').strip() for key, value in row.items() if key and isinstance(value, str)}
+        if any(values.values()):
+            rows.append((reader.line_num, values))
+    return rows
+
+
+def clean_row(row, members):
+    """Model field values of a CSV row; raises ValueError with a readable message."""
+    errors = []
+    title = row.get('title', '')
+    if not title:
+        errors.append('title is empty')
+    elif len(title) > Certificate._meta.get_field('title').max_length:
+        errors.append('title is too long')
+    year = row.get('year', '')
+    if not (len(year) == 4 and year.isdigit()):
+        errors.append(f'year must have 4 digits, got "{year}"')
+    category = CATEGORIES.get(row.get('category', '').lower())
+    if category is None:
+        errors.append(f'unknown category "{row.get("category", "")}"')
+    level = LEVELS.get(row.get('level', '').lower())
+    if level is None:
+        errors.append(f'unknown level "{row.get("level", "")}"')
+    try:
+        order = int(row.get('order') or 0)
+    except ValueError:
+        errors.append(f'order must be a number, got "{row.get("order")}"')
+        order = 0
+    image = row.get('image', '')
+    member = members.get(os.path.basename(image.replace('\\', '/')).lower())
+    if member is None:
+        errors.append(f'image "{image}" is not in the ZIP')
+    if errors:
+        raise ValueError('; '.join(errors))
+    return member, {'title': title, 'year': year, 'category': category, 'level': level, 'order': order}
+
+
+def process_image(zf, member, store=True):
+    """Decode, store and measure one image of the ZIP; returns the image field values."""
+    data = zf.read(member)
+    try:
+        img = decode_image(io.BytesIO(data))
+    except Exception as e:
+        raise ValueError(f'{os.path.basename(member)} is not a valid image ({e})')
+    if not store:
+        return {}
+    field = Certificate._meta.get_field('image')
+    name = field.storage.save(field.generate_filename(None, os.path.basename(member)), ContentFile(data))
+    values = {'image': name}
+    for key, value in image_metadata(img).items():
+        values[f'image_{key}'] = value
+    if getattr(settings, 'IMAGE_VARIANTS_ON_SAVE', True):
+        values['image_variants'] = generate_variants(name, field.storage, img=img)
+    return values
+
+
+def import_certificates(zip_file, csv_file=None, workers=DEFAULT_WORKERS, dry_run=False):
+    """Import certificates from a ZIP (file object or path); returns an ImportResult."""
+    result = ImportResult()
+    try:
+        zf = zipfile.ZipFile(zip_file)
+    except zipfile.BadZipFile:
+        raise CertificateImportError('Not a ZIP file')
+    with zf:
+        names = [info.filename for info in zf.infolist() if not info.is_dir() and not info.filename.startswith('__MACOSX/')]
+        members = {os.path.basename(n).lower(): n for n in names if n.lower().endswith(IMAGE_EXTENSIONS)}
+        if csv_file is None:
+            csv_members = [n for n in names if n.lower().endswith('.csv')]
+            if len(csv_members) != 1:
+                raise CertificateImportError('Pass a CSV file or put exactly one .csv file into the ZIP')
+            with zf.open(csv_members[0]) as fh:
+                rows = read_csv(fh)
+        else:
+            rows = read_csv(csv_file)
+        result.rows = len(rows)
+
+        valid = []
+        for line, row in rows:
+            try:
+                valid.append((line, *clean_row(row, members)))
+            except ValueError as e:
+                result.errors.append((line, str(e)))
+
+        with ThreadPoolExecutor(max(1, workers)) as pool:
+            futures = [(line, fields, pool.submit(process_image, zf, member, not dry_run)) for line, member, fields in valid]
+            certificates = []
+            for line, fields, future in futures:
+                try:
+                    certificates.append(Certificate(**fields, **future.result()))
+                except Exception as e:
+                    result.errors.append((line, str(e)))
+
+    result.errors.sort()
+    if dry_run or not certificates:
+        return result
+    with transaction.atomic():
+        result.created = Certificate.objects.bulk_create(certificates, batch_size=500)
+        # bulk_create sends no post_save, so invalidate the cached API payloads here
+        mark_changed(Certificate)
+        bulk_saved.send(sender=Certificate, objs=result.created)
+    return result
@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+
+from achievements.models import Certificate
+from content.benchmark import scratch_database, measure, format_summary
+
+
+class Command(BaseCommand):
+    help = 'Benchmark /api/achievements/certificates/ (full list vs cursor pages) on a throwaway database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='Number of certificates to generate')
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--pages', type=int, default=20, help='How many pages to walk with the cursor')
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            self._run(options)
+
+    def _fill(self, rows):
+        categories = [c for c, _ in Certificate.CATEGORY_CHOICES]
+        levels = [l for l, _ in Certificate.LEVEL_CHOICES]
+        batch = []
+        for i in range(rows):
+            batch.append(Certificate(
+                title=f'Certificate {i}', year=str(2000 + i % 25), image=f'certificates/{i}.jpg',
+                category=categories[i % len(categories)], level=levels[(i // 2) % len(levels)],
+                order=i % 100,
+            ))
+            if len(batch) >= 5000:
+                Certificate.objects.bulk_create(batch)
+                batch = []
+        Certificate.objects.bulk_create(batch)
+
+    def _run(self, options):
+        rows, page_size, repeat = options['rows'], options['page_size'], options['repeat']
+        self.stdout.write(f'Generating {rows} certificates...')
+        self._fill(rows)
+        client = Client()
+
+        def get(url):
+            cache.clear()
+            response = client.get(url)
+            assert response.status_code == 200, response.status_code
+            return response
+
+        base = '/api/achievements/certificates/?category=students&level=city'
+        self.stdout.write(format_summary('full list (no cursor)', measure(lambda: get(base), repeat)))
+        self.stdout.write(format_summary(f'first page (page_size={page_size})', measure(
+            lambda: get(f'{base}&page_size={page_size}'), repeat)))
+
+        def walk():
+            url = f'{base}&page_size={page_size}'
+            for _ in range(options['pages']):
+                url = get(url).json()['next']
+                if not url:
+                    break
+        samples = measure(walk, repeat)
+        self.stdout.write(format_summary(f'walk {options["pages"]} pages', samples))
+
+        with connection.cursor() as cursor:
+            sql, params = Certificate.objects.filter(category='students', level='city').order_by(
+                'order', '-created_at', 'id')[:page_size].query.sql_with_params()
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}' if connection.vendor == 'sqlite' else f'EXPLAIN {sql}', params)
+            self.stdout.write('Query plan:')
+            for row in cursor.fetchall():
+                self.stdout.write(f'  {row}')
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from achievements.importer import DEFAULT_WORKERS, CertificateImportError, import_certificates
+
+
+class Command(BaseCommand):
+    help = ('Import certificates from a ZIP of images and a CSV with the columns '
+            'image,title,year,category,level[,order]. Images are processed in parallel '
+            'and all rows are inserted in one transaction; invalid rows are reported and skipped.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('zip', help='ZIP file with the images (and the CSV, unless --csv is given)')
+        parser.add_argument('--csv', help='CSV file (default: the .csv file inside the ZIP)')
+        parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Images processed in parallel')
+        parser.add_argument('--dry-run', action='store_true', help='Validate rows and images without storing anything')
+
+    def handle(self, *args, **options):
+        csv_file = None
+        try:
+            if options['csv']:
+                csv_file = open(options['csv'], 'rb')
+            with open(options['zip'], 'rb') as zip_file:
+                result = import_certificates(zip_file, csv_file, workers=options['workers'], dry_run=options['dry_run'])
+        except (OSError, CertificateImportError) as e:
+            raise CommandError(str(e))
+        finally:
+            if csv_file:
+                csv_file.close()
+
+        for line, error in result.errors:
+            self.stderr.write(self.style.ERROR(f'Line {line}: {error}'))
+        valid = result.rows - len(result.errors)
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Dry run: {valid} of {result.rows} rows are valid.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Imported {len(result.created)} of {result.rows} certificates.'))
@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-18 08:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('achievements', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(fields=['category', 'level', 'order', '-created_at'], name='cert_cat_level_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(fields=['order', '-created_at', 'id'], name='cert_order_created_idx'),
+        ),
+    ]
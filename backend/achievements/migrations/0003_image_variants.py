@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 08:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('achievements', '0002_certificate_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Сурет нұсқалары'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-18 08:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('achievements', '0003_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='image_color',
+            field=models.CharField(blank=True, editable=False, max_length=7, verbose_name='Негізгі түсі'),
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Биіктігі'),
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False, verbose_name='Алдын ала көрініс (LQIP)'),
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ені'),
+        ),
+    ]
@@ -14,6 +14,11 @@ class Certificate(models.Model):
     title = models.CharField('Атауы', max_length=200)
     year = models.CharField('Жыл', max_length=4)
     image = models.ImageField('Сурет', upload_to='certificates/')
+    image_variants = models.JSONField('Сурет нұсқалары', default=dict, blank=True, editable=False)
+    image_width = models.PositiveIntegerField('Ені', null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField('Биіктігі', null=True, blank=True, editable=False)
+    image_color = models.CharField('Негізгі түсі', max_length=7, blank=True, editable=False)
+    image_placeholder = models.TextField('Алдын ала көрініс (LQIP)', blank=True, editable=False)
     category = models.CharField('Категория', max_length=20, choices=CATEGORY_CHOICES)
     level = models.CharField('Деңгей', max_length=20, choices=LEVEL_CHOICES)
     order = models.IntegerField('Реттілік', default=0)
@@ -24,6 +29,10 @@ class Certificate(models.Model):
         verbose_name = 'Сертификат'
         verbose_name_plural = 'Сертификаттар'
         ordering = ['order', '-created_at']
+        indexes = [
+            models.Index(fields=['category', 'level', 'order', '-created_at'], name='cert_cat_level_order_idx'),
+            models.Index(fields=['order', '-created_at', 'id'], name='cert_order_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.year})"
\ No newline at end of file
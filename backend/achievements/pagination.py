@@ -0,0 +1,108 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# Certificate.Meta.ordering plus the primary key as a unique tie-breaker
+ORDERING = ('order', '-created_at', 'id')
+
+
+class CertificateCursorPagination(BasePagination):
+    """Keyset pagination over (order, -created_at, id).
+
+    Only applied when the client sends `cursor` or `page_size`; without them the
+    endpoint keeps returning the plain full list.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 500
+    invalid_cursor_message = 'Invalid cursor'
+
+    def is_paginated(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request)
+        if queryset is None:
+            return None
+        return self.set_page([obj async for obj in queryset])
+
+    def page_queryset(self, queryset, request):
+        """The unevaluated slice holding the requested page plus one look-ahead row."""
+        if not self.is_paginated(request):
+            return None
+        params = request.query_params
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(params.get(self.cursor_query_param))
+        if position is not None:
+            order, created_at, pk = position
+            queryset = queryset.filter(
+                Q(order__gt=order)
+                | Q(order=order, created_at__lt=created_at)
+                | Q(order=order, created_at=created_at, id__gt=pk)
+            )
+        return queryset.order_by(*ORDERING)[:self.page_size + 1]
+
+    def set_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.last = rows[-1] if rows else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def encode_cursor(self, obj):
+        raw = f'{obj.order}|{obj.created_at.isoformat()}|{obj.pk}'
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, value):
+        if not value:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(value.encode('ascii')).decode('utf-8')
+            order, created_at, pk = raw.split('|')
+            return int(order), datetime.fromisoformat(created_at), int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
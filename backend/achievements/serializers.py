@@ -1,39 +1,18 @@
 from rest_framework import serializers
-from django.conf import settings
+from content.image_urls import image_url, image_srcset
 from .models import Certificate
 
 
-def _build_image_url(obj, field_name):
-    try:
-        field = getattr(obj, field_name)
-    except Exception:
-        return ''
-    if not field:
-        return ''
-    try:
-        url = field.url
-        if url:
-            return url
-    except Exception:
-        pass
-    name = getattr(field, 'name', None) or str(field)
-    if not name:
-        return ''
-    custom = getattr(settings, 'AWS_S3_CUSTOM_DOMAIN', None)
-    if custom:
-        return f'https://{custom.rstrip("/")}/{name.lstrip("/")}'
-    media = getattr(settings, 'MEDIA_URL', None) or '/media/'
-    if media.startswith('http'):
-        return f"{media.rstrip('/')}/{name.lstrip('/')}"
-    return f"{media.rstrip('/')}/{name.lstrip('/')}"
-
-
 class CertificateSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
 
     def get_image(self, obj):
-        return _build_image_url(obj, 'image')
+        return image_url(obj, 'image', self.context.get('request'))
+
+    def get_image_srcset(self, obj):
+        return image_srcset(obj, 'image', self.context.get('request'))
 
     class Meta:
         model = Certificate
-        fields = ['id', 'title', 'year', 'image', 'category', 'level', 'order']
\ No newline at end of file
+        fields = ['id', 'title', 'year', 'image', 'image_srcset', 'image_width', 'image_height', 'image_color', 'image_placeholder', 'category', 'level', 'order']
\ No newline at end of file
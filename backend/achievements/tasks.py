@@ -0,0 +1,21 @@
+"""Background job handlers of the achievements app (see jobs/queue.py)."""
+from contextlib import ExitStack
+
+from content.staging import discard, open_staged
+from jobs.queue import register
+from .importer import import_certificates
+
+
+@register('certificates.import')
+def import_certificates_job(payload):
+    """Run a bulk import staged by CertificateAdmin and remove the staged files."""
+    refs = [ref for ref in (payload['zip'], payload.get('csv')) if ref]
+    try:
+        with ExitStack() as stack:
+            zip_file = stack.enter_context(open_staged(payload['zip']))
+            csv_file = stack.enter_context(open_staged(payload['csv'])) if payload.get('csv') else None
+            result = import_certificates(zip_file, csv_file, dry_run=payload.get('dry_run', False))
+    finally:
+        for ref in refs:
+            discard(ref)
+    return result.as_dict()
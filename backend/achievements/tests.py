@@ -1,3 +1,288 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+import zipfile
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from .importer import import_certificates
+from .models import Certificate
+
+
+class CertificateAPITest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Certificate.objects.create(title='A', year='2024', image='certificates/a.jpg', category='teachers', level='city')
+        Certificate.objects.create(title='B', year='2024', image='certificates/b.jpg', category='students', level='district')
+
+    def test_filter_by_category(self):
+        response = self.client.get('/api/achievements/certificates/?category=teachers')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c['title'] for c in response.json()], ['A'])
+
+    def test_cached_list_invalidated_on_delete(self):
+        self.assertEqual(len(self.client.get('/api/achievements/certificates/').json()), 2)
+        Certificate.objects.filter(title='A').get().delete()
+        self.assertEqual(len(self.client.get('/api/achievements/certificates/').json()), 1)
+
+
+class CertificateQueryBudgetTest(APITestCase):
+    def test_query_budget(self):
+        created = 0
+        for size in (1, 100, 10000):
+            Certificate.objects.bulk_create(
+                Certificate(title=f'C{i}', year='2024', image='certificates/c.jpg', category='students', level='city')
+                for i in range(created, size)
+            )
+            created = size
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get('/api/achievements/certificates/?category=students')
+            self.assertEqual(response.status_code, 200)
+            # list query + ContentRevision lookup on a cache miss
+            self.assertLessEqual(len(ctx.captured_queries), 2)
+
+
+class CertificatePaginationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Certificate.objects.bulk_create(
+            Certificate(title=f'C{i}', year='2024', image='certificates/c.jpg', category='students', level='city', order=i % 2)
+            for i in range(7)
+        )
+
+    def test_without_cursor_returns_full_list(self):
+        data = self.client.get('/api/achievements/certificates/').json()
+        self.assertIsInstance(data, list)
+        self.assertEqual(len(data), 7)
+
+    def test_cursor_walk_matches_full_list(self):
+        expected = [c['id'] for c in self.client.get('/api/achievements/certificates/').json()]
+        seen = []
+        url = '/api/achievements/certificates/?page_size=3'
+        while url:
+            data = self.client.get(url).json()
+            self.assertLessEqual(len(data['results']), 3)
+            seen.extend(c['id'] for c in data['results'])
+            url = data['next']
+        self.assertEqual(seen, expected)
+
+    @override_settings(ALLOWED_HOSTS=['a.example.com', 'b.example.com'], MEDIA_URL='https://cdn.example.com/')
+    def test_next_link_uses_own_host_when_cached(self):
+        url = '/api/achievements/certificates/?page_size=3'
+        first = self.client.get(url, HTTP_HOST='a.example.com').json()['next']
+        second = self.client.get(url, HTTP_HOST='b.example.com').json()['next']
+        self.assertTrue(first.startswith('http://a.example.com/'))
+        self.assertTrue(second.startswith('http://b.example.com/'))
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/achievements/certificates/?cursor=bogus')
+        self.assertEqual(response.status_code, 404)
+
+    def test_fast_read_matches_serializer(self):
+        url = '/api/achievements/certificates/?category=students'
+        with override_settings(API_FAST_READ=False):
+            expected = self.client.get(url).content
+        cache.clear()
+        with override_settings(API_FAST_READ=True):
+            self.assertEqual(self.client.get(url).content, expected)
+            # paginated requests still go through the serializer
+            self.assertEqual(len(self.client.get(f'{url}&page_size=3').json()['results']), 3)
+
+    async def test_async_view_matches_sync(self):
+        from asgiref.sync import sync_to_async
+        for path in ('certificates/?category=students', 'certificates/?page_size=3', 'certificates/?cursor=bogus'):
+            sync = await sync_to_async(self.client.get)(f'/api/achievements/{path}')
+            with override_settings(ROOT_URLCONF='achievements.async_urls'):
+                response = await self.async_client.get(f'/{path}')
+            self.assertEqual(response.status_code, sync.status_code, path)
+            # next links differ only by the mount point
+            self.assertEqual(response.content, sync.content.replace(b'/api/achievements', b''), path)
+
+
+class CertificateAdminPreviewTest(APITestCase):
+    def test_changelist_uses_thumbnails(self):
+        from django.contrib.auth.models import User
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        Certificate.objects.bulk_create([
+            Certificate(title='Thumb', year='2024', image='certificates/a.jpg', category='students', level='city',
+                        image_variants={'source': 'certificates/a.jpg', 'thumb': 'certificates/variants/a-thumb.webp',
+                                        'webp': {'320': 'certificates/variants/a-320w.webp'}}),
+            Certificate(title='Variants only', year='2024', image='certificates/b.jpg', category='students', level='city',
+                        image_variants={'source': 'certificates/b.jpg',
+                                        'webp': {'640': 'certificates/variants/b-640w.webp',
+                                                 '320': 'certificates/variants/b-320w.webp'}}),
+            Certificate(title='Pending', year='2024', image='certificates/c.jpg', category='students', level='city',
+                        image_placeholder='data:image/webp;base64,AAAA'),
+        ])
+        html = self.client.get('/admin/achievements/certificate/').content.decode()
+        self.assertIn('src="/media/certificates/variants/a-thumb.webp"', html)
+        self.assertIn('src="/media/certificates/variants/b-320w.webp"', html)
+        self.assertIn('src="data:image/webp;base64,AAAA"', html)
+        for original in ('a.jpg', 'b.jpg', 'c.jpg'):
+            self.assertNotIn(f'src="/media/certificates/{original}"', html)
+
+
+def _jpeg(color='red'):
+    from PIL import Image
+    buf = io.BytesIO()
+    Image.new('RGB', (64, 48), color).save(buf, 'JPEG')
+    return buf.getvalue()
+
+
+def _zip(files):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w') as zf:
+        for name, data in files.items():
+            zf.writestr(name, data)
+    buf.seek(0)
+    return buf
+
+
+IMPORT_CSV = (
+    'image;title;year;category;level;order\n'
+    'a.jpg;First;2024;students;city;1\n'
+    'imgs/B.JPG;Second;2023;Мұғалімдер;Аудан деңгейі;\n'
+    'missing.jpg;Third;2024;students;city;\n'
+    'a.jpg;;24;pupils;city;\n'
+    'broken.jpg;Broken;2024;students;city;\n'
+)
+
+
+class CertificateImportTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root, JOBS_STAGING_DIR=os.path.join(self.media_root, 'staging'))
+        override.enable()
+        self.addCleanup(override.disable)
+        self.files = {
+            'a.jpg': _jpeg('red'),
+            'imgs/B.JPG': _jpeg('blue'),
+            'broken.jpg': b'not an image',
+            'certificates.csv': IMPORT_CSV.encode('utf-8-sig'),
+        }
+
+    def test_import_reports_row_errors(self):
+        with CaptureQueriesContext(connection) as ctx:
+            result = import_certificates(_zip(self.files), workers=2)
+        self.assertEqual(result.rows, 5)
+        # both valid rows in a single INSERT
+        self.assertEqual(len([q for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "achievements_certificate"')]), 1)
+        first, second = Certificate.objects.order_by('title')
+        self.assertEqual((first.title, first.category, first.level, first.order), ('First', 'students', 'city', 1))
+        self.assertEqual((second.year, second.category, second.level), ('2023', 'teachers', 'district'))
+        self.assertEqual(first.image_width, 64)
+        self.assertIn('thumb', first.image_variants)
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, first.image.name)))
+        errors = dict(result.errors)
+        self.assertEqual(sorted(errors), [4, 5, 6])
+        self.assertIn('not in the ZIP', errors[4])
+        self.assertIn('title is empty', errors[5])
+        self.assertIn('year must have 4 digits', errors[5])
+        self.assertIn('unknown category', errors[5])
+        self.assertIn('not a valid image', errors[6])
+
+    def test_import_invalidates_cached_list(self):
+        self.assertEqual(self.client.get('/api/achievements/certificates/').json(), [])
+        import_certificates(_zip(self.files))
+        self.assertEqual(len(self.client.get('/api/achievements/certificates/').json()), 2)
+
+    def test_dry_run_stores_nothing(self):
+        result = import_certificates(_zip(self.files), dry_run=True)
+        self.assertEqual(len(result.errors), 3)
+        self.assertFalse(Certificate.objects.exists())
+        self.assertEqual(os.listdir(self.media_root), [])
+
+    def test_command_with_separate_csv(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        zip_path, csv_path = os.path.join(tmp, 'images.zip'), os.path.join(tmp, 'list.csv')
+        with open(zip_path, 'wb') as fh:
+            fh.write(_zip({'a.jpg': self.files['a.jpg']}).getvalue())
+        with open(csv_path, 'w', encoding='utf-8') as fh:
+            fh.write('image,title,year,category,level\na.jpg,Only,2025,teachers,city\n')
+        out = io.StringIO()
+        call_command('import_certificates', zip_path, csv=csv_path, stdout=out)
+        self.assertIn('Imported 1 of 1', out.getvalue())
+        self.assertEqual(Certificate.objects.get().title, 'Only')
+        with self.assertRaisesMessage(CommandError, 'exactly one .csv'):
+            call_command('import_certificates', zip_path)
+
+    def test_admin_import_view(self):
+        from django.contrib.auth.models import User
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        self.assertIn('/admin/achievements/certificate/import/', self.client.get('/admin/achievements/certificate/').content.decode())
+        response = self.client.post('/admin/achievements/certificate/import/', {
+            'zip_file': SimpleUploadedFile('upload.zip', _zip(self.files).getvalue()),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Certificate.objects.count(), 2)
+        html = response.content.decode()
+        self.assertIn('2 of 5 certificates imported', html)
+        self.assertIn('not in the ZIP', html)
+        # staged uploads are removed by the job
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'staging')), [])
+
+
+class CertificateFacetsTest(APITestCase):
+    url = '/api/achievements/certificates/facets/'
+
+    def setUp(self):
+        cache.clear()
+        Certificate.objects.bulk_create(
+            Certificate(title=f'C{i}', year=year, image='certificates/c.jpg', category=category, level=level)
+            for i, (year, category, level) in enumerate([
+                ('2024', 'students', 'city'), ('2024', 'students', 'district'), ('2023', 'students', 'city'),
+                ('2023', 'teachers', 'city'), ('2025', 'teachers', 'city'),
+            ])
+        )
+
+    def counts(self, data, facet):
+        return {item['value']: item['count'] for item in data[facet]}
+
+    def test_counts_in_one_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get(self.url).json()
+        # the aggregate + ContentRevision lookup on a cache miss
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertEqual(data['total'], 5)
+        self.assertEqual(self.counts(data, 'category'), {'teachers': 2, 'students': 3})
+        self.assertEqual(self.counts(data, 'level'), {'district': 1, 'city': 4})
+        self.assertEqual([item['value'] for item in data['year']], ['2025', '2024', '2023'])
+        self.assertEqual(self.counts(data, 'year'), {'2025': 1, '2024': 2, '2023': 2})
+        self.assertEqual(data['category'][1]['label'], 'Оқушылар')
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(self.url).json(), data)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_respects_filters(self):
+        data = self.client.get(f'{self.url}?category=students&level=city').json()
+        self.assertEqual(data['total'], 2)
+        self.assertEqual(self.counts(data, 'category'), {'teachers': 0, 'students': 2})
+        self.assertEqual(self.counts(data, 'year'), {'2024': 1, '2023': 1})
+
+    def test_invalidated_on_save_and_delete(self):
+        self.assertEqual(self.client.get(self.url).json()['total'], 5)
+        certificate = Certificate.objects.create(title='New', year='2026', image='certificates/n.jpg', category='teachers', level='district')
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['total'], 6)
+        self.assertEqual(data['year'][0], {'value': '2026', 'count': 1})
+        certificate.delete()
+        self.assertEqual(self.client.get(self.url).json()['total'], 5)
+
+    async def test_async_view_matches_sync(self):
+        from asgiref.sync import sync_to_async
+        for query in ('', '?category=teachers', '?level=district'):
+            sync = await sync_to_async(self.client.get)(f'{self.url}{query}')
+            with override_settings(ROOT_URLCONF='achievements.async_urls'):
+                response = await self.async_client.get(f'/certificates/facets/{query}')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), sync.json(), query)
@@ -1,15 +1,22 @@
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from .facets import certificate_facets
 from .models import Certificate
+from .pagination import CertificateCursorPagination, ORDERING
 from .serializers import CertificateSerializer
+from content.cache import CachedResponseMixin, cached_response
+from content.fastpath import FastReadMixin
 
-class CertificateViewSet(viewsets.ReadOnlyModelViewSet):
+class CertificateViewSet(CachedResponseMixin, FastReadMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Certificate.objects.all()
     serializer_class = CertificateSerializer
     permission_classes = [AllowAny]
+    pagination_class = CertificateCursorPagination
 
     def get_queryset(self):
-        queryset = Certificate.objects.all()
+        queryset = Certificate.objects.order_by(*ORDERING)
         category = self.request.query_params.get('category', None)
         level = self.request.query_params.get('level', None)
 
@@ -18,4 +25,12 @@ class CertificateViewSet(viewsets.ReadOnlyModelViewSet):
         if level:
             queryset = queryset.filter(level=level)
 
-        return queryset
\ No newline at end of file
+        return queryset
+
+    @action(detail=False)
+    def facets(self, request):
+        """Counts per category, level and year of the certificates matching ?category= and ?level=."""
+        return cached_response(request, self.get_cache_models(), self._facets)
+
+    def _facets(self, request):
+        return Response(certificate_facets(self.filter_queryset(self.get_queryset())))
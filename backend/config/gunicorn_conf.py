@@ -0,0 +1,122 @@
+"""Gunicorn settings: `gunicorn -c python:config.gunicorn_conf`.
+
+* SERVER_MODE=asgi serves config.asgi with uvicorn workers, otherwise
+  config.wsgi with threaded sync workers.
+* The app is preloaded in the master. Before forking, the master primes the API
+  caches (content/warmup.py) and freezes the GC, so workers share the imported
+  modules and primed caches copy-on-write and start warm.
+* Worker count comes from the CPUs and memory available to the container
+  unless WEB_CONCURRENCY is set.
+
+Command line options (e.g. --workers, --bind) still override these values.
+"""
+import gc
+import math
+import os
+
+MEMORY_LIMIT_FILES = ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes')
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def cpu_count():
+    """CPUs this process may use, honouring affinity and a cgroup v2 CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as fh:
+            quota, period = fh.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def memory_limit():
+    """Bytes of memory available to the container (cgroup limit, else physical memory)."""
+    for path in MEMORY_LIMIT_FILES:
+        try:
+            with open(path) as fh:
+                value = fh.read().strip()
+        except OSError:
+            continue
+        # 'max' (v2) or a huge number (v1) means unlimited
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value)
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def default_workers(cpus, memory, worker_memory_mb):
+    workers = 2 * cpus + 1
+    if memory:
+        # leave a fifth of the memory to the master, the job worker and the page cache
+        workers = min(workers, int(memory * 0.8 // (worker_memory_mb * 1024 * 1024)))
+    return max(1, workers)
+
+
+def worker_rss_mb():
+    try:
+        with open('/proc/self/status') as fh:
+            for line in fh:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
+ASGI = SERVER_MODE == 'asgi'
+
+wsgi_app = 'config.asgi:application' if ASGI else 'config.wsgi:application'
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = _env_int('WEB_CONCURRENCY', default_workers(
+    cpu_count(), memory_limit(), _env_int('GUNICORN_WORKER_MEMORY_MB', 160)))
+# threads cover requests waiting on the database or S3; uvicorn workers are async instead
+threads = 1 if ASGI else _env_int('GUNICORN_THREADS', 4)
+worker_class = 'uvicorn.workers.UvicornWorker' if ASGI else ('gthread' if threads > 1 else 'sync')
+preload_app = True
+timeout = _env_int('GUNICORN_TIMEOUT', 60)
+graceful_timeout = 30
+keepalive = 5
+# recycle workers now and then so slow leaks cannot grow without bound
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = max_requests // 10
+accesslog = '-' if os.environ.get('GUNICORN_ACCESS_LOG') == 'True' else None
+
+WARM_UP = os.environ.get('GUNICORN_WARM_UP', 'True') == 'True'
+
+
+def _warm_up(log):
+    from content.warmup import warm_up
+    timings = warm_up()
+    log.info('Warmed up %d endpoints in %.0f ms', len(timings), sum(timings.values()) * 1000)
+
+
+def when_ready(server):
+    # runs in the master after the app was preloaded and before any worker is forked
+    if not server.cfg.preload_app:
+        return
+    if WARM_UP:
+        _warm_up(server.log)
+    # move everything allocated so far out of the collector's reach: collections in
+    # workers then never write to (and un-share) these pages
+    gc.collect()
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    if WARM_UP and not worker.cfg.preload_app:
+        _warm_up(worker.log)
+    rss = worker_rss_mb()
+    if rss is not None:
+        worker.log.info('Worker %s ready, RSS %.1f MiB', worker.pid, rss)
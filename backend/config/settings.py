@@ -53,12 +53,14 @@ INSTALLED_APPS = [
     # Local apps
     'achievements',
     'content',
+    'jobs',
+    'search',
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'config.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -99,6 +101,28 @@ DATABASES = {
 if os.environ.get('DATABASE_URL'):
     DATABASES['default'] = dj_database_url.parse(os.environ.get('DATABASE_URL'), conn_max_age=600)
 
+# Cache (rendered API payloads, see content/cache.py).
+# Local memory by default; set REDIS_URL to share the cache between gunicorn workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'school-cache',
+    }
+}
+if os.environ.get('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL'),
+    }
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = int(os.environ.get('API_CACHE_TIMEOUT', 60 * 60 * 24))
+# Local-memory cache only: seconds a worker trusts its copy of the model revisions
+# (how long it may serve a payload another process has already invalidated)
+API_CACHE_GENERATION_TTL = int(os.environ.get('API_CACHE_GENERATION_TTL', 5))
+# Cached payloads at least this large also keep gzip/brotli encodings
+API_CACHE_COMPRESS_MIN_SIZE = int(os.environ.get('API_CACHE_COMPRESS_MIN_SIZE', 512))
+API_CACHE_BROTLI_QUALITY = int(os.environ.get('API_CACHE_BROTLI_QUALITY', 9))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -128,6 +152,40 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Optional canonical public base for media URLs in API responses (e.g. CDN domain).
+# When unset the S3 custom domain or MEDIA_URL is used (see content/image_urls.py).
+MEDIA_PUBLIC_BASE_URL = os.environ.get('MEDIA_PUBLIC_BASE_URL') or None
+IMAGE_URL_CACHE_SIZE = int(os.environ.get('IMAGE_URL_CACHE_SIZE', 4096))
+# Name media files by a hash of their content (see content/storage.py): identical uploads are
+# stored once and S3 objects get `Cache-Control: public, max-age=31536000, immutable`.
+MEDIA_CONTENT_ADDRESSED = os.environ.get('MEDIA_CONTENT_ADDRESSED', 'False') == 'True'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'content.storage.ContentAddressedFileSystemStorage' if MEDIA_CONTENT_ADDRESSED
+        else 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Responsive image variants generated on save (see content/images.py)
+IMAGE_VARIANT_WIDTHS = [int(w) for w in env_list('IMAGE_VARIANT_WIDTHS', '320,640,960,1280,1920')]
+IMAGE_VARIANT_FORMATS = env_list('IMAGE_VARIANT_FORMATS', 'webp,jpeg')
+# Bounding box (px) of the small WebP thumbnail shown in the admin changelists
+IMAGE_THUMBNAIL_SIZE = int(os.environ.get('IMAGE_THUMBNAIL_SIZE', 160))
+
+# Background jobs (see jobs/queue.py). Run the worker with `python manage.py run_jobs`.
+# In eager mode jobs run inline in the request, which is convenient for development.
+JOBS_EAGER = os.environ.get('JOBS_EAGER', str(DEBUG)) == 'True'
+JOBS_PROCESSES = int(os.environ.get('JOBS_PROCESSES', 2))
+JOBS_MAX_ATTEMPTS = int(os.environ.get('JOBS_MAX_ATTEMPTS', 3))
+JOBS_RETRY_BASE_DELAY = int(os.environ.get('JOBS_RETRY_BASE_DELAY', 5))
+# Uploads handed to jobs (content/staging.py). They are staged in JOBS_STAGING_DIR only when the
+# jobs can read it: in eager mode, or with JOBS_STAGING_SHARED=True (shared volume / worker in the
+# web container). Otherwise they go to the S3 bucket under JOBS_STAGING_PREFIX.
+JOBS_STAGING_DIR = os.environ.get('JOBS_STAGING_DIR', os.path.join(BASE_DIR, 'job_staging'))
+JOBS_STAGING_SHARED = os.environ.get('JOBS_STAGING_SHARED', 'False') == 'True'
+JOBS_STAGING_PREFIX = os.environ.get('JOBS_STAGING_PREFIX', '_staging/')
 
 # If AWS S3 bucket is configured, use django-storages for media in production
 if os.environ.get('AWS_STORAGE_BUCKET_NAME'):
@@ -150,12 +208,16 @@ if os.environ.get('AWS_STORAGE_BUCKET_NAME'):
         'CacheControl': 'max-age=86400',
     }
 
-    DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
+    # Django reads the media backend from STORAGES only (DEFAULT_FILE_STORAGE was removed in 5.1)
+    STORAGES['default'] = {
+        'BACKEND': 'content.s3_storage.ContentAddressedS3Storage' if MEDIA_CONTENT_ADDRESSED
+        else 'content.s3_storage.SharedClientS3Storage',
+    }
     MEDIA_URL = f'https://{AWS_S3_CUSTOM_DOMAIN}/'
 
 # Use WhiteNoise storage in production
 if not DEBUG:
-    STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+    STORAGES['staticfiles'] = {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'}
 
 # Security settings for production
 if not DEBUG:
@@ -183,7 +245,19 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'content.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
+# orjson for API responses when installed (same output as the stdlib encoder)
+API_FAST_JSON = os.environ.get('API_FAST_JSON', 'True') == 'True'
+# Build flat list responses from .values() rows instead of ModelSerializer (same output shape)
+API_FAST_READ = os.environ.get('API_FAST_READ', 'False') == 'True'
+# Async views for the public read-only endpoints; config/asgi.py enables this by default
+API_ASYNC_VIEWS = os.environ.get('API_ASYNC_VIEWS', 'False') == 'True'
+# Host used for the cache warm-up requests made at server start (default: first ALLOWED_HOSTS entry)
+API_WARMUP_HOST = os.environ.get('API_WARMUP_HOST', '')
 
 # Лёгкое логирование удалено — больше не печатаем настройки в логах
 
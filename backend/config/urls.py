@@ -6,10 +6,15 @@ from django.http import JsonResponse, HttpResponseBadRequest, HttpResponse
 import os
 import subprocess
 
+# ASGI deployments serve the public read-only endpoints with async views
+api_urls = 'async_urls' if settings.API_ASYNC_VIEWS else 'urls'
+
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/achievements/', include('achievements.urls')),
-    path('api/content/', include('content.urls')),
+    path('api/achievements/', include(f'achievements.{api_urls}')),
+    path('api/content/', include(f'content.{api_urls}')),
+    path('api/jobs/', include('jobs.urls')),
+    path('api/search/', include('search.urls')),
 ]
 
 
@@ -57,15 +62,10 @@ def _internal_upload_media(request):
     if not token_expected or token_given != token_expected:
         return HttpResponseBadRequest('invalid token')
 
-    # Run the management command upload_media_to_s3
-    try:
-        # Use subprocess to call manage.py so that Django env is same
-        base_dir = settings.BASE_DIR
-        manage_py = os.path.join(base_dir, 'manage.py')
-        subprocess.check_output(['python', manage_py, 'upload_media_to_s3'], stderr=subprocess.STDOUT)
-        return JsonResponse({'status': 'uploaded'})
-    except subprocess.CalledProcessError as e:
-        return HttpResponseBadRequest(str(e.output))
+    # Queue the management command upload_media_to_s3 for the job worker instead of blocking this worker
+    from jobs.queue import enqueue
+    job = enqueue('media.upload_media_to_s3')
+    return JsonResponse({'status': job.status, 'job': job.pk}, status=202)
 
 
 def _internal_test_media(request):
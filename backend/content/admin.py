@@ -3,52 +3,80 @@ from django.utils.html import format_html
 from django.db import models
 from django.forms import Textarea
 from django import forms
-from django.conf import settings
 import os
 import uuid
 import mimetypes
-import boto3
-from botocore.exceptions import ClientError
+from jobs.models import Job
+from jobs.queue import enqueue
+from .image_urls import image_url, thumbnail_url
+from .s3 import get_bucket, get_s3_client, object_exists, s3_configured
+from .staging import stage
+from .storage import IMMUTABLE_CACHE_CONTROL, content_addressed, content_hash, hashed_name
 from .models import (
     NavLink, Header, HeroSlide, About, Stat, Director, ContactInfo, Footer, Page, ImageBlock
 )
 
 
+def image_preview(obj, field_name, style='object-fit:cover;'):
+    """<img> of the image's small thumbnail variant for changelists and forms.
+
+    Never the original file: until the variants exist the LQIP placeholder (or a
+    link to the original) is shown instead, so a changelist stays a few KB per row.
+    """
+    file = getattr(obj, field_name, None)
+    if not file:
+        return '-'
+    src = thumbnail_url(getattr(obj, f'{field_name}_variants', None)) or getattr(obj, f'{field_name}_placeholder', '')
+    if not src:
+        return format_html('<a href="{}" target="_blank">{}</a>', image_url(obj, field_name), os.path.basename(file.name))
+    return format_html('<img src="{}" loading="lazy" style="height:80px; {}" />', src, style)
+
+
 class S3AdminUploadMixin:
     """Mixin for ModelAdmin to upload image fields directly to S3 when files are provided via the admin.
-    It checks for AWS env vars and uses boto3 to put_object into the configured bucket.
+    It checks for AWS env vars and queues a background job that puts the object into the configured bucket.
     Works for model image fields and inline formsets.
     """
 
     def _get_s3_client(self):
-        aws_key = os.environ.get('AWS_ACCESS_KEY_ID')
-        aws_secret = os.environ.get('AWS_SECRET_ACCESS_KEY')
-        region = os.environ.get('AWS_S3_REGION_NAME') or os.environ.get('AWS_REGION')
-        if not aws_key or not aws_secret or not os.environ.get('AWS_STORAGE_BUCKET_NAME'):
-            return None
-        session = boto3.session.Session(aws_access_key_id=aws_key, aws_secret_access_key=aws_secret, region_name=region)
-        return session.client('s3')
-
-    def _upload_file_to_s3(self, uploaded_file, key):
-        """Upload a file-like object to S3 under given key. Returns True on success."""
-        s3 = self._get_s3_client()
-        bucket = os.environ.get('AWS_STORAGE_BUCKET_NAME')
-        if not s3 or not bucket:
-            return False, 'S3 client or bucket not configured'
-        # seek to start if possible
-        try:
-            uploaded_file.seek(0)
-        except Exception:
-            pass
-        content_type = getattr(uploaded_file, 'content_type', mimetypes.guess_type(key)[0] or 'application/octet-stream')
+        return get_s3_client()
+
+    def _upload_file_to_s3(self, uploaded_file, obj, field):
+        """Queue upload of an uploaded file for obj.field to S3. Returns (key, error).
+
+        The file is staged (see content/staging.py) and moved to its key by the
+        `media.upload_to_s3` job, so the admin request does not wait on the final
+        upload (in eager mode the job runs inline).
+        """
+        if not s3_configured():
+            return None, 'S3 client or bucket not configured'
+        content_type = (getattr(uploaded_file, 'content_type', None) or mimetypes.guess_type(uploaded_file.name)[0]
+                        or 'application/octet-stream')
+        # the key names the content: an existing object is reused, and it never changes
+        cache_control = IMMUTABLE_CACHE_CONTROL if content_addressed() else None
+        digest = None
         try:
-            s3.put_object(Bucket=bucket, Key=key, Body=uploaded_file.read(), ContentType=content_type)
-            return True, None
-        except ClientError as e:
-            return False, str(e)
+            if cache_control:
+                # hashed before staging, so a duplicate is never transferred at all
+                digest = content_hash(uploaded_file.chunks())
+                key = self._compute_field_key(obj, field, uploaded_file.name, digest)
+                if object_exists(self._get_s3_client(), get_bucket(), key):
+                    return key, None
+            ref, digest = stage(uploaded_file, content_type=content_type,
+                                extra_args={'CacheControl': cache_control} if cache_control else None, digest=digest)
+        except Exception as e:
+            return None, str(e)
+        key = self._compute_field_key(obj, field, uploaded_file.name, digest)
+        payload = {'staged': ref, 'key': key, 'content_type': content_type}
+        if cache_control:
+            payload.update(skip_existing=True, cache_control=cache_control)
+        job = enqueue('media.upload_to_s3', payload, idempotency_key=f'upload:{key}:{os.path.basename(ref)}')
+        if job.status == Job.FAILED:
+            return None, (job.last_error.strip().splitlines() or ['upload failed'])[-1]
+        return key, None
 
-    def _compute_field_key(self, obj, field, original_name):
-        """Compute destination key: combine upload_to and a safe filename (uuid-prefixed to avoid collisions)."""
+    def _compute_field_key(self, obj, field, original_name, digest=None):
+        """Compute destination key: upload_to plus the content hash (MEDIA_CONTENT_ADDRESSED) or a uuid-prefixed filename."""
         upload_to = field.upload_to
         # resolve callable upload_to
         if callable(upload_to):
@@ -60,6 +88,8 @@ class S3AdminUploadMixin:
             dest = os.path.join(upload_to, original_name)
         # normalize
         dest = dest.replace('\\', '/').lstrip('/')
+        if digest and content_addressed():
+            return hashed_name(dest, digest)
         # prepend uuid to avoid collisions while keeping basename readable
         base = os.path.basename(dest)
         dirname = os.path.dirname(dest)
@@ -76,9 +106,8 @@ class S3AdminUploadMixin:
                     uploaded = form.cleaned_data.get(fname)
                     if uploaded:
                         # uploaded is InMemoryUploadedFile / TemporaryUploadedFile
-                        key = self._compute_field_key(obj, field, uploaded.name)
-                        ok, err = self._upload_file_to_s3(uploaded, key)
-                        if ok:
+                        key, err = self._upload_file_to_s3(uploaded, obj, field)
+                        if key:
                             # set the attribute to the key so saving the model writes the path
                             setattr(obj, fname, key)
                         else:
@@ -98,9 +127,8 @@ class S3AdminUploadMixin:
                 if fname in inline_form.changed_data:
                     uploaded = inline_form.cleaned_data.get(fname)
                     if uploaded:
-                        key = self._compute_field_key(instance, field, uploaded.name)
-                        ok, err = self._upload_file_to_s3(uploaded, key)
-                        if ok:
+                        key, err = self._upload_file_to_s3(uploaded, instance, field)
+                        if key:
                             setattr(instance, fname, key)
                         else:
                             try:
@@ -133,15 +161,15 @@ class S3AdminUploadMixin:
 class ImageBlockInline(admin.TabularInline):
     model = ImageBlock
     extra = 1
+    readonly_fields = ('image_tag',)
+
+    def image_tag(self, obj):
+        return image_preview(obj, 'image')
+    image_tag.short_description = 'Preview'
 
 class HeroSlideAdmin(S3AdminUploadMixin, admin.ModelAdmin):
     def image_tag(self, obj):
-        if obj.image:
-            try:
-                return format_html('<img src="{}" style="height:80px; object-fit:cover;" />', obj.image.url)
-            except Exception:
-                return obj.image
-        return '-'
+        return image_preview(obj, 'image')
     image_tag.short_description = 'Preview'
 
     list_display = ('id', 'title', 'subtitle', 'order', 'image_tag')
@@ -163,12 +191,7 @@ class NavLinkAdmin(admin.ModelAdmin):
 
 class HeaderAdmin(S3AdminUploadMixin, admin.ModelAdmin):
     def logo_tag(self, obj):
-        if getattr(obj, 'logo', None):
-            try:
-                return format_html('<img src="{}" style="height:80px; object-fit:contain;" />', obj.logo.url)
-            except Exception:
-                return obj.logo
-        return '-'
+        return image_preview(obj, 'logo', style='object-fit:contain;')
     logo_tag.short_description = 'Preview'
 
     list_display = ('id', 'phone', 'email', 'logo_tag')
@@ -185,12 +208,7 @@ class PageAdmin(S3AdminUploadMixin, admin.ModelAdmin):
 
 class AboutAdmin(S3AdminUploadMixin, admin.ModelAdmin):
     def image_tag(self, obj):
-        if obj.image:
-            try:
-                return format_html('<img src="{}" style="height:80px; object-fit:cover;" />', obj.image.url)
-            except Exception:
-                return obj.image
-        return '-'
+        return image_preview(obj, 'image')
     image_tag.short_description = 'Preview'
 
     list_display = ('id', 'title', 'image_tag', 'title_color', 'body_color')
@@ -202,12 +220,7 @@ class AboutAdmin(S3AdminUploadMixin, admin.ModelAdmin):
 
 class DirectorAdmin(S3AdminUploadMixin, admin.ModelAdmin):
     def image_tag(self, obj):
-        if obj.image:
-            try:
-                return format_html('<img src="{}" style="height:80px; object-fit:cover; border-radius:50%;" />', obj.image.url)
-            except Exception:
-                return obj.image
-        return '-'
+        return image_preview(obj, 'image', style='object-fit:cover; border-radius:50%;')
     image_tag.short_description = 'Photo'
 
     list_display = ('id', 'name', 'title', 'image_tag', 'name_color', 'bio_color')
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class ContentConfig(AppConfig):
+    name = 'content'
+
+    def ready(self):
+        from .cache import connect_invalidation
+        from .images import connect_variants
+        from .models import ContentRevision
+        connect_invalidation(m for m in self.get_models() if m is not ContentRevision)
+        connect_variants(self.get_models())
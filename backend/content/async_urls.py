@@ -0,0 +1,12 @@
+from django.urls import path, include
+from .async_views import AsyncHomeView, viewset_urls
+from .urls import router
+
+urlpatterns = [
+    path('home/', AsyncHomeView.as_view(), name='content-home'),
+]
+for prefix, viewset, basename in router.registry:
+    urlpatterns += viewset_urls(prefix, viewset, basename)
+
+# API root and format-suffix routes stay on the DRF views
+urlpatterns.append(path('', include('content.urls')))
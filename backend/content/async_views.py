@@ -0,0 +1,118 @@
+"""Async counterparts of the public read-only endpoints for ASGI deployments.
+
+Served instead of the DRF views when API_ASYNC_VIEWS is on (config/asgi.py
+turns it on). Each view reuses its DRF viewset for the queryset, filters,
+serializer, pagination and cache models, but reads rows with the async ORM and
+the payload cache with the async cache API, so a slow database or cache call
+suspends the request instead of blocking a worker. Output is the same JSON and
+shares cache entries with the sync views. Requests for other formats (the
+browsable API) are handed to the sync view.
+"""
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse
+from django.urls import re_path
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.request import Request
+
+from .cache import acached_response
+from .fastpath import aserialize_list
+from .renderers import FastJSONRenderer
+from .views import HomeView
+
+
+def wants_json(request):
+    fmt = request.GET.get('format')
+    if fmt:
+        return fmt == 'json'
+    return 'text/html' not in request.headers.get('Accept', '')
+
+
+def json_response(data, status=200):
+    response = HttpResponse(FastJSONRenderer().render(data), content_type='application/json', status=status)
+    # same headers DRF adds to its responses
+    response['Vary'] = 'Accept'
+    response['Allow'] = 'GET, HEAD, OPTIONS'
+    return response
+
+
+class AsyncViewSetView(View):
+    """GET list or detail of a read-only DRF viewset, async."""
+    viewset_class = None
+    action = 'list'
+    http_method_names = ['get', 'head', 'options']
+
+    async def get(self, request, *args, **kwargs):
+        if not wants_json(request):
+            view = self.viewset_class.as_view({'get': self.action})
+            return await sync_to_async(view)(request, *args, **kwargs)
+        viewset = self.viewset_class(
+            action=self.action, request=Request(request), args=args, kwargs=kwargs, format_kwarg=None,
+        )
+        try:
+            viewset.check_permissions(viewset.request)
+        except exceptions.APIException as exc:
+            return json_response({'detail': exc.detail}, status=exc.status_code)
+        handler = self.list if self.action == 'list' else self.retrieve
+        return await acached_response(request, viewset.get_cache_models(), handler, viewset)
+
+    async def list(self, request, viewset):
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        paginator = viewset.paginator
+        if paginator is not None:
+            try:
+                if hasattr(paginator, 'apaginate_queryset'):
+                    page = await paginator.apaginate_queryset(queryset, viewset.request, view=viewset)
+                else:
+                    page = await sync_to_async(paginator.paginate_queryset)(queryset, viewset.request, view=viewset)
+            except exceptions.APIException as exc:
+                return json_response({'detail': exc.detail}, status=exc.status_code)
+            if page is not None:
+                data = viewset.get_serializer(page, many=True).data
+                return json_response(paginator.get_paginated_response(data).data)
+        return json_response(await aserialize_list(queryset, viewset.get_serializer_class(), viewset.request))
+
+    async def retrieve(self, request, viewset):
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        lookup_url_kwarg = viewset.lookup_url_kwarg or viewset.lookup_field
+        try:
+            obj = await queryset.aget(**{viewset.lookup_field: viewset.kwargs[lookup_url_kwarg]})
+        except queryset.model.DoesNotExist:
+            exc = exceptions.NotFound(f'No {queryset.model._meta.object_name} matches the given query.')
+            return json_response({'detail': exc.detail}, status=exc.status_code)
+        except (TypeError, ValueError, ValidationError):
+            exc = exceptions.NotFound()
+            return json_response({'detail': exc.detail}, status=exc.status_code)
+        return json_response(viewset.get_serializer(obj).data)
+
+
+class AsyncHomeView(View):
+    """Async HomeView: same sections, read with the async ORM."""
+    http_method_names = ['get', 'head', 'options']
+
+    async def get(self, request, *args, **kwargs):
+        if not wants_json(request):
+            return await sync_to_async(HomeView.as_view())(request, *args, **kwargs)
+        return await acached_response(request, HomeView.cache_models, self._get)
+
+    async def _get(self, request):
+        request = Request(request)
+        data = {}
+        for key, queryset, serializer_class, many in HomeView.sections:
+            if many:
+                data[key] = await aserialize_list(queryset.all(), serializer_class, request)
+            else:
+                obj = await queryset.afirst()
+                data[key] = serializer_class(obj, context={'request': request}).data if obj else None
+        return json_response(data)
+
+
+def viewset_urls(prefix, viewset_class, basename):
+    """List and detail routes of viewset_class with the same paths and names as the DRF router."""
+    return [
+        re_path(rf'^{prefix}/$', AsyncViewSetView.as_view(viewset_class=viewset_class, action='list'),
+                name=f'{basename}-list'),
+        re_path(rf'^{prefix}/(?P<pk>[^/.]+)/$', AsyncViewSetView.as_view(viewset_class=viewset_class, action='retrieve'),
+                name=f'{basename}-detail'),
+    ]
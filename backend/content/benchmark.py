@@ -0,0 +1,100 @@
+"""Helpers shared by the bench_* management commands."""
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def scratch_database(verbosity=0):
+    """Run the block against a freshly migrated throwaway database (same as the test runner uses)."""
+    old_name = connection.settings_dict['NAME']
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        teardown_test_environment()
+
+
+def measure(fn, repeat):
+    """Call fn repeat times and return the durations in seconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(round(0.99 * (len(ordered) - 1))))]
+    return {
+        'mean_ms': statistics.fmean(ordered) * 1000,
+        'p50_ms': statistics.median(ordered) * 1000,
+        'p99_ms': p99 * 1000,
+    }
+
+
+def format_summary(label, samples):
+    s = summarize(samples)
+    return f"{label:<40} mean={s['mean_ms']:9.2f}ms p50={s['p50_ms']:9.2f}ms p99={s['p99_ms']:9.2f}ms"
+
+
+def load_test(base_url, paths, concurrency, total, timeout=30):
+    """GET paths round-robin from `concurrency` threads until `total` requests are done.
+
+    Returns (latencies in seconds, error count, wall time in seconds). Each thread
+    keeps its own keep-alive connection and reconnects when the server closes it.
+    """
+    import http.client
+    import itertools
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from urllib.parse import urlsplit
+
+    parts = urlsplit(base_url)
+    conn_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    prefix = parts.path.rstrip('/')
+    counter = itertools.count()
+    lock = threading.Lock()
+    latencies, errors = [], []
+
+    def worker():
+        conn = None
+        while True:
+            i = next(counter)
+            if i >= total:
+                break
+            path = prefix + paths[i % len(paths)]
+            start = time.perf_counter()
+            try:
+                if conn is None:
+                    conn = conn_class(parts.netloc, timeout=timeout)
+                conn.request('GET', path, headers={'Accept': 'application/json', 'Accept-Encoding': 'gzip'})
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+                if response.will_close:
+                    conn.close()
+                    conn = None
+            except (OSError, http.client.HTTPException):
+                ok = False
+                if conn is not None:
+                    conn.close()
+                conn = None
+            elapsed = time.perf_counter() - start
+            with lock:
+                (latencies if ok else errors).append(elapsed)
+        if conn is not None:
+            conn.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    return latencies, len(errors), time.perf_counter() - start
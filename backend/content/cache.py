@@ -0,0 +1,396 @@
+"""Cache of rendered API payloads for the public read-only endpoints.
+
+Each cached response is keyed by the request path, the response format and a
+"generation" number of every model the response depends on, so a write to one
+model only invalidates the payloads that depend on it. With a shared backend
+(Redis, database cache) generations live in that backend and are bumped by
+model signals. With an in-process backend (local memory) they are the
+ContentRevision counters, re-read every API_CACHE_GENERATION_TTL seconds, so a
+write in one worker (or the job worker) reaches the others within that time.
+
+Cached payloads carry a strong ETag (hash of the rendered body) and a
+Last-Modified taken from ContentRevision, so conditional GETs are answered with
+304 Not Modified straight from the cache.
+
+Each entry also stores gzip and brotli encodings of the body, made once when
+the entry is created; responses pick one according to Accept-Encoding.
+
+`acached_response` is the same for the async views and shares their entries.
+"""
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import Signal
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from .compression import gzip_bytes, brotli_bytes
+
+KEY_PREFIX = 'api-cache'
+HITS_KEY = f'{KEY_PREFIX}:stats:hits'
+MISSES_KEY = f'{KEY_PREFIX}:stats:misses'
+
+# Formats whose rendered bytes are safe to store (the browsable API renders per user).
+CACHEABLE_FORMATS = ('json',)
+
+# Preferred first; identity is always available.
+ENCODINGS = ('br', 'gzip')
+
+
+def get_cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'API_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def _generation_key(model):
+    return f'{KEY_PREFIX}:gen:{model._meta.label_lower}'
+
+
+def _generation_ttl():
+    return getattr(settings, 'API_CACHE_GENERATION_TTL', 5)
+
+
+def _revision_values(rows, labels):
+    revisions = {label: (revision, int(updated_at.timestamp())) for label, revision, updated_at in rows}
+    return {label: revisions.get(label, (0, None)) for label in labels}
+
+
+def _revision_queryset(labels):
+    from .models import ContentRevision
+    return ContentRevision.objects.filter(model__in=labels).values_list('model', 'revision', 'updated_at')
+
+
+def _local_revisions(models):
+    """{label: (revision, last change as unix time or None)} of models, for in-process caches.
+
+    An in-process cache is not shared by workers, so a bump there would stay
+    local to the worker that saved. The generations are therefore the
+    ContentRevision counters (one query for all models), kept in the local
+    cache for API_CACHE_GENERATION_TTL seconds: other workers see a change
+    after at most that long.
+    """
+    cache = get_cache()
+    keys = {m._meta.label_lower: _generation_key(m) for m in models}
+    found = cache.get_many(keys.values())
+    if len(found) == len(keys):
+        return {label: found[key] for label, key in keys.items()}
+    values = _revision_values(_revision_queryset(list(keys)), keys)
+    cache.set_many({keys[label]: value for label, value in values.items()}, timeout=_generation_ttl())
+    return values
+
+
+async def _alocal_revisions(models):
+    cache = get_cache()
+    keys = {m._meta.label_lower: _generation_key(m) for m in models}
+    found = cache.get_many(keys.values())
+    if len(found) == len(keys):
+        return {label: found[key] for label, key in keys.items()}
+    values = _revision_values([row async for row in _revision_queryset(list(keys))], keys)
+    cache.set_many({keys[label]: value for label, value in values.items()}, timeout=_generation_ttl())
+    return values
+
+
+def get_generations(models):
+    """Return current generation for each model, initializing missing ones."""
+    cache = get_cache()
+    if _in_process(cache):
+        return [revision for revision, _ in _local_revisions(models).values()]
+    keys = [_generation_key(m) for m in models]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # time based start value: an evicted generation never reuses an old number
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+    return [found[k] for k in keys]
+
+
+def _in_process(cache):
+    # Django's async cache methods only wrap the sync ones in a thread; an
+    # in-process backend never blocks, so it is called directly
+    return isinstance(cache, (LocMemCache, DummyCache))
+
+
+async def aget_generations(models):
+    cache = get_cache()
+    if _in_process(cache):
+        return [revision for revision, _ in (await _alocal_revisions(models)).values()]
+    keys = [_generation_key(m) for m in models]
+    found = await cache.aget_many(keys)
+    for key in keys:
+        if key not in found:
+            await cache.aadd(key, time.time_ns(), timeout=None)
+            found[key] = await cache.aget(key)
+    return [found[k] for k in keys]
+
+
+def bump_generation(model):
+    cache = get_cache()
+    key = _generation_key(model)
+    if _in_process(cache):
+        # re-read from ContentRevision on the next request (see _local_revisions)
+        cache.delete(key)
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def touch_revision(model):
+    """Increment the persistent revision of model and set its change time to now."""
+    from .models import ContentRevision
+    label = model._meta.label_lower
+    now = timezone.now()
+    updated = ContentRevision.objects.filter(model=label).update(revision=F('revision') + 1, updated_at=now)
+    if not updated:
+        try:
+            with transaction.atomic():
+                ContentRevision.objects.create(model=label, revision=1, updated_at=now)
+        except IntegrityError:
+            ContentRevision.objects.filter(model=label).update(revision=F('revision') + 1, updated_at=now)
+
+
+def _latest(revisions):
+    return max((updated for _, updated in revisions.values() if updated is not None), default=None)
+
+
+def get_last_modified(models):
+    """Latest change time over models as a unix timestamp, or None if never changed."""
+    from .models import ContentRevision
+    if _in_process(get_cache()):
+        return _latest(_local_revisions(models))
+    labels = [m._meta.label_lower for m in models]
+    last = ContentRevision.objects.filter(model__in=labels).aggregate(last=Max('updated_at'))['last']
+    return int(last.timestamp()) if last else None
+
+
+async def aget_last_modified(models):
+    from .models import ContentRevision
+    if _in_process(get_cache()):
+        return _latest(await _alocal_revisions(models))
+    labels = [m._meta.label_lower for m in models]
+    last = (await ContentRevision.objects.filter(model__in=labels).aaggregate(last=Max('updated_at')))['last']
+    return int(last.timestamp()) if last else None
+
+
+def _count(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+async def _acount(key):
+    cache = get_cache()
+    if _in_process(cache):
+        return _count(key)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        if not await cache.aadd(key, 1, timeout=None):
+            await cache.aincr(key)
+
+
+def cache_stats():
+    cache = get_cache()
+    values = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = values.get(HITS_KEY, 0)
+    misses = values.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': (hits / total) if total else 0.0,
+    }
+
+
+def reset_cache_stats():
+    get_cache().delete_many([HITS_KEY, MISSES_KEY])
+
+
+def _key(fmt, request, generations):
+    # payloads embed the request origin: relative media URLs and pagination `next` links are made absolute with it
+    origin = f'{request.scheme}://{request.get_host()}'
+    raw = '|'.join([fmt, origin, request.get_full_path()] + [str(g) for g in generations])
+    return f'{KEY_PREFIX}:payload:{hashlib.sha1(raw.encode("utf-8")).hexdigest()}'
+
+
+def _payload_key(request, models):
+    fmt = getattr(getattr(request, 'accepted_renderer', None), 'format', None)
+    if request.method != 'GET' or fmt not in CACHEABLE_FORMATS:
+        return None
+    return _key(fmt, request, get_generations(models))
+
+
+def _accepted_encodings(request):
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _make_entry(content_type, body, last_modified):
+    """Cache entry with the raw body and its gzip/brotli encodings, each with its own ETag."""
+    digest = hashlib.sha1(body).hexdigest()
+    bodies = {'identity': (body, f'"{digest}"')}
+    if len(body) >= getattr(settings, 'API_CACHE_COMPRESS_MIN_SIZE', 512):
+        encoded = {
+            'gzip': gzip_bytes(body),
+            'br': brotli_bytes(body, quality=getattr(settings, 'API_CACHE_BROTLI_QUALITY', 9)),
+        }
+        for coding, data in encoded.items():
+            if data is not None and len(data) < len(body):
+                bodies[coding] = (data, f'"{digest}-{coding}"')
+    return {'content_type': content_type, 'last_modified': last_modified, 'bodies': bodies}
+
+
+def _serve(request, entry, headers_from=None):
+    accepted = _accepted_encodings(request)
+    coding = next((c for c in ENCODINGS if c in accepted and c in entry['bodies']), 'identity')
+    body, etag = entry['bodies'][coding]
+    response = HttpResponse(body, content_type=entry['content_type'])
+    if headers_from is not None:
+        for header in ('Vary', 'Allow'):
+            if header in headers_from:
+                response[header] = headers_from[header]
+    if coding != 'identity':
+        response['Content-Encoding'] = coding
+    if len(entry['bodies']) > 1:
+        patch_vary_headers(response, ['Accept-Encoding'])
+    response['ETag'] = etag
+    last_modified = entry['last_modified']
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return get_conditional_response(request, etag=etag, last_modified=last_modified, response=response)
+
+
+def cached_response(request, models, handler, *args, **kwargs):
+    """Serve handler's rendered response from cache, storing it on a miss.
+
+    Both paths honour If-None-Match / If-Modified-Since and Accept-Encoding.
+    """
+    key = _payload_key(request, models)
+    if key is None:
+        return handler(request, *args, **kwargs)
+
+    cache = get_cache()
+    entry = cache.get(key)
+    if entry is not None:
+        _count(HITS_KEY)
+        return _serve(request, entry)
+
+    _count(MISSES_KEY)
+    response = handler(request, *args, **kwargs)
+    if response.status_code == 200:
+        def _store(rendered):
+            entry = _make_entry(rendered['Content-Type'], rendered.content, get_last_modified(models))
+            cache.set(key, entry, _timeout())
+            return _serve(request, entry, headers_from=rendered)
+        response.add_post_render_callback(_store)
+    return response
+
+
+async def acached_response(request, models, handler, *args, **kwargs):
+    """Async cached_response for views that always render JSON.
+
+    handler is a coroutine function returning an already rendered response.
+    Entries are shared with the sync path (same keys and format).
+    """
+    if request.method != 'GET':
+        return await handler(request, *args, **kwargs)
+    key = _key('json', request, await aget_generations(models))
+    cache = get_cache()
+    entry = cache.get(key) if _in_process(cache) else await cache.aget(key)
+    if entry is not None:
+        await _acount(HITS_KEY)
+        return _serve(request, entry)
+
+    await _acount(MISSES_KEY)
+    response = await handler(request, *args, **kwargs)
+    if response.status_code != 200:
+        return response
+    last_modified = await aget_last_modified(models)
+    # compression is CPU bound; keep it off the event loop
+    entry = await sync_to_async(_make_entry, thread_sensitive=False)(
+        response['Content-Type'], response.content, last_modified)
+    if _in_process(cache):
+        cache.set(key, entry, _timeout())
+    else:
+        await cache.aset(key, entry, _timeout())
+    return _serve(request, entry, headers_from=response)
+
+
+class CachedResponseMixin:
+    """Viewset mixin caching rendered list/detail responses.
+
+    `cache_models` lists every model the serialized output depends on; by default
+    only the queryset model is used.
+    """
+    cache_models = ()
+
+    def get_cache_models(self):
+        return tuple(self.cache_models) or (self.queryset.model,)
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(request, self.get_cache_models(), super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(request, self.get_cache_models(), super().retrieve, *args, **kwargs)
+
+
+# Sent with sender=model and objs=[instances] by code that writes rows with
+# bulk_create/bulk_update (no post_save), for derived data like the search index.
+bulk_saved = Signal()
+
+
+def mark_changed(model):
+    """Invalidate cached payloads of model and record a new revision."""
+    bump_generation(model)
+    touch_revision(model)
+    # bump again after commit: a payload cached from pre-commit rows is dropped too
+    transaction.on_commit(lambda: bump_generation(model))
+
+
+def _on_change(sender, **kwargs):
+    mark_changed(sender)
+
+
+def _on_m2m_change(sender, instance, action, model, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        mark_changed(type(instance))
+        mark_changed(model)
+
+
+def connect_invalidation(models):
+    """Bump the generation and revision of each model whenever its rows or m2m relations change."""
+    for model in models:
+        uid = f'{KEY_PREFIX}:{model._meta.label_lower}'
+        post_save.connect(_on_change, sender=model, dispatch_uid=f'{uid}:save')
+        post_delete.connect(_on_change, sender=model, dispatch_uid=f'{uid}:delete')
+        for field in model._meta.local_many_to_many:
+            m2m_changed.connect(_on_m2m_change, sender=field.remote_field.through, dispatch_uid=f'{uid}:{field.name}:m2m')
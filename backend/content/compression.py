@@ -0,0 +1,19 @@
+"""gzip/brotli helpers for pre-compressed API payloads. brotli is optional."""
+import gzip
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+
+def gzip_bytes(data, level=9):
+    # mtime=0 keeps the output deterministic for identical input
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def brotli_bytes(data, quality=11):
+    """Brotli-compressed data, or None when the brotli package is not installed."""
+    if brotli is None:
+        return None
+    return brotli.compress(data, quality=quality)
@@ -0,0 +1,120 @@
+"""Opt-in `.values()` read path for flat list endpoints.
+
+With API_FAST_READ enabled, list responses of viewsets using FastReadMixin are
+built from `queryset.values()` rows instead of model instances and
+ModelSerializer fields. The output shape is derived from the serializer's
+Meta.fields and stays identical:
+
+* plain columns (char/text/integer/boolean/JSON) are copied as they are;
+* an ImageField `<name>` becomes its URL (same resolver as the serializers);
+* `<name>_srcset` is built from the `<name>_variants` JSON.
+
+Serializers with anything else (nested serializers, other declared fields,
+date/decimal columns that DRF would format) are not eligible and always take
+the regular path.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import models
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .image_urls import resolve_image_url, srcset_from_variants
+
+PLAIN_FIELDS = (
+    models.AutoField, models.BigAutoField, models.SmallAutoField, models.IntegerField,
+    models.CharField, models.TextField, models.BooleanField, models.JSONField,
+)
+
+
+def fast_read_enabled():
+    return getattr(settings, 'API_FAST_READ', False)
+
+
+@lru_cache(maxsize=None)
+def row_plan(serializer_class):
+    """(output name, kind, column) per serializer field, or None if the serializer is not flat."""
+    meta = getattr(serializer_class, 'Meta', None)
+    model = getattr(meta, 'model', None)
+    fields = getattr(meta, 'fields', None)
+    if model is None or not isinstance(fields, (list, tuple)):
+        return None
+    columns = {f.name: f for f in model._meta.concrete_fields}
+    declared = serializer_class._declared_fields
+    plan = []
+    for name in fields:
+        field = columns.get(name)
+        if name in declared:
+            if not isinstance(declared[name], serializers.SerializerMethodField):
+                return None
+            if isinstance(field, models.ImageField):
+                plan.append((name, 'image', name))
+            elif name.endswith('_srcset') and f'{name[:-len("_srcset")]}_variants' in columns:
+                plan.append((name, 'srcset', f'{name[:-len("_srcset")]}_variants'))
+            else:
+                return None
+        elif isinstance(field, PLAIN_FIELDS) and not field.is_relation:
+            plan.append((name, 'value', name))
+        else:
+            return None
+    return tuple(plan)
+
+
+def _columns(plan):
+    return list(dict.fromkeys(column for _, _, column in plan))
+
+
+def _map_row(plan, row, request):
+    item = {}
+    for name, kind, column in plan:
+        value = row[column]
+        if kind == 'image':
+            value = resolve_image_url(value, request)
+        elif kind == 'srcset':
+            value = srcset_from_variants(value, request)
+        item[name] = value
+    return item
+
+
+def serialize_rows(queryset, serializer_class, request=None):
+    """Serializer-shaped dicts for queryset, read with a single `.values()` query."""
+    plan = row_plan(serializer_class)
+    return [_map_row(plan, row, request) for row in queryset.values(*_columns(plan))]
+
+
+async def aserialize_rows(queryset, serializer_class, request=None):
+    """serialize_rows using the async ORM."""
+    plan = row_plan(serializer_class)
+    return [_map_row(plan, row, request) async for row in queryset.values(*_columns(plan))]
+
+
+def serialize_list(queryset, serializer_class, request=None):
+    """List output for queryset: `.values()` rows when enabled and possible, else the serializer."""
+    if fast_read_enabled() and row_plan(serializer_class) is not None:
+        return serialize_rows(queryset, serializer_class, request)
+    return serializer_class(queryset, many=True, context={'request': request}).data
+
+
+async def aserialize_list(queryset, serializer_class, request=None):
+    if fast_read_enabled() and row_plan(serializer_class) is not None:
+        return await aserialize_rows(queryset, serializer_class, request)
+    objs = [obj async for obj in queryset]
+    return serializer_class(objs, many=True, context={'request': request}).data
+
+
+class FastReadMixin:
+    """Serve list() from `.values()` rows when API_FAST_READ is on and the serializer is flat."""
+
+    def use_fast_read(self, request):
+        if not fast_read_enabled() or row_plan(self.get_serializer_class()) is None:
+            return False
+        paginator = self.paginator
+        # paginated requests keep the regular path; the paginator works with instances
+        return paginator is None or not getattr(paginator, 'is_paginated', lambda r: True)(request)
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_read(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(serialize_rows(queryset, self.get_serializer_class(), request))
@@ -0,0 +1,107 @@
+"""Image URL resolver shared by the content and achievements serializers.
+
+The storage base URL is computed once from settings instead of calling
+`field.url` (a storage backend round trip) for every object, and resolved
+name -> URL pairs are kept in a bounded LRU cache. Relative media URLs are made
+absolute with the request origin, so the API always returns full URLs.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.utils.encoding import filepath_to_uri
+
+URL_SETTINGS = {'MEDIA_URL', 'MEDIA_PUBLIC_BASE_URL', 'AWS_S3_CUSTOM_DOMAIN', 'AWS_LOCATION', 'IMAGE_URL_CACHE_SIZE'}
+
+
+@lru_cache(maxsize=1)
+def media_base_url():
+    """Base URL (with trailing slash) under which storage names are served."""
+    public = getattr(settings, 'MEDIA_PUBLIC_BASE_URL', None)
+    if public:
+        return public.rstrip('/') + '/'
+    custom = getattr(settings, 'AWS_S3_CUSTOM_DOMAIN', None)
+    if custom:
+        base = f'https://{custom.strip("/")}/'
+        location = (getattr(settings, 'AWS_LOCATION', '') or '').strip('/')
+        return f'{base}{location}/' if location else base
+    media = getattr(settings, 'MEDIA_URL', None) or '/media/'
+    return media.rstrip('/') + '/'
+
+
+def _build(name):
+    name = str(name).replace('\\', '/').lstrip('/')
+    if name.startswith(('http://', 'https://')):
+        return name
+    return media_base_url() + filepath_to_uri(name)
+
+
+_resolve_name = lru_cache(maxsize=getattr(settings, 'IMAGE_URL_CACHE_SIZE', 4096))(_build)
+
+
+def _request_origin(request):
+    origin = getattr(request, '_media_origin', None)
+    if origin is None:
+        origin = f'{request.scheme}://{request.get_host()}'
+        request._media_origin = origin
+    return origin
+
+
+def resolve_image_url(name, request=None):
+    """Return the canonical URL for a storage name ('' for empty names)."""
+    if not name:
+        return ''
+    url = _resolve_name(name)
+    if url.startswith('/') and request is not None:
+        return _request_origin(request) + url
+    return url
+
+
+def image_url(obj, field_name, request=None):
+    """URL of the ImageField `field_name` on obj."""
+    field = getattr(obj, field_name, None)
+    return resolve_image_url(getattr(field, 'name', field), request)
+
+
+def image_srcset(obj, field_name, request=None):
+    """srcset strings per format for the variants of `field_name`, e.g. {'webp': 'url 640w, ...'}."""
+    return srcset_from_variants(getattr(obj, f'{field_name}_variants', None), request)
+
+
+def srcset_from_variants(variants, request=None):
+    """srcset strings per format from a stored `<field>_variants` dict."""
+    result = {}
+    for fmt, by_width in (variants or {}).items():
+        if fmt == 'source' or not isinstance(by_width, dict):
+            continue
+        result[fmt] = ', '.join(
+            f'{resolve_image_url(name, request)} {width}w'
+            for width, name in sorted(by_width.items(), key=lambda item: int(item[0]))
+        )
+    return result
+
+
+def thumbnail_url(variants, request=None):
+    """URL of the smallest stored rendition in a `<field>_variants` dict ('' when there is none)."""
+    variants = variants or {}
+    if variants.get('thumb'):
+        return resolve_image_url(variants['thumb'], request)
+    for fmt in ('webp', 'jpeg'):
+        by_width = variants.get(fmt)
+        if isinstance(by_width, dict) and by_width:
+            return resolve_image_url(by_width[min(by_width, key=int)], request)
+    return ''
+
+
+def clear_cache():
+    global _resolve_name
+    media_base_url.cache_clear()
+    _resolve_name = lru_cache(maxsize=getattr(settings, 'IMAGE_URL_CACHE_SIZE', 4096))(_build)
+
+
+def _on_setting_changed(setting, **kwargs):
+    if setting in URL_SETTINGS:
+        clear_cache()
+
+
+setting_changed.connect(_on_setting_changed, dispatch_uid='image_urls:setting_changed')
@@ -0,0 +1,238 @@
+"""Responsive image variants (resized WebP/JPEG) generated with Pillow.
+
+Every model ImageField `<name>` that has a sibling JSONField `<name>_variants`
+gets variants when the model is saved with a new image. The JSON looks like::
+
+    {"source": "hero/a.jpg", "webp": {"640": "hero/variants/a-640w.webp", ...},
+     "jpeg": {"640": "hero/variants/a-640w.jpg", ...}, "thumb": "hero/variants/a-thumb.webp"}
+
+`source` lets us skip regeneration when the image did not change. `thumb` is a
+small WebP that fits in IMAGE_THUMBNAIL_SIZE pixels, used by the admin previews.
+
+Models may also declare `<name>_width`, `<name>_height`, `<name>_color` and
+`<name>_placeholder` fields; they are filled from the same Pillow pass with the
+image size, its dominant colour and a tiny base64 WebP (LQIP) data URI that the
+frontend can show while the real image loads.
+"""
+import base64
+import hashlib
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import models
+from django.db.models.signals import post_save
+
+from .cache import mark_changed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WIDTHS = (320, 640, 960, 1280, 1920)
+DEFAULT_THUMBNAIL_SIZE = 160
+THUMBNAIL_OPTIONS = {'quality': 70, 'method': 4}
+
+# format key -> (file extension, Pillow format, save options)
+FORMATS = {
+    'webp': ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def variant_widths():
+    return tuple(sorted(getattr(settings, 'IMAGE_VARIANT_WIDTHS', DEFAULT_WIDTHS)))
+
+
+def variant_formats():
+    return tuple(f for f in getattr(settings, 'IMAGE_VARIANT_FORMATS', tuple(FORMATS)) if f in FORMATS)
+
+
+def variant_name(name, width, fmt):
+    dirname, basename = os.path.split(name)
+    stem = os.path.splitext(basename)[0]
+    filename = f'{stem}-{width}w.{FORMATS[fmt][0]}'
+    return f'{dirname}/variants/{filename}' if dirname else f'variants/{filename}'
+
+
+def thumbnail_name(name):
+    dirname, basename = os.path.split(name)
+    filename = f'{os.path.splitext(basename)[0]}-thumb.webp'
+    return f'{dirname}/variants/{filename}' if dirname else f'variants/{filename}'
+
+
+METADATA_SUFFIXES = ('width', 'height', 'color', 'placeholder')
+PLACEHOLDER_WIDTH = 16
+
+
+def image_fields(model):
+    """ImageFields of model that have a `<name>_variants` JSONField next to them."""
+    names = {f.name for f in model._meta.fields}
+    return [f for f in model._meta.fields if isinstance(f, models.ImageField) and f'{f.name}_variants' in names]
+
+
+def metadata_fields(model, field):
+    """Names of the `<field>_width/height/color/placeholder` fields that model declares."""
+    names = {f.name for f in model._meta.fields}
+    return [f'{field.name}_{suffix}' for suffix in METADATA_SUFFIXES if f'{field.name}_{suffix}' in names]
+
+
+def _save(storage, name, data):
+    # a content-addressed storage picks a new name for new bytes and must keep shared files
+    if not getattr(storage, 'content_addressed', False) and storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, ContentFile(data))
+
+
+def decode_image(fh):
+    """Load an image from a binary file object with Pillow, applying EXIF orientation."""
+    from PIL import Image, ImageOps
+
+    with Image.open(fh) as img:
+        img = ImageOps.exif_transpose(img)
+        img.load()
+    return img
+
+
+def open_image(name, storage=None):
+    """Load the stored image `name` with Pillow, applying EXIF orientation."""
+    storage = storage or default_storage
+    with storage.open(name, 'rb') as fh:
+        return decode_image(fh)
+
+
+def image_metadata(img):
+    """Size, dominant colour (#rrggbb) and an LQIP data URI for a loaded image."""
+    from PIL import Image
+
+    rgb = img.convert('RGB')
+    # the most frequent colour of a small 8-colour palette is a stable "dominant" colour
+    palette = rgb.resize((64, 64), Image.BOX).quantize(colors=8)
+    _, index = max(palette.getcolors())
+    r, g, b = palette.getpalette()[index * 3:index * 3 + 3]
+
+    height = max(1, round(img.height * PLACEHOLDER_WIDTH / img.width))
+    buf = io.BytesIO()
+    rgb.resize((PLACEHOLDER_WIDTH, height), Image.BOX).save(buf, 'WEBP', quality=40)
+    return {
+        'width': img.width,
+        'height': img.height,
+        'color': f'#{r:02x}{g:02x}{b:02x}',
+        'placeholder': 'data:image/webp;base64,' + base64.b64encode(buf.getvalue()).decode('ascii'),
+    }
+
+
+def generate_variants(name, storage=None, img=None):
+    """Create resized copies of the stored image `name`; returns the variants dict."""
+    from PIL import Image
+
+    storage = storage or default_storage
+    if img is None:
+        img = open_image(name, storage)
+    original_width = img.width
+    # never upscale; an image narrower than every width still gets one re-encoded copy
+    widths = [w for w in variant_widths() if w < original_width] or [original_width]
+
+    result = {'source': name}
+    for fmt in variant_formats():
+        _, pil_format, options = FORMATS[fmt]
+        source = img
+        if pil_format == 'JPEG' and img.mode not in ('RGB', 'L'):
+            source = img.convert('RGB')
+        elif img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            source = img.convert('RGBA')
+        result[fmt] = {}
+        for width in widths:
+            height = max(1, round(source.height * width / source.width))
+            resized = source if width == source.width else source.resize((width, height), Image.LANCZOS)
+            buf = io.BytesIO()
+            resized.save(buf, pil_format, **options)
+            result[fmt][str(width)] = _save(storage, variant_name(name, width, fmt), buf.getvalue())
+
+    size = getattr(settings, 'IMAGE_THUMBNAIL_SIZE', DEFAULT_THUMBNAIL_SIZE)
+    thumb = img.convert('RGBA' if img.mode in ('RGBA', 'LA', 'P') else 'RGB')
+    thumb.thumbnail((size, size), Image.LANCZOS)
+    buf = io.BytesIO()
+    thumb.save(buf, 'WEBP', **THUMBNAIL_OPTIONS)
+    result['thumb'] = _save(storage, thumbnail_name(name), buf.getvalue())
+    return result
+
+
+def _is_stale(instance, field):
+    file = getattr(instance, field.name)
+    name = file.name if file else ''
+    current = getattr(instance, f'{field.name}_variants') or {}
+    if current.get('source', '') != name:
+        return True
+    # rows processed before admin thumbnails existed
+    if name and not current.get('thumb'):
+        return True
+    meta = metadata_fields(type(instance), field)
+    return bool(name and meta and getattr(instance, meta[0]) in (None, ''))
+
+
+def _empty_metadata(instance, field):
+    return {attr: (None if attr.endswith(('_width', '_height')) else '') for attr in metadata_fields(type(instance), field)}
+
+
+def update_instance_variants(instance, force=False, missing_ok=True):
+    """Regenerate variants and metadata of every changed image on instance.
+
+    Returns True if anything was updated. With missing_ok=False a file that is
+    not in storage yet (upload still queued) raises FileNotFoundError so the
+    calling job is retried.
+    """
+    updates = {}
+    for field in image_fields(type(instance)):
+        if not force and not _is_stale(instance, field):
+            continue
+        file = getattr(instance, field.name)
+        name = file.name if file else ''
+        if not name:
+            updates[f'{field.name}_variants'] = {}
+            updates.update(_empty_metadata(instance, field))
+            continue
+        if not file.storage.exists(name):
+            if not missing_ok:
+                raise FileNotFoundError(name)
+            logger.info('Skipping variants for missing file %s', name)
+            continue
+        try:
+            img = open_image(name, file.storage)
+            updates[f'{field.name}_variants'] = generate_variants(name, file.storage, img=img)
+            metadata = image_metadata(img)
+        except Exception as e:
+            logger.warning('Could not process image %s: %s', name, e)
+            continue
+        for attr in metadata_fields(type(instance), field):
+            updates[attr] = metadata[attr[len(field.name) + 1:]]
+    if not updates:
+        return False
+    for attr, value in updates.items():
+        setattr(instance, attr, value)
+    # update() does not send post_save, so mark the payload cache stale explicitly
+    type(instance)._default_manager.filter(pk=instance.pk).update(**updates)
+    mark_changed(type(instance))
+    return True
+
+
+def _on_save(sender, instance, raw=False, **kwargs):
+    if raw or not getattr(settings, 'IMAGE_VARIANTS_ON_SAVE', True):
+        return
+    stale = [f for f in image_fields(sender) if _is_stale(instance, f)]
+    if not stale:
+        return
+    names = [getattr(instance, f.name).name or '' for f in stale]
+    # Pillow work runs in the job worker; the key makes repeated saves of the same image a no-op
+    from jobs.queue import enqueue, is_eager
+    label = sender._meta.label_lower
+    digest = hashlib.sha1('|'.join(names).encode('utf-8')).hexdigest()
+    enqueue('images.generate_variants', {'model': label, 'pk': instance.pk, 'missing_ok': is_eager()},
+            idempotency_key=f'variants:{label}:{instance.pk}:{digest}')
+
+
+def connect_variants(models_):
+    for model in models_:
+        if image_fields(model):
+            post_save.connect(_on_save, sender=model, dispatch_uid=f'image-variants:{model._meta.label_lower}')
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from content.cache import cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Print hit/miss counters of the API payload cache. Use --reset to zero them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset counters after printing')
+
+    def handle(self, *args, **options):
+        stats = cache_stats()
+        self.stdout.write(f"hits={stats['hits']} misses={stats['misses']} hit_ratio={stats['hit_ratio']:.2%}")
+        if options.get('reset'):
+            reset_cache_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset'))
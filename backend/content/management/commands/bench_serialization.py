@@ -0,0 +1,63 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from achievements.models import Certificate
+from content.benchmark import scratch_database, measure, format_summary
+from content.renderers import orjson
+
+# label -> settings overrides
+MODES = (
+    ('serializer + json', {'API_FAST_READ': False, 'API_FAST_JSON': False}),
+    ('serializer + orjson', {'API_FAST_READ': False, 'API_FAST_JSON': True}),
+    ('values() + json', {'API_FAST_READ': True, 'API_FAST_JSON': False}),
+    ('values() + orjson', {'API_FAST_READ': True, 'API_FAST_JSON': True}),
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare ModelSerializer vs .values() fast path and stdlib json vs orjson on a throwaway database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Number of certificates to generate')
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; the orjson modes use the stdlib encoder'))
+        with scratch_database():
+            self._run(options)
+
+    def _fill(self, rows):
+        variants = {'webp': {'640': 'certificates/variants/c-640w.webp', '1280': 'certificates/variants/c-1280w.webp'}}
+        Certificate.objects.bulk_create(
+            (Certificate(title=f'Certificate {i}', year='2024', image=f'certificates/{i}.jpg',
+                         image_variants=variants, category='students', level='city', order=i % 100)
+             for i in range(rows)),
+            batch_size=5000,
+        )
+
+    def _run(self, options):
+        rows, repeat = options['rows'], options['repeat']
+        self.stdout.write(f'Generating {rows} certificates...')
+        self._fill(rows)
+        client = Client()
+        url = '/api/achievements/certificates/'
+
+        def get():
+            cache.clear()
+            response = client.get(url)
+            assert response.status_code == 200, response.status_code
+            return response
+
+        bodies = {}
+        for label, overrides in MODES:
+            with override_settings(**overrides):
+                bodies[label] = get().content
+                samples = measure(get, repeat)
+            rate = rows * len(samples) / sum(samples)
+            self.stdout.write(f'{format_summary(label, samples)} {rate:10.0f} rows/s')
+        if len(set(bodies.values())) != 1:
+            self.stdout.write(self.style.ERROR('Responses differ between modes'))
+        else:
+            self.stdout.write(self.style.SUCCESS('All modes returned identical bytes'))
@@ -0,0 +1,117 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from content.benchmark import load_test, format_summary
+
+DEFAULT_PATHS = ['/api/content/home/', '/api/content/hero-slides/', '/api/achievements/certificates/']
+
+# mode -> (gunicorn arguments, extra environment); "tuned" modes use config/gunicorn_conf.py
+SERVERS = {
+    'wsgi': (['config.wsgi:application'], {}),
+    'asgi': (['config.asgi:application', '--worker-class', 'uvicorn.workers.UvicornWorker'], {}),
+    'tuned': (['-c', 'python:config.gunicorn_conf'], {'SERVER_MODE': 'wsgi'}),
+    'tuned-asgi': (['-c', 'python:config.gunicorn_conf'], {'SERVER_MODE': 'asgi'}),
+}
+
+
+def _children(pid):
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as fh:
+            return [int(p) for p in fh.read().split()]
+    except OSError:
+        return []
+
+
+def _memory_kb(pid):
+    """(RSS, PSS) of pid in KiB; PSS splits pages shared with the master between the processes."""
+    values = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as fh:
+            for line in fh:
+                key, _, rest = line.partition(':')
+                if key in ('Rss', 'Pss'):
+                    values[key] = int(rest.split()[0])
+    except OSError:
+        return None
+    return values.get('Rss', 0), values.get('Pss', 0)
+
+
+class Command(BaseCommand):
+    help = ('Load test the API under gunicorn with sync WSGI workers and with uvicorn ASGI workers '
+            '(same worker count, same load) and report throughput and latency percentiles. '
+            'Uses the configured database, so run it against realistic content.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', default='wsgi,asgi', help='Comma separated: wsgi, asgi, tuned, tuned-asgi')
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent client connections')
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--path', action='append', dest='paths', help='Path to request (repeatable)')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--cold', action='store_true', help='Disable the payload cache in the servers')
+        parser.add_argument('--url', help='Benchmark an already running server at this base URL instead')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or DEFAULT_PATHS
+        if options['url']:
+            self._report(options['url'], options['url'], paths, options)
+            return
+        self.stdout.write('wsgi/asgi: plain gunicorn command line; tuned: config/gunicorn_conf.py '
+                          '(preload, warm-up, gc.freeze) with the same worker count')
+        for mode in [m.strip() for m in options['modes'].split(',') if m.strip()]:
+            if mode not in SERVERS:
+                raise CommandError(f'Unknown mode {mode!r}')
+            server = self._start(mode, options)
+            try:
+                self._report(f'{mode} ({options["workers"]} workers)', f'http://127.0.0.1:{options["port"]}', paths, options)
+                self._report_memory(server.pid)
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+    def _start(self, mode, options):
+        args, extra_env = SERVERS[mode]
+        # config/asgi.py switches the async views on by itself
+        env = {k: v for k, v in os.environ.items() if k != 'API_ASYNC_VIEWS'}
+        env.update(extra_env)
+        if options['cold']:
+            env['API_CACHE_TIMEOUT'] = '0'
+        cmd = [sys.executable, '-m', 'gunicorn', *args,
+               '--bind', f'127.0.0.1:{options["port"]}', '--workers', str(options['workers']), '--log-level', 'warning']
+        server = subprocess.Popen(cmd, cwd=settings.BASE_DIR, env=env)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'{mode} server exited with code {server.returncode}')
+            try:
+                socket.create_connection(('127.0.0.1', options['port']), timeout=1).close()
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f'{mode} server did not start listening within 30s')
+
+    def _report(self, label, base_url, paths, options):
+        # first request per path, as a client right after a deploy sees it
+        first, _, _ = load_test(base_url, paths, 1, len(paths))
+        if first:
+            self.stdout.write(f'{label:<40} first requests: max={max(first) * 1000:.1f}ms total={sum(first) * 1000:.1f}ms')
+        load_test(base_url, paths, min(4, options['concurrency']), len(paths) * 4)
+        latencies, errors, wall = load_test(base_url, paths, options['concurrency'], options['requests'])
+        if not latencies:
+            raise CommandError(f'{label}: every request failed')
+        self.stdout.write(f'{format_summary(label, latencies)} {len(latencies) / wall:8.1f} req/s errors={errors}')
+
+    def _report_memory(self, pid):
+        workers = [m for m in (_memory_kb(child) for child in _children(pid)) if m]
+        if not workers:
+            return
+        rss = sum(m[0] for m in workers) / len(workers) / 1024
+        pss = sum(m[1] for m in workers) / len(workers) / 1024
+        self.stdout.write(f'{"":<40} per worker: RSS={rss:.1f}MiB PSS={pss:.1f}MiB')
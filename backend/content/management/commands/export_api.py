@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+from urllib.parse import urlencode, urlparse
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from achievements.models import Certificate
+from achievements.urls import router as achievements_router
+from content.compression import gzip_bytes, brotli_bytes
+from content.urls import router as content_router
+
+MANIFEST = 'manifest.json'
+
+
+def export_path(url_path, params=None):
+    """Map an API path (+ query params) to a relative file name.
+
+    /api/content/stats/ -> content/stats/index.json
+    /api/content/stats/3/ -> content/stats/3.json
+    /api/achievements/certificates/?category=students -> achievements/certificates/index.category-students.json
+    """
+    parts = url_path.strip('/').split('/')[1:]  # drop leading "api"
+    suffix = ''.join(f'.{k}-{v}' for k, v in sorted((params or {}).items()))
+    if parts[-1].isdigit():
+        return '/'.join(parts[:-1]) + f'/{parts[-1]}{suffix}.json'
+    return '/'.join(parts) + f'/index{suffix}.json'
+
+
+class Command(BaseCommand):
+    help = ('Render every public endpoint under api/content/ and api/achievements/ to JSON files '
+            'with .gz/.br siblings. Only files whose content hash changed are rewritten.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=os.path.join(settings.BASE_DIR, 'api_export'), help='Target directory')
+        parser.add_argument('--origin', default='http://localhost', help='Origin used to build absolute media URLs')
+        parser.add_argument('--no-compress', action='store_true', help='Do not write .gz/.br files')
+
+    def iter_urls(self):
+        """Yield (url path, query params) of every exported endpoint."""
+        yield '/api/content/home/', {}
+        for prefix, viewset, _ in content_router.registry:
+            yield f'/api/content/{prefix}/', {}
+            for pk in viewset.queryset.model._default_manager.values_list('pk', flat=True):
+                yield f'/api/content/{prefix}/{pk}/', {}
+
+        categories = [None] + [c for c, _ in Certificate.CATEGORY_CHOICES]
+        levels = [None] + [l for l, _ in Certificate.LEVEL_CHOICES]
+        for prefix, viewset, _ in achievements_router.registry:
+            for category in categories:
+                for level in levels:
+                    params = {k: v for k, v in (('category', category), ('level', level)) if v}
+                    yield f'/api/achievements/{prefix}/', params
+            for pk in viewset.queryset.model._default_manager.values_list('pk', flat=True):
+                yield f'/api/achievements/{prefix}/{pk}/', {}
+
+    def handle(self, *args, **options):
+        output = options['output']
+        origin = urlparse(options['origin'])
+        if not origin.netloc:
+            raise CommandError('--origin must look like https://example.com')
+        os.makedirs(output, exist_ok=True)
+
+        manifest_path = os.path.join(output, MANIFEST)
+        try:
+            with open(manifest_path, encoding='utf-8') as fh:
+                old_manifest = json.load(fh)
+        except (OSError, ValueError):
+            old_manifest = {}
+
+        client = Client(HTTP_HOST=origin.netloc)
+        secure = origin.scheme == 'https'
+        manifest = {}
+        written = 0
+        with override_settings(ALLOWED_HOSTS=[origin.hostname]):
+            for url_path, params in self.iter_urls():
+                url = f'{url_path}?{urlencode(params)}' if params else url_path
+                response = client.get(url, secure=secure, HTTP_ACCEPT='application/json')
+                if response.status_code != 200:
+                    self.stderr.write(self.style.WARNING(f'{url}: HTTP {response.status_code}, skipped'))
+                    continue
+                rel = export_path(url_path, params)
+                body = response.content
+                digest = hashlib.sha256(body).hexdigest()
+                manifest[rel] = digest
+                target = os.path.join(output, rel)
+                if old_manifest.get(rel) == digest and os.path.exists(target):
+                    continue
+                self._write(target, body, compress=not options['no_compress'])
+                written += 1
+                self.stdout.write(f'Wrote {rel}')
+
+        removed = 0
+        for rel in set(old_manifest) - set(manifest):
+            for path in (rel, rel + '.gz', rel + '.br'):
+                try:
+                    os.remove(os.path.join(output, path))
+                except FileNotFoundError:
+                    pass
+            removed += 1
+
+        with open(manifest_path, 'w', encoding='utf-8') as fh:
+            json.dump(manifest, fh, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(
+            f'Done. {len(manifest)} files, {written} written, {len(manifest) - written} unchanged, {removed} removed.'))
+
+    def _write(self, target, body, compress=True):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        outputs = [(target, body)]
+        if compress:
+            outputs.append((target + '.gz', gzip_bytes(body)))
+            br = brotli_bytes(body)
+            if br is not None:
+                outputs.append((target + '.br', br))
+        for path, data in outputs:
+            tmp = path + '.tmp'
+            with open(tmp, 'wb') as fh:
+                fh.write(data)
+            os.replace(tmp, path)
@@ -0,0 +1,70 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from content.media_refs import is_orphan, media_prefixes, referenced_names
+from content.s3 import DELETE_BATCH, delete_keys, get_bucket, get_region, list_objects, shared_client
+
+
+class Command(BaseCommand):
+    help = ('Delete S3 objects under the media prefixes that no ImageField (or its variants) references '
+            'and that are older than the grace period. The listing is streamed and deletes are batched, '
+            'so memory stays bounded whatever the bucket size. Use --dry-run for a report.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report orphans without deleting them')
+        parser.add_argument('--grace-hours', type=float, default=72,
+                            help='Keep unreferenced objects modified more recently than this (uploads in flight)')
+        parser.add_argument('--prefix', action='append', dest='prefixes',
+                            help='Key prefix to collect (repeatable; default: the upload_to of every media field)')
+        parser.add_argument('--bucket', help='Bucket (default AWS_STORAGE_BUCKET_NAME)')
+        parser.add_argument('--show', type=int, default=20, help='Orphan keys to list in the report')
+
+    def handle(self, *args, **options):
+        bucket = options['bucket'] or get_bucket()
+        if not bucket:
+            raise CommandError('AWS_STORAGE_BUCKET_NAME is not set in environment')
+        prefixes = options['prefixes'] or media_prefixes()
+        dry_run = options['dry_run']
+        start = time.perf_counter()
+
+        references = referenced_names()
+        if not len(references):
+            # an empty or wrong database would make every object look orphaned
+            raise CommandError('No media references found in the database, refusing to collect')
+        self.stdout.write(f'{len(references)} referenced files; scanning {", ".join(prefixes)} in s3://{bucket}')
+
+        s3 = shared_client(get_region())
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        scanned = orphans = orphan_bytes = deleted = 0
+        batch, errors = [], []
+        for prefix in prefixes:
+            for obj in list_objects(s3, bucket, prefix):
+                scanned += 1
+                if not is_orphan(obj, references, cutoff):
+                    continue
+                orphans += 1
+                orphan_bytes += obj.get('Size', 0)
+                if orphans <= options['show']:
+                    self.stdout.write(f'  orphan {obj["Key"]} ({obj.get("Size", 0)} bytes, {obj["LastModified"]:%Y-%m-%d})')
+                if dry_run:
+                    continue
+                batch.append(obj['Key'])
+                if len(batch) >= DELETE_BATCH:
+                    errors += delete_keys(s3, bucket, batch)
+                    deleted += len(batch)
+                    batch = []
+        if batch:
+            errors += delete_keys(s3, bucket, batch)
+            deleted += len(batch)
+
+        for key, error in errors[:options['show']]:
+            self.stderr.write(self.style.ERROR(f'Failed to delete {key}: {error}'))
+        summary = (f'{scanned} objects scanned, {orphans} orphaned ({orphan_bytes / (1024 * 1024):.1f} MiB), '
+                   f'{"none deleted (dry run)" if dry_run else f"{deleted - len(errors)} deleted"} '
+                   f'in {time.perf_counter() - start:.1f}s')
+        if errors:
+            raise CommandError(f'{summary}; {len(errors)} deletes failed')
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,23 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from content.images import image_fields, update_instance_variants
+
+
+class Command(BaseCommand):
+    help = 'Generate responsive image variants and size/colour/placeholder metadata for existing content and achievements rows (backfill).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate even if variants are up to date')
+
+    def handle(self, *args, **options):
+        updated = 0
+        for label in ('content', 'achievements'):
+            for model in apps.get_app_config(label).get_models():
+                if not image_fields(model):
+                    continue
+                for obj in model._default_manager.iterator():
+                    if update_instance_variants(obj, force=options['force']):
+                        updated += 1
+                        self.stdout.write(f'{model._meta.label} #{obj.pk}: variants/metadata updated')
+        self.stdout.write(self.style.SUCCESS(f'Done. Updated {updated} objects.'))
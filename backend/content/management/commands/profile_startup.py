@@ -0,0 +1,89 @@
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Heavy optional dependencies that must only be imported on first use
+LAZY_MODULES = ('boto3', 'botocore', 's3transfer', 'PIL', 'storages.backends')
+
+# What a web worker does before serving: setup, middleware, URLconf (views, serializers)
+STARTUP_SCRIPT = '''
+import time
+start = time.perf_counter()
+from {module} import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(f'WALL {{time.perf_counter() - start}}')
+'''
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from `python -X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+            rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+        except ValueError:
+            continue
+    return rows
+
+
+class Command(BaseCommand):
+    help = ('Import the app the way a web worker starts (django.setup, middleware, URLconf) in a fresh '
+            'interpreter and report the import-time breakdown. Fails if a lazy dependency '
+            '(boto3, Pillow, storage backends) is imported or the startup exceeds --budget-ms.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15, help='Rows per table')
+        parser.add_argument('--asgi', action='store_true', help='Start from config.asgi instead of config.wsgi')
+        parser.add_argument('--budget-ms', type=float, help='Fail when the startup wall time exceeds this')
+        parser.add_argument('--allow', action='append', default=[], help='Lazy module allowed at startup (repeatable)')
+
+    def handle(self, *args, **options):
+        module = 'config.asgi' if options['asgi'] else 'config.wsgi'
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT.format(module=module)],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise CommandError(f'Startup failed:\n{proc.stderr[-2000:]}')
+        wall_ms = next((float(line.split()[1]) * 1000 for line in proc.stdout.splitlines() if line.startswith('WALL ')), 0.0)
+        rows = parse_importtime(proc.stderr)
+        top = options['top']
+
+        self.stdout.write(f'Startup ({module}): {wall_ms:.0f} ms wall, {len(rows)} modules imported, '
+                          f'{sum(r[1] for r in rows) / 1000:.0f} ms in imports')
+
+        by_package = defaultdict(int)
+        for name, self_us, _, _ in rows:
+            by_package[name.split('.')[0]] += self_us
+        self.stdout.write('\nBy top-level package (self time):')
+        for package, us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(f'  {us / 1000:8.1f} ms  {package}')
+
+        self.stdout.write('\nSlowest modules (cumulative, imported directly by the startup code or Django):')
+        shallow = [r for r in rows if r[3] <= 1]
+        for name, _, cumulative_us, _ in sorted(shallow, key=lambda r: -r[2])[:top]:
+            self.stdout.write(f'  {cumulative_us / 1000:8.1f} ms  {name}')
+
+        allowed = tuple(options['allow'])
+        eager = sorted({
+            name for name, *_ in rows
+            if any(name == lazy or name.startswith(lazy + '.') for lazy in LAZY_MODULES)
+            and not any(name == a or name.startswith(a + '.') for a in allowed)
+        })
+        problems = []
+        if eager:
+            roots = sorted({n for n in eager if not any(n.startswith(o + '.') for o in eager)})
+            problems.append(f'lazy dependencies imported at startup: {", ".join(roots)}')
+        if options['budget_ms'] is not None and wall_ms > options['budget_ms']:
+            problems.append(f'startup took {wall_ms:.0f} ms, budget is {options["budget_ms"]:.0f} ms')
+        if problems:
+            raise CommandError('; '.join(problems))
+        self.stdout.write(self.style.SUCCESS('\nNo lazy dependency imported at startup'))
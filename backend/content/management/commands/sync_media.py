@@ -0,0 +1,61 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from content.media_sync import MANIFEST_NAME, sync_directory
+from content.s3 import get_bucket, get_region, shared_client
+
+
+class Command(BaseCommand):
+    help = ('Upload new and changed files of MEDIA_ROOT (or --source) to the S3 bucket, in parallel. '
+            'Unchanged files are detected from a local manifest and the remote ETags, and an interrupted '
+            'run resumes where it stopped.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', help='Directory to sync (default MEDIA_ROOT)')
+        parser.add_argument('--prefix', default='', help='Key prefix inside the bucket (no leading slash)')
+        parser.add_argument('--bucket', help='Bucket (default AWS_STORAGE_BUCKET_NAME)')
+        parser.add_argument('--workers', type=int, default=16, help='Files transferred in parallel')
+        parser.add_argument('--manifest', help=f'Manifest path (default <source>/{MANIFEST_NAME})')
+        parser.add_argument('--no-remote', action='store_true',
+                            help='Trust the manifest instead of listing the bucket for ETags')
+        parser.add_argument('--public', action='store_true', help='Make uploaded objects public (ACL public-read)')
+        parser.add_argument('--cache-control', default='max-age=86400', help='Cache-Control of uploaded objects')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be uploaded')
+
+    def handle(self, *args, **options):
+        source = options['source'] or settings.MEDIA_ROOT
+        if not os.path.isdir(source):
+            raise CommandError(f'Source directory does not exist: {source}')
+        bucket = options['bucket'] or get_bucket()
+        if not bucket:
+            raise CommandError('AWS_STORAGE_BUCKET_NAME is not set in environment')
+
+        extra_args = {}
+        if options['cache_control']:
+            extra_args['CacheControl'] = options['cache_control']
+        if options['public']:
+            extra_args['ACL'] = 'public-read'
+
+        verbose = options['verbosity'] > 1
+
+        def progress(rel, outcome):
+            if verbose or outcome == 'uploaded':
+                self.stdout.write(f'{outcome:9} {rel}')
+
+        result = sync_directory(
+            source, prefix=options['prefix'], bucket=bucket, client=shared_client(get_region()),
+            workers=options['workers'], manifest_path=options['manifest'], remote=not options['no_remote'],
+            dry_run=options['dry_run'], extra_args=extra_args, on_progress=progress,
+        )
+        for rel, error in result.errors:
+            self.stderr.write(self.style.ERROR(f'Failed to upload {rel}: {error}'))
+        verb = 'Would upload' if options['dry_run'] else 'Uploaded'
+        summary = (f'{verb} {result.uploaded} of {result.scanned} files '
+                   f'({result.bytes_uploaded / (1024 * 1024):.1f} MiB), {result.unchanged} unchanged, '
+                   f'{result.failed} failed in {result.elapsed:.1f}s '
+                   f'({result.mb_per_second:.1f} MiB/s, {result.files_per_second:.1f} files/s)')
+        if result.failed:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary))
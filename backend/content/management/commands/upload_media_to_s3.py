@@ -1,12 +1,18 @@
 import os
-import boto3
-from django.core.management.base import BaseCommand
+
 from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from content.media_sync import sync_directory
+from content.s3 import get_bucket, get_region, shared_client
 
 # This command uploads selected static images from front/public into the configured S3 bucket
 # It mirrors the folder layout used by `import_static_content` generation: hero/, about/, director/
+# The upload itself goes through content.media_sync, like `sync_media` (only new or changed files).
 
 FRONT_PUBLIC = os.path.join(settings.BASE_DIR, '..', '..', 'front', 'public')
+# kept outside front/public so tools/upload_front_to_s3.py does not upload it
+MANIFEST_PATH = os.path.join(settings.BASE_DIR, '.front_media_manifest.json')
 
 FILES_MAP = {
     'hero': ['modern-school-students.jpg', 'students-learning-in-classroom-together.jpg', 'diverse-students-teamwork-achievement.jpg'],
@@ -14,57 +20,39 @@ FILES_MAP = {
     'director': ['school-director-professional-portrait.jpg']
 }
 
+
 class Command(BaseCommand):
     help = 'Upload selected media files from front/public to configured S3 bucket (used in production)'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--public', action='store_true', help='Make uploaded objects public (ACL public-read)')
+
     def handle(self, *args, **options):
         if not os.path.exists(FRONT_PUBLIC):
-            self.stderr.write(self.style.ERROR(f'front/public not found at expected path: {FRONT_PUBLIC}'))
-            return
-
-        bucket = os.environ.get('AWS_STORAGE_BUCKET_NAME')
+            raise CommandError(f'front/public not found at expected path: {FRONT_PUBLIC}')
+        bucket = get_bucket()
         if not bucket:
-            self.stderr.write(self.style.ERROR('AWS_STORAGE_BUCKET_NAME not set in environment.'))
-            return
-
-        aws_key = os.environ.get('AWS_ACCESS_KEY_ID')
-        aws_secret = os.environ.get('AWS_SECRET_ACCESS_KEY')
-        region = os.environ.get('AWS_S3_REGION_NAME') or None
+            raise CommandError('AWS_STORAGE_BUCKET_NAME not set in environment.')
 
-        if not aws_key or not aws_secret:
-            self.stderr.write(self.style.ERROR('AWS credentials not found in environment (AWS_ACCESS_KEY_ID/AWS_SECRET_ACCESS_KEY).'))
-            return
-
-        session = boto3.session.Session(
-            aws_access_key_id=aws_key,
-            aws_secret_access_key=aws_secret,
-            region_name=region
-        )
-        s3 = session.client('s3')
-
-        uploaded = 0
-        for folder, files in FILES_MAP.items():
-            for fname in files:
+        files = []
+        for folder, names in FILES_MAP.items():
+            for fname in names:
                 src = os.path.join(FRONT_PUBLIC, fname)
                 if not os.path.exists(src):
                     self.stdout.write(self.style.WARNING(f'File not found, skipping: {src}'))
                     continue
+                files.append((f'{folder}/{fname}', src))
 
-                key = f'{folder}/{fname}'
-                try:
-                    with open(src, 'rb') as f:
-                        s3.put_object(Bucket=bucket, Key=key, Body=f, ACL='public-read', ContentType=self._guess_content_type(fname))
-                    self.stdout.write(self.style.SUCCESS(f'Uploaded {src} -> s3://{bucket}/{key}'))
-                    uploaded += 1
-                except Exception as e:
-                    self.stderr.write(self.style.ERROR(f'Failed to upload {src} -> {key}: {e}'))
-
-        self.stdout.write(self.style.SUCCESS(f'Done. Uploaded {uploaded} files.'))
-
-    def _guess_content_type(self, fname: str) -> str:
-        if fname.lower().endswith('.jpg') or fname.lower().endswith('.jpeg'):
-            return 'image/jpeg'
-        if fname.lower().endswith('.png'):
-            return 'image/png'
-        return 'application/octet-stream'
+        def progress(rel, outcome):
+            self.stdout.write(f'{outcome:9} {rel}')
 
+        result = sync_directory(
+            FRONT_PUBLIC, bucket=bucket, client=shared_client(get_region()), manifest_path=MANIFEST_PATH,
+            extra_args={'ACL': 'public-read'} if options['public'] else None, on_progress=progress, files=files,
+        )
+        for rel, error in result.errors:
+            self.stderr.write(self.style.ERROR(f'Failed to upload {rel}: {error}'))
+        summary = f'Uploaded {result.uploaded} of {result.scanned} files, {result.unchanged} unchanged, {result.failed} failed.'
+        if result.failed:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(f'Done. {summary}'))
@@ -0,0 +1,126 @@
+"""Media file names stored in the database (ImageFields and their variants JSON)."""
+import hashlib
+
+from django.apps import apps
+from django.db import models, transaction
+
+from .cache import mark_changed
+
+MEDIA_APPS = ('content', 'achievements')
+BATCH_SIZE = 500
+# 8-byte digests: a collision only keeps an orphan, it never deletes a referenced file
+DIGEST_SIZE = 8
+
+
+def media_fields():
+    """(model, [ImageField]) of every model in MEDIA_APPS that stores files."""
+    for label in MEDIA_APPS:
+        for model in apps.get_app_config(label).get_models():
+            fields = [f for f in model._meta.fields if isinstance(f, models.ImageField)]
+            if fields:
+                yield model, fields
+
+
+def media_prefixes():
+    """Key prefixes the media fields upload to (their string upload_to), e.g. ['certificates/', 'hero/']."""
+    prefixes = set()
+    for _, fields in media_fields():
+        for field in fields:
+            if isinstance(field.upload_to, str) and field.upload_to:
+                prefixes.add(field.upload_to.rstrip('/') + '/')
+    return sorted(prefixes)
+
+
+def _variant_names(variants):
+    if isinstance(variants, dict):
+        for value in variants.values():
+            yield from _variant_names(value)
+    elif isinstance(variants, str) and variants:
+        yield variants
+
+
+class NameSet:
+    """Set of file names kept as 64-bit digests (about half the memory of a set of the names)."""
+
+    def __init__(self, names=()):
+        self._digests = set()
+        for name in names:
+            self.add(name)
+
+    @staticmethod
+    def _digest(name):
+        return int.from_bytes(hashlib.blake2b(name.encode('utf-8'), digest_size=DIGEST_SIZE).digest(), 'big')
+
+    def add(self, name):
+        self._digests.add(self._digest(name))
+
+    def __contains__(self, name):
+        return self._digest(name) in self._digests
+
+    def __len__(self):
+        return len(self._digests)
+
+
+def referenced_names():
+    """NameSet of every file referenced by a media field or its variants JSON, read in chunks."""
+    names = NameSet()
+    for model, fields in media_fields():
+        field_names = {f.name for f in model._meta.fields}
+        columns = [f.name for f in fields] + [f'{f.name}_variants' for f in fields if f'{f.name}_variants' in field_names]
+        for row in model._default_manager.order_by().values_list(*columns).iterator(chunk_size=2000):
+            for value in row:
+                if isinstance(value, str):
+                    if value:
+                        names.add(value)
+                else:
+                    for name in _variant_names(value):
+                        names.add(name)
+    return names
+
+
+def is_orphan(obj, references, cutoff):
+    """True for a listed object (list_objects dict) nothing references that was last modified before cutoff."""
+    return obj['Key'] not in references and obj['LastModified'] < cutoff
+
+
+def _rename_variants(variants, mapping):
+    if isinstance(variants, dict):
+        return {key: _rename_variants(value, mapping) for key, value in variants.items()}
+    if isinstance(variants, str):
+        return mapping.get(variants, variants)
+    return variants
+
+
+def rename_media(mapping):
+    """Point every ImageField (and its `<name>_variants` JSON) at the new names in mapping.
+
+    mapping is {old name: new name}. Rows are read and written in batches
+    with bulk_update in one transaction; returns {model label: rows updated}.
+    """
+    if not mapping:
+        return {}
+    old_names = list(mapping)
+    updated = {}
+    with transaction.atomic():
+        for model, fields in media_fields():
+            field_names = {f.name for f in model._meta.fields}
+            update_fields = [f.name for f in fields]
+            update_fields += [f'{f.name}_variants' for f in fields if f'{f.name}_variants' in field_names]
+            changed_rows = {}
+            for field in fields:
+                variants_name = f'{field.name}_variants'
+                for start in range(0, len(old_names), BATCH_SIZE):
+                    batch = old_names[start:start + BATCH_SIZE]
+                    rows = model._default_manager.filter(**{f'{field.name}__in': batch}).only(*update_fields).order_by()
+                    for obj in rows:
+                        obj = changed_rows.setdefault(obj.pk, obj)
+                        getattr(obj, field.name).name = mapping[getattr(obj, field.name).name]
+                        if variants_name in field_names:
+                            setattr(obj, variants_name, _rename_variants(getattr(obj, variants_name), mapping))
+            if not changed_rows:
+                continue
+            # bulk_update sends no post_save, so no variant regeneration and an explicit cache bump
+            model._default_manager.bulk_update(list(changed_rows.values()), update_fields, batch_size=BATCH_SIZE)
+            mark_changed(model)
+            updated[model._meta.label] = len(changed_rows)
+    return updated
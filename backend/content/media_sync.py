@@ -0,0 +1,192 @@
+"""Incremental, parallel upload of a media directory to S3 (`manage.py sync_media`).
+
+A JSON manifest next to the synced files remembers size, mtime and S3 ETag of
+every uploaded file. A file whose size and mtime match its manifest entry (and
+whose remote ETag still matches, when the bucket listing is consulted) is
+skipped without being read. Other files are hashed the way S3 computes ETags
+and only uploaded when the remote copy differs. The manifest is saved every
+few seconds and on interruption, so a new run resumes where the last one
+stopped.
+"""
+import json
+import mimetypes
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .s3 import get_bucket, list_objects, local_etag, shared_client, upload_stream
+
+MANIFEST_NAME = '.sync_manifest.json'
+MANIFEST_VERSION = 1
+SAVE_INTERVAL = 5.0
+
+
+class Manifest:
+    """{key: {'size', 'mtime_ns', 'etag'}} for one bucket and prefix, saved atomically."""
+
+    def __init__(self, path, bucket, prefix):
+        self.path = path
+        self.bucket = bucket
+        self.prefix = prefix
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.saved_at = time.monotonic()
+        self.dirty = False
+        try:
+            with open(path, encoding='utf-8') as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        # a manifest written for another bucket or prefix says nothing about this one
+        if data.get('version') == MANIFEST_VERSION and data.get('bucket') == bucket and data.get('prefix') == prefix:
+            self.entries = data.get('files', {})
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def record(self, key, size, mtime_ns, etag):
+        with self.lock:
+            self.entries[key] = {'size': size, 'mtime_ns': mtime_ns, 'etag': etag}
+            self.dirty = True
+
+    def save_if_due(self):
+        if time.monotonic() - self.saved_at >= SAVE_INTERVAL:
+            self.save()
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            data = {'version': MANIFEST_VERSION, 'bucket': self.bucket, 'prefix': self.prefix, 'files': self.entries}
+            tmp = f'{self.path}.tmp'
+            with open(tmp, 'w', encoding='utf-8') as fh:
+                json.dump(data, fh, separators=(',', ':'))
+            os.replace(tmp, self.path)
+            self.dirty = False
+            self.saved_at = time.monotonic()
+
+
+def walk_files(source, skip=()):
+    """Yield (relative posix path, absolute path, stat) of every regular file under source."""
+    stack = [source]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file() and entry.path not in skip:
+                    rel = os.path.relpath(entry.path, source).replace(os.sep, '/')
+                    yield rel, entry.path, entry.stat()
+
+
+class SyncResult:
+    def __init__(self):
+        self.scanned = self.uploaded = self.unchanged = self.failed = 0
+        self.bytes_uploaded = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def mb_per_second(self):
+        return self.bytes_uploaded / (1024 * 1024) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def files_per_second(self):
+        return self.uploaded / self.elapsed if self.elapsed else 0.0
+
+
+def listed_files(files):
+    """(relative path, absolute path, stat) of the given (relative path, absolute path) pairs that exist."""
+    for rel, path in files:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        yield rel, path, stat
+
+
+def sync_directory(source, prefix='', bucket=None, client=None, workers=16, manifest_path=None,
+                   remote=True, dry_run=False, extra_args=None, on_progress=None, files=None):
+    """Upload new and changed files under source to bucket/prefix; returns a SyncResult.
+
+    remote=False trusts the manifest instead of listing the bucket (faster, but
+    does not notice objects deleted or changed on the S3 side). files, a list
+    of (relative path, absolute path) pairs, syncs just those under their
+    relative paths instead of everything under source.
+    """
+    start = time.perf_counter()
+    source = os.path.abspath(source)
+    bucket = bucket or get_bucket()
+    client = client or shared_client()
+    prefix = prefix.strip('/')
+    key_prefix = f'{prefix}/' if prefix else ''
+    manifest_path = os.path.abspath(manifest_path or os.path.join(source, MANIFEST_NAME))
+    manifest = Manifest(manifest_path, bucket, prefix)
+    remote_etags = None
+    if remote:
+        remote_etags = {obj['Key']: obj['ETag'].strip('"') for obj in list_objects(client, bucket, key_prefix)}
+    result = SyncResult()
+
+    def sync_one(rel, path, stat):
+        key = key_prefix + rel
+        etag = local_etag(path)
+        remote_etag = remote_etags.get(key) if remote_etags is not None else (manifest.get(key) or {}).get('etag')
+        if remote_etag == etag:
+            manifest.record(key, stat.st_size, stat.st_mtime_ns, etag)
+            return 'unchanged', 0
+        if dry_run:
+            return 'uploaded', stat.st_size
+        with open(path, 'rb') as fh:
+            upload_stream(fh, key, content_type=mimetypes.guess_type(rel)[0] or 'application/octet-stream',
+                          extra_args=extra_args, client=client, bucket=bucket)
+        manifest.record(key, stat.st_size, stat.st_mtime_ns, etag)
+        return 'uploaded', stat.st_size
+
+    def collect(done):
+        for future in done:
+            rel = futures.pop(future)
+            try:
+                outcome, size = future.result()
+            except Exception as exc:
+                result.failed += 1
+                result.errors.append((rel, str(exc)))
+                continue
+            if outcome == 'uploaded':
+                result.uploaded += 1
+                result.bytes_uploaded += size
+            else:
+                result.unchanged += 1
+            if on_progress:
+                on_progress(rel, outcome)
+        if not dry_run:
+            manifest.save_if_due()
+
+    futures = {}
+    pool = ThreadPoolExecutor(max(1, workers))
+    try:
+        if files is None:
+            entries = walk_files(source, skip={manifest_path, f'{manifest_path}.tmp'})
+        else:
+            entries = listed_files(files)
+        for rel, path, stat in entries:
+            result.scanned += 1
+            key = key_prefix + rel
+            known = manifest.get(key)
+            if (known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns
+                    and (remote_etags is None or remote_etags.get(key) == known['etag'])):
+                result.unchanged += 1
+                continue
+            futures[pool.submit(sync_one, rel, path, stat)] = rel
+            # bound the queue so a huge library is not held in memory at once
+            if len(futures) >= workers * 4:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                collect(done)
+        collect(list(futures))
+    finally:
+        # on Ctrl+C let running uploads finish, drop queued ones and keep everything done so far
+        pool.shutdown(wait=True, cancel_futures=True)
+        if not dry_run:
+            manifest.save()
+        result.elapsed = time.perf_counter() - start
+    return result
@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-18 07:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0002_about_body_color_about_title_color_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100, unique=True, verbose_name='Модель')),
+                ('revision', models.PositiveBigIntegerField(default=0, verbose_name='Ревизия')),
+                ('updated_at', models.DateTimeField(verbose_name='Изменено')),
+            ],
+            options={
+                'verbose_name': 'Ревизия контента',
+                'verbose_name_plural': 'Ревизии контента',
+            },
+        ),
+    ]
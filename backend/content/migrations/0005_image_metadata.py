@@ -0,0 +1,113 @@
+# Generated by Django 6.0 on 2026-10-18 08:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0004_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='about',
+            name='image_color',
+            field=models.CharField(blank=True, editable=False, max_length=7, verbose_name='Основной цвет изображения'),
+        ),
+        migrations.AddField(
+            model_name='about',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота изображения'),
+        ),
+        migrations.AddField(
+            model_name='about',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False, verbose_name='Превью изображения (LQIP)'),
+        ),
+        migrations.AddField(
+            model_name='about',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина изображения'),
+        ),
+        migrations.AddField(
+            model_name='director',
+            name='image_color',
+            field=models.CharField(blank=True, editable=False, max_length=7, verbose_name='Основной цвет фото'),
+        ),
+        migrations.AddField(
+            model_name='director',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота фото'),
+        ),
+        migrations.AddField(
+            model_name='director',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False, verbose_name='Превью фото (LQIP)'),
+        ),
+        migrations.AddField(
+            model_name='director',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина фото'),
+        ),
+        migrations.AddField(
+            model_name='header',
+            name='logo_color',
+            field=models.CharField(blank=True, editable=False, max_length=7, verbose_name='Основной цвет логотипа'),
+        ),
+        migrations.AddField(
+            model_name='header',
+            name='logo_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота логотипа'),
+        ),
+        migrations.AddField(
+            model_name='header',
+            name='logo_placeholder',
+            field=models.TextField(blank=True, editable=False, verbose_name='Превью логотипа (LQIP)'),
+        ),
+        migrations.AddField(
+            model_name='header',
+            name='logo_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина логотипа'),
+        ),
+        migrations.AddField(
+            model_name='heroslide',
+            name='image_color',
+            field=models.CharField(blank=True, editable=False, max_length=7, verbose_name='Основной цвет изображения'),
+        ),
+        migrations.AddField(
+            model_name='heroslide',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота изображения'),
+        ),
+        migrations.AddField(
+            model_name='heroslide',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False, verbose_name='Превью изображения (LQIP)'),
+        ),
+        migrations.AddField(
+            model_name='heroslide',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина изображения'),
+        ),
+        migrations.AddField(
+            model_name='imageblock',
+            name='image_color',
+            field=models.CharField(blank=True, editable=False, max_length=7, verbose_name='Основной цвет изображения'),
+        ),
+        migrations.AddField(
+            model_name='imageblock',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота изображения'),
+        ),
+        migrations.AddField(
+            model_name='imageblock',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False, verbose_name='Превью изображения (LQIP)'),
+        ),
+        migrations.AddField(
+            model_name='imageblock',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина изображения'),
+        ),
+    ]
@@ -15,6 +15,11 @@ class NavLink(models.Model):
 
 class Header(models.Model):
     logo = models.ImageField("Логотип", upload_to='header/', blank=True, null=True)
+    logo_variants = models.JSONField("Варианты логотипа", default=dict, blank=True, editable=False)
+    logo_width = models.PositiveIntegerField("Ширина логотипа", null=True, blank=True, editable=False)
+    logo_height = models.PositiveIntegerField("Высота логотипа", null=True, blank=True, editable=False)
+    logo_color = models.CharField("Основной цвет логотипа", max_length=7, blank=True, editable=False)
+    logo_placeholder = models.TextField("Превью логотипа (LQIP)", blank=True, editable=False)
     phone = models.CharField("Телефон", max_length=50, blank=True)
     email = models.CharField("Email", max_length=200, blank=True)
     nav_links = models.ManyToManyField(NavLink, blank=True)
@@ -30,6 +35,11 @@ class HeroSlide(models.Model):
     title = models.CharField("Заголовок", max_length=255, blank=True)
     subtitle = models.CharField("Подзаголовок", max_length=255, blank=True)
     image = models.ImageField("Изображение", upload_to='hero/')
+    image_variants = models.JSONField("Варианты изображения", default=dict, blank=True, editable=False)
+    image_width = models.PositiveIntegerField("Ширина изображения", null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField("Высота изображения", null=True, blank=True, editable=False)
+    image_color = models.CharField("Основной цвет изображения", max_length=7, blank=True, editable=False)
+    image_placeholder = models.TextField("Превью изображения (LQIP)", blank=True, editable=False)
     order = models.IntegerField("Порядок", default=0)
 
     class Meta:
@@ -44,6 +54,11 @@ class About(models.Model):
     title = models.CharField("Заголовок", max_length=255)
     body = models.TextField("Текст")
     image = models.ImageField("Изображение", upload_to='about/', blank=True, null=True)
+    image_variants = models.JSONField("Варианты изображения", default=dict, blank=True, editable=False)
+    image_width = models.PositiveIntegerField("Ширина изображения", null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField("Высота изображения", null=True, blank=True, editable=False)
+    image_color = models.CharField("Основной цвет изображения", max_length=7, blank=True, editable=False)
+    image_placeholder = models.TextField("Превью изображения (LQIP)", blank=True, editable=False)
     # цвет заголовка и тела (например, #000000)
     title_color = models.CharField("Цвет заголовка", max_length=7, blank=True, default='#000000')
     body_color = models.CharField("Цвет текста", max_length=7, blank=True, default='#333333')
@@ -73,6 +88,11 @@ class Director(models.Model):
     title = models.CharField("Должность", max_length=200, blank=True)
     bio = models.TextField("Биография", blank=True)
     image = models.ImageField("Фото", upload_to='director/', blank=True, null=True)
+    image_variants = models.JSONField("Варианты фото", default=dict, blank=True, editable=False)
+    image_width = models.PositiveIntegerField("Ширина фото", null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField("Высота фото", null=True, blank=True, editable=False)
+    image_color = models.CharField("Основной цвет фото", max_length=7, blank=True, editable=False)
+    image_placeholder = models.TextField("Превью фото (LQIP)", blank=True, editable=False)
     # цвета для имени/биографии
     name_color = models.CharField("Цвет имени", max_length=7, blank=True, default='#000000')
     bio_color = models.CharField("Цвет биографии", max_length=7, blank=True, default='#333333')
@@ -127,6 +147,11 @@ class Page(models.Model):
 class ImageBlock(models.Model):
     page = models.ForeignKey(Page, related_name='images', on_delete=models.CASCADE)
     image = models.ImageField("Изображение", upload_to='images/')
+    image_variants = models.JSONField("Варианты изображения", default=dict, blank=True, editable=False)
+    image_width = models.PositiveIntegerField("Ширина изображения", null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField("Высота изображения", null=True, blank=True, editable=False)
+    image_color = models.CharField("Основной цвет изображения", max_length=7, blank=True, editable=False)
+    image_placeholder = models.TextField("Превью изображения (LQIP)", blank=True, editable=False)
     caption = models.CharField("Подпись", max_length=255, blank=True)
     alt = models.CharField("Alt текст", max_length=255, blank=True)
     order = models.IntegerField("Порядок", default=0)
@@ -138,3 +163,16 @@ class ImageBlock(models.Model):
 
     def __str__(self):
         return self.caption or f"Image {self.pk}"
+
+class ContentRevision(models.Model):
+    """Write counter and last change time per model, bumped by signals (see content/cache.py)."""
+    model = models.CharField("Модель", max_length=100, unique=True)
+    revision = models.PositiveBigIntegerField("Ревизия", default=0)
+    updated_at = models.DateTimeField("Изменено")
+
+    class Meta:
+        verbose_name = 'Ревизия контента'
+        verbose_name_plural = 'Ревизии контента'
+
+    def __str__(self):
+        return f"{self.model} #{self.revision}"
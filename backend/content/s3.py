@@ -0,0 +1,344 @@
+"""S3 access shared by the admin, background jobs, management commands and tools/.
+
+`shared_client()` returns one boto3 client per process and configuration,
+created on first use. botocore clients are thread-safe and keep a urllib3
+connection pool, so reusing one client keeps TLS connections alive across
+uploads, requests and threads instead of building a session per file.
+
+Everything is configured from the environment, so the standalone scripts in
+tools/ can use this module without Django:
+
+AWS_S3_MAX_POOL_CONNECTIONS  connections kept per client (default 50)
+AWS_S3_MAX_ATTEMPTS          total attempts per call incl. retries (default 5)
+AWS_S3_RETRY_MODE            standard | adaptive | legacy (default standard)
+AWS_S3_CONNECT_TIMEOUT       seconds (default 5)
+AWS_S3_READ_TIMEOUT          seconds (default 60)
+AWS_S3_ENDPOINT_URL          S3-compatible server, e.g. a local MinIO
+AWS_S3_MULTIPART_THRESHOLD_MB  uploads above this use multipart (default 16)
+AWS_S3_MULTIPART_CHUNK_MB      part size, at least 5 (default 8)
+AWS_S3_UPLOAD_CONCURRENCY      parts in flight per upload (default 4)
+"""
+import hashlib
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+DEFAULTS = {
+    'AWS_S3_MAX_POOL_CONNECTIONS': '50',
+    'AWS_S3_MAX_ATTEMPTS': '5',
+    'AWS_S3_RETRY_MODE': 'standard',
+    'AWS_S3_CONNECT_TIMEOUT': '5',
+    'AWS_S3_READ_TIMEOUT': '60',
+    'AWS_S3_MULTIPART_THRESHOLD_MB': '16',
+    'AWS_S3_MULTIPART_CHUNK_MB': '8',
+    'AWS_S3_UPLOAD_CONCURRENCY': '4',
+}
+MB = 1024 * 1024
+# S3 rejects parts smaller than this (except the last one)
+MIN_PART_SIZE = 5 * MB
+# largest object copy_object can copy in one request; bigger ones need a multipart copy
+MAX_COPY_SIZE = 5 * 1024 * MB
+COPY_PART_SIZE = 512 * MB
+# keys per delete_objects request
+DELETE_BATCH = 1000
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def _env(name):
+    return os.environ.get(name) or DEFAULTS.get(name)
+
+
+def get_bucket():
+    return os.environ.get('AWS_STORAGE_BUCKET_NAME')
+
+
+def get_region():
+    return (os.environ.get('AWS_S3_REGION_NAME') or os.environ.get('AWS_REGION')
+            or os.environ.get('AWS_DEFAULT_REGION') or None)
+
+
+def client_options():
+    """Pool, retry and timeout options currently configured."""
+    return {
+        'max_pool_connections': int(_env('AWS_S3_MAX_POOL_CONNECTIONS')),
+        'max_attempts': int(_env('AWS_S3_MAX_ATTEMPTS')),
+        'retry_mode': _env('AWS_S3_RETRY_MODE'),
+        'connect_timeout': float(_env('AWS_S3_CONNECT_TIMEOUT')),
+        'read_timeout': float(_env('AWS_S3_READ_TIMEOUT')),
+        'endpoint_url': os.environ.get('AWS_S3_ENDPOINT_URL') or None,
+    }
+
+
+def transfer_options():
+    """Multipart threshold, part size and parts in flight for upload_stream()."""
+    return {
+        'threshold': int(float(_env('AWS_S3_MULTIPART_THRESHOLD_MB')) * MB),
+        'part_size': max(MIN_PART_SIZE, int(float(_env('AWS_S3_MULTIPART_CHUNK_MB')) * MB)),
+        'concurrency': max(1, int(_env('AWS_S3_UPLOAD_CONCURRENCY'))),
+    }
+
+
+def _create_client(region, options, access_key, secret_key):
+    import boto3
+    from botocore.config import Config
+
+    config = Config(
+        max_pool_connections=options['max_pool_connections'],
+        retries={'total_max_attempts': options['max_attempts'], 'mode': options['retry_mode']},
+        connect_timeout=options['connect_timeout'],
+        read_timeout=options['read_timeout'],
+        tcp_keepalive=True,
+    )
+    # explicit keys when set, otherwise boto3's default chain (profile, IAM role)
+    session = boto3.session.Session(
+        aws_access_key_id=access_key, aws_secret_access_key=secret_key, region_name=region,
+    )
+    return session.client('s3', endpoint_url=options['endpoint_url'], config=config)
+
+
+def shared_client(region=None):
+    """The process-wide S3 client for region (default from AWS_S3_REGION_NAME/AWS_REGION)."""
+    region = region or get_region()
+    options = client_options()
+    access_key = os.environ.get('AWS_ACCESS_KEY_ID')
+    secret_key = os.environ.get('AWS_SECRET_ACCESS_KEY')
+    # changed settings or rotated keys get a new client
+    key = (region, access_key, secret_key, tuple(sorted(options.items())))
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = _create_client(region, options, access_key, secret_key)
+    return client
+
+
+def shared_resource(region=None):
+    """A boto3 S3 resource whose calls go through shared_client(region).
+
+    For code written against resources (django-storages). Resources are not
+    thread-safe, so keep one per thread; the client underneath is shared.
+    """
+    import boto3
+    client = shared_client(region)
+    session = boto3.session.Session(
+        aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID'),
+        aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY'),
+        region_name=client.meta.region_name,
+    )
+    resource = session.resource('s3', endpoint_url=client_options()['endpoint_url'])
+    # Bucket/Object sub-resources inherit meta.client, so every call uses the pooled client
+    resource.meta.client = client
+    return resource
+
+
+def _stream_size(fileobj):
+    try:
+        return os.fstat(fileobj.fileno()).st_size - fileobj.tell()
+    except (AttributeError, OSError, ValueError):
+        pass
+    start = fileobj.tell()
+    end = fileobj.seek(0, os.SEEK_END)
+    fileobj.seek(start)
+    return end - start
+
+
+def _upload_part(client, bucket, key, upload_id, number, body):
+    response = client.upload_part(Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=body)
+    return {'PartNumber': number, 'ETag': response['ETag']}
+
+
+def upload_stream(fileobj, key, content_type=None, extra_args=None, client=None, bucket=None,
+                  threshold=None, part_size=None, concurrency=None):
+    """Upload a seekable binary file object to S3 without reading it into memory.
+
+    Up to the multipart threshold the file object is handed to put_object, which
+    streams it. Larger files go up as a multipart upload read one part at a time
+    with at most `concurrency` parts in flight, so memory stays around
+    (concurrency + 1) * part_size whatever the file size. A failed multipart
+    upload is aborted so no orphaned parts are billed.
+    """
+    options = transfer_options()
+    threshold = options['threshold'] if threshold is None else threshold
+    part_size = options['part_size'] if part_size is None else part_size
+    concurrency = options['concurrency'] if concurrency is None else concurrency
+    client = client or shared_client()
+    bucket = bucket or get_bucket()
+    args = dict(extra_args or {})
+    if content_type:
+        args['ContentType'] = content_type
+
+    if _stream_size(fileobj) <= threshold:
+        client.put_object(Bucket=bucket, Key=key, Body=fileobj, **args)
+        return {'key': key, 'parts': 0}
+
+    upload_id = client.create_multipart_upload(Bucket=bucket, Key=key, **args)['UploadId']
+    parts = []
+    try:
+        with ThreadPoolExecutor(concurrency) as pool:
+            pending = set()
+            number = 0
+            while True:
+                chunk = fileobj.read(part_size)
+                if not chunk:
+                    break
+                number += 1
+                pending.add(pool.submit(_upload_part, client, bucket, key, upload_id, number, chunk))
+                del chunk
+                if len(pending) >= concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    parts.extend(future.result() for future in done)
+            parts.extend(future.result() for future in pending)
+        parts.sort(key=lambda part: part['PartNumber'])
+        client.complete_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={'Parts': parts})
+    except BaseException:
+        client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+    return {'key': key, 'parts': len(parts)}
+
+
+def local_etag(path, threshold=None, part_size=None):
+    """The ETag S3 reports for this file when it was uploaded by upload_stream().
+
+    MD5 of the content for a single PUT; for a multipart upload the MD5 of the
+    concatenated part MD5s plus "-<parts>". The file is read in parts, not at once.
+    """
+    options = transfer_options()
+    threshold = options['threshold'] if threshold is None else threshold
+    part_size = options['part_size'] if part_size is None else part_size
+    size = os.path.getsize(path)
+    digests = []
+    with open(path, 'rb') as fh:
+        if size <= threshold:
+            md5 = hashlib.md5(usedforsecurity=False)
+            for chunk in iter(lambda: fh.read(MB), b''):
+                md5.update(chunk)
+            return md5.hexdigest()
+        while True:
+            md5 = hashlib.md5(usedforsecurity=False)
+            remaining = part_size
+            while remaining:
+                chunk = fh.read(min(MB, remaining))
+                if not chunk:
+                    break
+                md5.update(chunk)
+                remaining -= len(chunk)
+            if remaining == part_size:
+                break
+            digests.append(md5.digest())
+    return f'{hashlib.md5(b"".join(digests), usedforsecurity=False).hexdigest()}-{len(digests)}'
+
+
+def object_exists(client, bucket, key):
+    try:
+        client.head_object(Bucket=bucket, Key=key)
+    except client.exceptions.ClientError as exc:
+        if exc.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            return False
+        raise
+    return True
+
+
+def list_objects(client, bucket, prefix=''):
+    """Yield every object under prefix (dicts with Key, ETag, Size, LastModified), a page at a time."""
+    kwargs = {'Bucket': bucket, 'Prefix': prefix}
+    while True:
+        page = client.list_objects_v2(**kwargs)
+        yield from page.get('Contents', ())
+        if not page.get('IsTruncated'):
+            return
+        kwargs['ContinuationToken'] = page['NextContinuationToken']
+
+
+def _copy_part(client, bucket, key, upload_id, number, source, byte_range):
+    response = client.upload_part_copy(Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number,
+                                       CopySource=source, CopySourceRange=byte_range)
+    return {'PartNumber': number, 'ETag': response['CopyPartResult']['ETag']}
+
+
+def copy_object(client, bucket, src, dst, size=None, part_size=COPY_PART_SIZE, concurrency=None):
+    """Server-side copy of bucket/src to bucket/dst, as a multipart copy above 5 GB."""
+    source = {'Bucket': bucket, 'Key': src}
+    if size is None:
+        size = client.head_object(Bucket=bucket, Key=src)['ContentLength']
+    if size <= MAX_COPY_SIZE:
+        # copy without ACL to respect BucketOwnerEnforced; metadata is copied along
+        client.copy_object(Bucket=bucket, CopySource=source, Key=dst)
+        return
+    # a multipart upload does not inherit the source headers, so pass them on
+    head = client.head_object(Bucket=bucket, Key=src)
+    args = {name: head[name] for name in ('ContentType', 'CacheControl', 'ContentDisposition',
+                                          'ContentEncoding', 'Metadata') if head.get(name)}
+    upload_id = client.create_multipart_upload(Bucket=bucket, Key=dst, **args)['UploadId']
+    ranges = [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)]
+    try:
+        workers = concurrency or transfer_options()['concurrency']
+        with ThreadPoolExecutor(workers) as pool:
+            parts = list(pool.map(
+                lambda item: _copy_part(client, bucket, dst, upload_id, item[0], source, f'bytes={item[1][0]}-{item[1][1]}'),
+                enumerate(ranges, start=1),
+            ))
+        client.complete_multipart_upload(Bucket=bucket, Key=dst, UploadId=upload_id, MultipartUpload={'Parts': parts})
+    except BaseException:
+        client.abort_multipart_upload(Bucket=bucket, Key=dst, UploadId=upload_id)
+        raise
+
+
+def copy_objects(client, bucket, moves, workers=16, on_done=None):
+    """Copy [(src, dst, size)] in parallel; returns ([(src, dst)] copied, [(src, dst, error)] failed)."""
+    copied, failed = [], []
+
+    def copy(move):
+        src, dst, size = move
+        copy_object(client, bucket, src, dst, size)
+        return src, dst
+
+    with ThreadPoolExecutor(max(1, workers)) as pool:
+        futures = {pool.submit(copy, move): move for move in moves}
+        for future in as_completed(futures):
+            src, dst, _ = futures[future]
+            try:
+                future.result()
+            except Exception as exc:
+                failed.append((src, dst, exc))
+            else:
+                copied.append((src, dst))
+            if on_done:
+                on_done(src, dst, future.exception())
+    return copied, failed
+
+
+def delete_keys(client, bucket, keys):
+    """Delete keys with batched delete_objects calls; returns [(key, error message)] not deleted."""
+    keys = list(keys)
+    errors = []
+    for start in range(0, len(keys), DELETE_BATCH):
+        batch = keys[start:start + DELETE_BATCH]
+        response = client.delete_objects(
+            Bucket=bucket, Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True},
+        )
+        errors.extend((e['Key'], e.get('Message') or e.get('Code', '')) for e in response.get('Errors', ()))
+    return errors
+
+
+def get_s3_client():
+    """Shared S3 client from the AWS_* env vars, or None when S3 is not configured."""
+    if not s3_configured():
+        return None
+    return shared_client()
+
+
+def reset_clients():
+    with _lock:
+        _clients.clear()
+
+
+def s3_configured():
+    return bool(os.environ.get('AWS_ACCESS_KEY_ID') and os.environ.get('AWS_SECRET_ACCESS_KEY') and get_bucket())
+
+
+# a forked child (gunicorn, the job pool) must not share the parent's pooled sockets
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_clients.clear)
@@ -0,0 +1,30 @@
+"""django-storages S3 backends for media that use the shared S3 client (see content/s3.py)."""
+from storages.backends.s3boto3 import S3Boto3Storage
+
+from .s3 import shared_resource
+from .storage import IMMUTABLE_CACHE_CONTROL, ContentAddressedMixin
+
+
+class SharedClientMixin:
+    """Storage mixin: make calls through content.s3.shared_client instead of a client of its own."""
+
+    @property
+    def connection(self):
+        connection = getattr(self._connections, 'connection', None)
+        if connection is None:
+            connection = self._connections.connection = shared_resource(self.region_name)
+        return connection
+
+
+class SharedClientS3Storage(SharedClientMixin, S3Boto3Storage):
+    pass
+
+
+class ContentAddressedS3Storage(ContentAddressedMixin, SharedClientMixin, S3Boto3Storage):
+    # a key never gets new content, so there is nothing to protect from overwriting
+    file_overwrite = True
+
+    def get_object_parameters(self, name):
+        params = super().get_object_parameters(name)
+        params['CacheControl'] = IMMUTABLE_CACHE_CONTROL
+        return params
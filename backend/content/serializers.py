@@ -1,38 +1,8 @@
 from rest_framework import serializers
-from django.conf import settings
 from .models import (
     NavLink, Header, HeroSlide, About, Stat, Director, ContactInfo, Footer, Page, ImageBlock
 )
-
-
-def _build_image_url(obj, field_name):
-    """Return absolute URL for ImageField on obj, with safe fallbacks."""
-    try:
-        field = getattr(obj, field_name)
-    except Exception:
-        return ''
-    if not field:
-        return ''
-    # If storage provides .url, use it
-    try:
-        url = field.url
-        if url:
-            return url
-    except Exception:
-        pass
-    # Fallback: build from storage name using custom domain or MEDIA_URL
-    name = getattr(field, 'name', None) or str(field)
-    if not name:
-        return ''
-    # prefer custom domain (no schema)
-    custom = getattr(settings, 'AWS_S3_CUSTOM_DOMAIN', None)
-    if custom:
-        return f'https://{custom.rstrip("/")}/{name.lstrip("/")}'
-    media = getattr(settings, 'MEDIA_URL', None) or '/media/'
-    if media.startswith('http'):
-        return f"{media.rstrip('/')}/{name.lstrip('/')}"
-    # relative MEDIA_URL
-    return f"{media.rstrip('/')}/{name.lstrip('/')}"
+from .image_urls import image_url, image_srcset
 
 
 class NavLinkSerializer(serializers.ModelSerializer):
@@ -42,34 +12,46 @@ class NavLinkSerializer(serializers.ModelSerializer):
 
 class HeaderSerializer(serializers.ModelSerializer):
     logo = serializers.SerializerMethodField()
+    logo_srcset = serializers.SerializerMethodField()
 
     def get_logo(self, obj):
-        return _build_image_url(obj, 'logo')
+        return image_url(obj, 'logo', self.context.get('request'))
+
+    def get_logo_srcset(self, obj):
+        return image_srcset(obj, 'logo', self.context.get('request'))
 
     nav_links = NavLinkSerializer(many=True)
     class Meta:
         model = Header
-        fields = ['id', 'logo', 'phone', 'email', 'nav_links']
+        fields = ['id', 'logo', 'logo_srcset', 'logo_width', 'logo_height', 'logo_color', 'logo_placeholder', 'phone', 'email', 'nav_links']
 
 class HeroSlideSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
 
     def get_image(self, obj):
-        return _build_image_url(obj, 'image')
+        return image_url(obj, 'image', self.context.get('request'))
+
+    def get_image_srcset(self, obj):
+        return image_srcset(obj, 'image', self.context.get('request'))
 
     class Meta:
         model = HeroSlide
-        fields = ['id', 'title', 'subtitle', 'image', 'order']
+        fields = ['id', 'title', 'subtitle', 'image', 'image_srcset', 'image_width', 'image_height', 'image_color', 'image_placeholder', 'order']
 
 class AboutSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
 
     def get_image(self, obj):
-        return _build_image_url(obj, 'image')
+        return image_url(obj, 'image', self.context.get('request'))
+
+    def get_image_srcset(self, obj):
+        return image_srcset(obj, 'image', self.context.get('request'))
 
     class Meta:
         model = About
-        fields = ['id', 'title', 'body', 'image', 'title_color', 'body_color']
+        fields = ['id', 'title', 'body', 'image', 'image_srcset', 'image_width', 'image_height', 'image_color', 'image_placeholder', 'title_color', 'body_color']
 
 class StatSerializer(serializers.ModelSerializer):
     class Meta:
@@ -78,13 +60,17 @@ class StatSerializer(serializers.ModelSerializer):
 
 class DirectorSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
 
     def get_image(self, obj):
-        return _build_image_url(obj, 'image')
+        return image_url(obj, 'image', self.context.get('request'))
+
+    def get_image_srcset(self, obj):
+        return image_srcset(obj, 'image', self.context.get('request'))
 
     class Meta:
         model = Director
-        fields = ['id', 'name', 'title', 'bio', 'image', 'name_color', 'bio_color']
+        fields = ['id', 'name', 'title', 'bio', 'image', 'image_srcset', 'image_width', 'image_height', 'image_color', 'image_placeholder', 'name_color', 'bio_color']
 
 class ContactInfoSerializer(serializers.ModelSerializer):
     class Meta:
@@ -98,13 +84,17 @@ class FooterSerializer(serializers.ModelSerializer):
 
 class ImageBlockSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
 
     def get_image(self, obj):
-        return _build_image_url(obj, 'image')
+        return image_url(obj, 'image', self.context.get('request'))
+
+    def get_image_srcset(self, obj):
+        return image_srcset(obj, 'image', self.context.get('request'))
 
     class Meta:
         model = ImageBlock
-        fields = ['id', 'image', 'caption', 'alt', 'order']
+        fields = ['id', 'image', 'image_srcset', 'image_width', 'image_height', 'image_color', 'image_placeholder', 'caption', 'alt', 'order']
 
 class PageSerializer(serializers.ModelSerializer):
     images = ImageBlockSerializer(many=True, read_only=True)
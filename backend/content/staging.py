@@ -0,0 +1,101 @@
+"""Files handed from a web request to a background job.
+
+`run_jobs` is its own Procfile process, on Railway/Heroku-style hosts a
+separate container, so it cannot read a file the web container wrote to its
+local disk. Uploads are therefore staged in the S3 bucket under
+JOBS_STAGING_PREFIX, unless JOBS_STAGING_DIR is visible to the jobs: in eager
+mode (they run in the request) or with JOBS_STAGING_SHARED=True (a shared
+volume, or the worker running in the web container).
+
+A staged file is referred to by a string, `local:<name>` or `s3:<key>`, that
+goes into the job payload.
+"""
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .s3 import get_bucket, get_s3_client, upload_stream
+from .storage import content_hash
+
+LOCAL = 'local:'
+S3 = 's3:'
+
+
+def local_staging():
+    from jobs.queue import is_eager
+    return is_eager() or getattr(settings, 'JOBS_STAGING_SHARED', False)
+
+
+def _local_path(name):
+    # an absolute name (payloads queued before staging refs existed) is kept as it is
+    return os.path.join(settings.JOBS_STAGING_DIR, name)
+
+
+def stage(uploaded_file, suffix='', content_type=None, extra_args=None, digest=None):
+    """Stage an upload for a job; returns (ref, sha256 hex of the content).
+
+    content_type and extra_args (e.g. CacheControl) are set on an S3 staged
+    object, so a server-side copy of it carries them to the final key. A
+    digest the caller already computed saves hashing the file again.
+    """
+    name = f'{uuid.uuid4().hex}{suffix}'
+    try:
+        uploaded_file.seek(0)
+    except Exception:
+        pass
+    if local_staging():
+        os.makedirs(settings.JOBS_STAGING_DIR, exist_ok=True)
+        path = _local_path(name)
+
+        def copied():
+            with open(path, 'wb') as out:
+                for chunk in uploaded_file.chunks():
+                    out.write(chunk)
+                    yield chunk
+
+        # hashed while copying, so the file is read once
+        return LOCAL + name, content_hash(copied())
+
+    client = get_s3_client()
+    if client is None:
+        raise ImproperlyConfigured('Background jobs need S3 (AWS_* variables) to receive uploads, '
+                                   'or JOBS_STAGING_SHARED=True when the worker can read JOBS_STAGING_DIR')
+    if digest is None:
+        digest = content_hash(uploaded_file.chunks())
+        uploaded_file.seek(0)
+    key = f'{settings.JOBS_STAGING_PREFIX}{name}'
+    upload_stream(uploaded_file, key, content_type=content_type, extra_args=extra_args, client=client)
+    return S3 + key, digest
+
+
+def staged_key(ref):
+    """S3 key of a staged object, or None for a local file."""
+    return ref[len(S3):] if ref.startswith(S3) else None
+
+
+@contextmanager
+def open_staged(ref):
+    """Binary, seekable file object of a staged file (an S3 one is downloaded to a temporary file)."""
+    key = staged_key(ref)
+    if key is None:
+        with open(_local_path(ref[len(LOCAL):]), 'rb') as fh:
+            yield fh
+        return
+    with tempfile.TemporaryFile() as fh:
+        get_s3_client().download_fileobj(get_bucket(), key, fh)
+        fh.seek(0)
+        yield fh
+
+
+def discard(ref):
+    key = staged_key(ref)
+    if key is not None:
+        get_s3_client().delete_object(Bucket=get_bucket(), Key=key)
+        return
+    path = _local_path(ref[len(LOCAL):])
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,60 @@
+"""Content-addressed media storage (MEDIA_CONTENT_ADDRESSED=True).
+
+A file is stored under `<upload_to>/<sha256 prefix><ext>`, so its key changes
+whenever its bytes do. Saving bytes that are already stored returns the
+existing name without writing anything, and because a key never gets new
+content the objects can be cached forever (IMMUTABLE_CACHE_CONTROL).
+
+The S3 backend is in content/s3_storage.py, so the admin can import these
+helpers without importing django-storages and boto3.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# 128 bits of SHA-256: collisions are not a practical concern for a media library
+HASH_LENGTH = 32
+
+
+def content_addressed():
+    return getattr(settings, 'MEDIA_CONTENT_ADDRESSED', False)
+
+
+def content_hash(chunks):
+    """Hex SHA-256 of an iterable of byte chunks."""
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hashed_name(name, digest):
+    """`dir/photo.JPG` + digest -> `dir/<digest prefix>.jpg`."""
+    dirname = os.path.dirname(name.replace('\\', '/'))
+    ext = os.path.splitext(name)[1].lower()
+    filename = f'{digest[:HASH_LENGTH]}{ext}'
+    return f'{dirname}/{filename}' if dirname else filename
+
+
+class ContentAddressedMixin:
+    """Storage mixin: save() names files by their content hash and skips existing content."""
+    content_addressed = True
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        # File.chunks() rewinds first, so the content can be read again by super().save()
+        name = hashed_name(name, content_hash(content.chunks()))
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+class ContentAddressedFileSystemStorage(ContentAddressedMixin, FileSystemStorage):
+    pass
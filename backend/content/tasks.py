@@ -0,0 +1,73 @@
+"""Background job handlers for image processing and S3 work (see jobs/queue.py)."""
+from django.apps import apps
+from django.core.management import call_command
+
+from jobs.models import Job
+from jobs.queue import enqueue, register
+from .images import image_fields, update_instance_variants
+from .media_refs import media_fields
+from .s3 import copy_object, get_bucket, get_s3_client, object_exists, upload_stream
+from .staging import LOCAL, discard, open_staged, staged_key
+
+
+def _upload_pending(key):
+    return Job.objects.filter(name='media.upload_to_s3', status__in=(Job.QUEUED, Job.RUNNING), payload__key=key).exists()
+
+
+@register('images.generate_variants')
+def generate_variants(payload):
+    model = apps.get_model(payload['model'])
+    obj = model._default_manager.filter(pk=payload['pk']).first()
+    if obj is None:
+        return {'skipped': 'deleted'}
+    try:
+        updated = update_instance_variants(obj, force=payload.get('force', False), missing_ok=payload.get('missing_ok', False))
+    except FileNotFoundError as e:
+        # the upload job queues the variants again once the file is in the bucket
+        if _upload_pending(e.args[0]):
+            return {'skipped': 'upload pending'}
+        raise
+    return {'updated': updated}
+
+
+def _queue_variants_of(key):
+    """Queue variants for every row whose image field points at key (just uploaded)."""
+    for model, fields in media_fields():
+        for field in set(fields) & set(image_fields(model)):
+            for pk in model._default_manager.filter(**{field.name: key}).values_list('pk', flat=True):
+                enqueue('images.generate_variants', {'model': model._meta.label_lower, 'pk': pk})
+
+
+@register('media.upload_to_s3')
+def upload_to_s3(payload):
+    """Move a file staged by the admin to its S3 key and drop the staged copy.
+
+    A file staged in the bucket is copied server side (its ContentType and
+    CacheControl were set when staging); a local one is streamed (multipart
+    when large). With skip_existing (content-addressed keys) an object already
+    under the key has the same bytes, so it is reused instead.
+    """
+    # payloads queued before staging refs carry the local path
+    ref = payload.get('staged') or LOCAL + payload['path']
+    s3 = get_s3_client()
+    if s3 is None:
+        raise RuntimeError('S3 client or bucket not configured')
+    if payload.get('skip_existing') and object_exists(s3, get_bucket(), payload['key']):
+        discard(ref)
+        return {'key': payload['key'], 'parts': 0, 'deduplicated': True}
+    if staged_key(ref):
+        copy_object(s3, get_bucket(), staged_key(ref), payload['key'])
+        result = {'key': payload['key'], 'parts': 0, 'copied': True}
+    else:
+        extra_args = {'CacheControl': payload['cache_control']} if payload.get('cache_control') else None
+        with open_staged(ref) as fh:
+            result = upload_stream(fh, payload['key'], content_type=payload['content_type'], extra_args=extra_args, client=s3)
+    discard(ref)
+    _queue_variants_of(payload['key'])
+    return result
+
+
+@register('media.upload_media_to_s3')
+def upload_media_to_s3(payload):
+    call_command('upload_media_to_s3')
+    return {}
@@ -1,9 +1,35 @@
+import contextlib
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import tracemalloc
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 from django.urls import reverse
-from .models import HeroSlide, Stat
+from .cache import cache_stats, touch_revision
+from .image_urls import resolve_image_url
+from .models import HeroSlide, Stat, About, Director, Header, NavLink, Page, ImageBlock
 
 class ContentAPITest(APITestCase):
     def setUp(self):
+        cache.clear()
         HeroSlide.objects.create(title='Slide 1', subtitle='Sub 1', image='hero/1.jpg', order=1)
         HeroSlide.objects.create(title='Slide 2', subtitle='Sub 2', image='hero/2.jpg', order=2)
         Stat.objects.create(number='100', label='Students', order=1)
@@ -13,6 +39,7 @@ class ContentAPITest(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.json()), 2)
+        self.assertEqual(response.json()[0]['image'], 'http://testserver/media/hero/1.jpg')
 
     def test_stats_list(self):
         url = '/api/content/stats/'
@@ -20,3 +47,1009 @@ class ContentAPITest(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.json()), 1)
 
+
+class HomeAPITest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        HeroSlide.objects.create(title='Slide 1', image='hero/1.jpg', order=1)
+        Stat.objects.create(number='100', label='Students', order=1)
+        About.objects.create(title='About', body='Text')
+        Director.objects.create(name='Old')
+        Director.objects.create(name='New')
+        header = Header.objects.create(phone='123')
+        header.nav_links.add(NavLink.objects.create(name='Home', href='/'))
+        page = Page.objects.create(slug='p', title='P')
+        ImageBlock.objects.create(page=page, image='images/1.jpg')
+
+    def test_home_returns_all_sections(self):
+        response = self.client.get('/api/content/home/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['hero_slides']), 1)
+        self.assertEqual(len(data['stats']), 1)
+        self.assertEqual(data['about']['title'], 'About')
+        self.assertEqual(data['director']['name'], 'New')
+        self.assertEqual(len(data['header']['nav_links']), 1)
+        self.assertIsNone(data['contact'])
+        self.assertEqual(len(data['pages'][0]['images']), 1)
+
+    def test_home_query_count(self):
+        with self.assertNumQueries(11):
+            self.client.get('/api/content/home/')
+
+
+class PayloadCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.header = Header.objects.create(phone='123')
+        self.link = NavLink.objects.create(name='Home', href='/')
+        self.header.nav_links.add(self.link)
+
+    def test_second_request_is_served_from_cache(self):
+        first = self.client.get('/api/content/headers/')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/content/headers/')
+        self.assertEqual(first.content, second.content)
+        stats = cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_related_model_change_invalidates(self):
+        self.client.get('/api/content/headers/')
+        self.link.name = 'Main'
+        self.link.save()
+        data = self.client.get('/api/content/headers/').json()
+        self.assertEqual(data[0]['nav_links'][0]['name'], 'Main')
+
+    def test_m2m_change_invalidates(self):
+        self.client.get('/api/content/headers/')
+        self.header.nav_links.clear()
+        data = self.client.get('/api/content/headers/').json()
+        self.assertEqual(data[0]['nav_links'], [])
+
+    def test_unrelated_change_keeps_entry(self):
+        self.client.get('/api/content/headers/')
+        Stat.objects.create(number='1', label='x')
+        with self.assertNumQueries(0):
+            self.client.get('/api/content/headers/')
+
+    def test_local_cache_sees_changes_of_other_processes(self):
+        # TTL 0: the local generations are re-read from ContentRevision on every request
+        with override_settings(API_CACHE_GENERATION_TTL=0):
+            self.assertEqual(len(self.client.get('/api/content/stats/').json()), 0)
+            # what another worker's save leaves behind: new rows and a new revision, no bump in this process
+            Stat.objects.bulk_create([Stat(number='1', label='x')])
+            touch_revision(Stat)
+            self.assertEqual(len(self.client.get('/api/content/stats/').json()), 1)
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Stat.objects.create(number='100', label='Students', order=1)
+
+    def test_etag_and_last_modified(self):
+        response = self.client.get('/api/content/stats/')
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/content/stats/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached['ETag'], response['ETag'])
+
+    def test_not_modified_on_cold_cache(self):
+        etag = self.client.get('/api/content/stats/')['ETag']
+        cache.clear()
+        response = self.client.get('/api/content/stats/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get('/api/content/stats/')['Last-Modified']
+        response = self.client.get('/api/content/stats/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_write_changes_etag(self):
+        etag = self.client.get('/api/content/stats/')['ETag']
+        Stat.objects.create(number='5', label='Teachers', order=2)
+        response = self.client.get('/api/content/stats/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class QueryBudgetTest(APITestCase):
+    """Query count per endpoint must not grow with the number of rows."""
+    sizes = (1, 100, 10000)
+    # list query + prefetches + ContentRevision lookup on a cache miss
+    budgets = {
+        '/api/content/headers/': 3,
+        '/api/content/pages/': 3,
+        '/api/content/image-blocks/': 2,
+        '/api/content/nav-links/': 2,
+        '/api/content/hero-slides/': 2,
+        '/api/content/home/': 11,
+    }
+
+    def _create_rows(self, start, stop):
+        n = range(start, stop)
+        links = NavLink.objects.bulk_create(NavLink(name=f'L{i}', href='/') for i in n)
+        headers = Header.objects.bulk_create(Header(phone=str(i)) for i in n)
+        Through = Header.nav_links.through
+        Through.objects.bulk_create(Through(header_id=h.pk, navlink_id=l.pk) for h, l in zip(headers, links))
+        pages = Page.objects.bulk_create(Page(slug=f'p{i}', title=f'P{i}') for i in n)
+        ImageBlock.objects.bulk_create(ImageBlock(page=p, image=f'images/{p.pk}.jpg') for p in pages)
+        HeroSlide.objects.bulk_create(HeroSlide(title=f'S{i}', image='hero/1.jpg') for i in n)
+
+    def assertMaxQueries(self, budget, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(ctx.captured_queries), budget, f'{url}: {len(ctx.captured_queries)} queries')
+
+    def test_query_budget(self):
+        created = 0
+        for size in self.sizes:
+            self._create_rows(created, size)
+            created = size
+            for url, budget in self.budgets.items():
+                with self.subTest(url=url, rows=size):
+                    self.assertMaxQueries(budget, url)
+
+
+class ImageUrlTest(SimpleTestCase):
+    def test_relative_media_url_made_absolute(self):
+        request = type('R', (), {'scheme': 'http', 'get_host': lambda self: 'testserver'})()
+        self.assertEqual(resolve_image_url('hero/1 a.jpg', request), 'http://testserver/media/hero/1%20a.jpg')
+        self.assertEqual(resolve_image_url('hero/1.jpg'), '/media/hero/1.jpg')
+        self.assertEqual(resolve_image_url(''), '')
+
+    @override_settings(AWS_S3_CUSTOM_DOMAIN='bucket.s3.amazonaws.com')
+    def test_custom_domain(self):
+        self.assertEqual(resolve_image_url('hero/1.jpg'), 'https://bucket.s3.amazonaws.com/hero/1.jpg')
+
+    @override_settings(MEDIA_PUBLIC_BASE_URL='https://cdn.example.com/media')
+    def test_public_base_url(self):
+        self.assertEqual(resolve_image_url('/hero/1.jpg'), 'https://cdn.example.com/media/hero/1.jpg')
+
+
+class ImageVariantsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root, IMAGE_VARIANT_WIDTHS=[100, 200, 800])
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _store_image(self, name, size=(400, 300)):
+        from PIL import Image
+        buf = io.BytesIO()
+        Image.new('RGB', size, (200, 10, 10)).save(buf, 'JPEG')
+        return default_storage.save(name, ContentFile(buf.getvalue()))
+
+    def test_variants_generated_on_save(self):
+        name = self._store_image('hero/slide.jpg')
+        slide = HeroSlide.objects.create(title='S', image=name)
+        slide.refresh_from_db()
+        self.assertEqual(slide.image_variants['source'], name)
+        self.assertEqual(sorted(slide.image_variants['webp']), ['100', '200'])
+        self.assertTrue(default_storage.exists(slide.image_variants['jpeg']['200']))
+        self.assertEqual((slide.image_width, slide.image_height), (400, 300))
+        self.assertRegex(slide.image_color, r'^#c[0-9a-f]0[0-9a-f]0[0-9a-f]$')
+        self.assertTrue(slide.image_placeholder.startswith('data:image/webp;base64,'))
+
+        data = self.client.get('/api/content/hero-slides/').json()
+        srcset = data[0]['image_srcset']['webp']
+        self.assertIn('/media/hero/variants/slide-100w.webp 100w', srcset)
+        self.assertTrue(srcset.endswith('200w'))
+        self.assertEqual(data[0]['image_width'], 400)
+        self.assertEqual(data[0]['image_color'], slide.image_color)
+
+    def test_thumbnail_generated(self):
+        from PIL import Image
+        name = self._store_image('hero/wide.jpg', size=(1200, 600))
+        slide = HeroSlide.objects.create(title='S', image=name)
+        slide.refresh_from_db()
+        thumb = slide.image_variants['thumb']
+        self.assertEqual(thumb, 'hero/variants/wide-thumb.webp')
+        with default_storage.open(thumb) as fh, Image.open(fh) as img:
+            self.assertEqual(img.size, (160, 80))
+        # rows without a thumbnail are picked up by the backfill
+        HeroSlide.objects.filter(pk=slide.pk).update(image_variants={'source': name, 'webp': {}})
+        call_command('generate_image_variants', stdout=io.StringIO())
+        slide.refresh_from_db()
+        self.assertEqual(slide.image_variants['thumb'], thumb)
+
+    def test_backfill_fills_missing_metadata(self):
+        name = self._store_image('hero/old.jpg', size=(120, 80))
+        slide = HeroSlide.objects.create(title='S', image=name)
+        HeroSlide.objects.filter(pk=slide.pk).update(image_width=None, image_color='', image_placeholder='')
+        call_command('generate_image_variants', stdout=io.StringIO())
+        slide.refresh_from_db()
+        self.assertEqual((slide.image_width, slide.image_height), (120, 80))
+
+    def test_missing_file_is_skipped(self):
+        slide = HeroSlide.objects.create(title='S', image='hero/missing.jpg')
+        slide.refresh_from_db()
+        self.assertEqual(slide.image_variants, {})
+
+
+class ExportApiTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.output = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output, ignore_errors=True)
+        Stat.objects.create(number='100', label='Students', order=1)
+
+    def _export(self):
+        out = io.StringIO()
+        call_command('export_api', output=self.output, origin='https://api.example.com', stdout=out)
+        return out.getvalue()
+
+    def test_export_is_incremental(self):
+        self.assertIn('written', self._export())
+        stat = Stat.objects.get()
+        with open(os.path.join(self.output, 'content/stats/index.json'), 'rb') as fh:
+            self.assertEqual(json.loads(fh.read())[0]['label'], 'Students')
+        self.assertTrue(os.path.exists(os.path.join(self.output, f'content/stats/{stat.pk}.json.gz')))
+        self.assertTrue(os.path.exists(os.path.join(self.output, 'achievements/certificates/index.category-students.level-city.json')))
+
+        self.assertIn(' 0 written', self._export())
+        stat.label = 'Pupils'
+        stat.save()
+        # list, detail and home change
+        self.assertIn(' 3 written', self._export())
+
+
+class CompressedResponseTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Page.objects.create(slug='long', title='Long', body='Мектеп туралы ' * 500)
+
+    def test_encoding_negotiation(self):
+        import gzip
+        plain = self.client.get('/api/content/pages/')
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        gz = self.client.get('/api/content/pages/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(gz['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(gz.content), plain.content)
+        self.assertNotEqual(gz['ETag'], plain['ETag'])
+
+        not_modified = self.client.get('/api/content/pages/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=gz['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        refused = self.client.get('/api/content/pages/', HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertNotIn('Content-Encoding', refused)
+
+    def test_brotli_preferred_on_first_request(self):
+        from content.compression import brotli
+        if brotli is None:
+            self.skipTest('brotli not installed')
+        response = self.client.get('/api/content/pages/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(json.loads(brotli.decompress(response.content))[0]['slug'], 'long')
+
+
+class FastReadTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        HeroSlide.objects.create(title='Слайд ', image='hero/1.jpg', order=1,
+                                 image_variants={'source': 'hero/1.jpg', 'webp': {'640': 'hero/variants/1-640w.webp'}})
+        HeroSlide.objects.create(title='Two', image='hero/2.jpg', order=2)
+        Stat.objects.create(number='100', label='Students', order=1)
+        header = Header.objects.create(phone='123')
+        header.nav_links.add(NavLink.objects.create(name='Home', href='/'))
+
+    def _get(self, url, fast):
+        cache.clear()
+        with override_settings(API_FAST_READ=fast):
+            return self.client.get(url)
+
+    def test_same_bytes_as_serializer_path(self):
+        for url in ('/api/content/hero-slides/', '/api/content/stats/', '/api/content/home/'):
+            self.assertEqual(self._get(url, True).content, self._get(url, False).content, url)
+        with override_settings(API_FAST_JSON=False):
+            self.assertEqual(self._get('/api/content/hero-slides/', True).content,
+                             self._get('/api/content/hero-slides/', False).content)
+
+    def test_nested_serializer_uses_regular_path(self):
+        from .fastpath import row_plan
+        from .serializers import HeaderSerializer, HeroSlideSerializer
+        self.assertIsNone(row_plan(HeaderSerializer))
+        self.assertIn(('image_srcset', 'srcset', 'image_variants'), row_plan(HeroSlideSerializer))
+        self.assertEqual(self._get('/api/content/headers/', True).json()[0]['nav_links'][0]['name'], 'Home')
+
+
+class AsyncViewsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.slide = HeroSlide.objects.create(title='Slide', image='hero/1.jpg', order=1)
+        Stat.objects.create(number='100', label='Students', order=1)
+        page = Page.objects.create(slug='about', title='About')
+        ImageBlock.objects.create(page=page, image='images/1.jpg', caption='One')
+
+    async def _compare(self, path):
+        sync = await sync_to_async(self.client.get)(f'/api/content/{path}')
+        with override_settings(ROOT_URLCONF='content.async_urls'):
+            response = await self.async_client.get(f'/{path}')
+        self.assertEqual(response.status_code, sync.status_code, path)
+        self.assertEqual(response.content, sync.content, path)
+        return response
+
+    async def test_same_output_as_sync_views(self):
+        for path in ('hero-slides/', f'hero-slides/{self.slide.pk}/', 'pages/', 'home/', 'hero-slides/999/', 'hero-slides/x/'):
+            await self._compare(path)
+        with override_settings(API_FAST_READ=True):
+            await self._compare('stats/?x=1')
+
+    async def test_cached_and_conditional(self):
+        first = await self._compare('stats/')
+        with override_settings(ROOT_URLCONF='content.async_urls'):
+            again = await self.async_client.get('/stats/', headers={'If-None-Match': first['ETag']})
+        self.assertEqual(again.status_code, 304)
+
+    async def test_browsable_api_falls_back_to_sync_view(self):
+        with override_settings(ROOT_URLCONF='content.async_urls'):
+            response = await self.async_client.get('/stats/?format=api')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+
+    def test_whitenoise_middleware_is_async_capable(self):
+        from asgiref.sync import iscoroutinefunction
+        from config.middleware import WhiteNoiseMiddleware
+
+        async def get_response(request):
+            return None
+        self.assertTrue(iscoroutinefunction(WhiteNoiseMiddleware(get_response)))
+        self.assertFalse(iscoroutinefunction(WhiteNoiseMiddleware(lambda request: None)))
+
+
+class WarmUpTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Stat.objects.create(number='100', label='Students', order=1)
+
+    def test_warm_up_fills_payload_cache(self):
+        from .warmup import warm_up
+        timings = warm_up(close_connections=False)
+        self.assertIn('/api/content/home/', timings)
+        self.assertIn('/api/achievements/certificates/', timings)
+        before = cache_stats()['hits']
+        self.client.get('/api/content/stats/')
+        self.assertEqual(cache_stats()['hits'], before + 1)
+
+    def test_worker_sizing(self):
+        from config.gunicorn_conf import default_workers
+        mb = 1024 * 1024
+        self.assertEqual(default_workers(2, None, 160), 5)
+        self.assertEqual(default_workers(8, 512 * mb, 160), 2)
+        self.assertEqual(default_workers(4, 64 * mb, 160), 1)
+
+
+class StartupImportTest(SimpleTestCase):
+    def test_heavy_dependencies_are_not_imported_at_startup(self):
+        out = io.StringIO()
+        # raises CommandError if boto3, Pillow or a storage backend is imported eagerly
+        call_command('profile_startup', top=3, stdout=out)
+        self.assertIn('No lazy dependency imported at startup', out.getvalue())
+
+    def test_parse_importtime(self):
+        from .management.commands.profile_startup import parse_importtime
+        rows = parse_importtime('import time: self [us] | cumulative | imported package\n'
+                                'import time:       120 |        120 |   boto3.compat\n'
+                                'import time:      3000 |       3120 | boto3\n')
+        self.assertEqual(rows, [('boto3.compat', 120, 120, 1), ('boto3', 3000, 3120, 0)])
+
+
+S3_ENV = {
+    'AWS_ACCESS_KEY_ID': 'test', 'AWS_SECRET_ACCESS_KEY': 'test', 'AWS_STORAGE_BUCKET_NAME': 'bucket',
+    'AWS_S3_REGION_NAME': 'us-east-1',
+}
+
+
+class SharedS3ClientTest(SimpleTestCase):
+    def setUp(self):
+        from . import s3
+        self.s3 = s3
+        s3.reset_clients()
+        self.addCleanup(s3.reset_clients)
+
+    def test_one_client_shared_across_threads(self):
+        with mock.patch.dict(os.environ, dict(S3_ENV, AWS_S3_MAX_POOL_CONNECTIONS='7', AWS_S3_MAX_ATTEMPTS='3')):
+            with ThreadPoolExecutor(8) as pool:
+                clients = list(pool.map(lambda _: self.s3.get_s3_client(), range(32)))
+            self.assertEqual(len({id(c) for c in clients}), 1)
+            config = clients[0].meta.config
+            self.assertEqual(config.max_pool_connections, 7)
+            self.assertEqual(config.retries['total_max_attempts'], 3)
+
+    def test_new_client_when_configuration_changes(self):
+        with mock.patch.dict(os.environ, S3_ENV):
+            first = self.s3.get_s3_client()
+        with mock.patch.dict(os.environ, dict(S3_ENV, AWS_S3_ENDPOINT_URL='http://127.0.0.1:9000')):
+            local = self.s3.get_s3_client()
+        self.assertIsNot(first, local)
+        self.assertEqual(local.meta.endpoint_url, 'http://127.0.0.1:9000')
+
+    def test_media_storage_uses_shared_client(self):
+        from .s3_storage import ContentAddressedS3Storage, SharedClientS3Storage
+        with mock.patch.dict(os.environ, S3_ENV):
+            client = self.s3.get_s3_client()
+            for storage_class in (SharedClientS3Storage, ContentAddressedS3Storage):
+                storage = storage_class(bucket_name='bucket')
+                self.assertIs(storage.connection.meta.client, client)
+                self.assertIs(storage.bucket.Object('hero/a.jpg').meta.client, client)
+                # resources are per thread, the client is not
+                with ThreadPoolExecutor(1) as pool:
+                    other = pool.submit(lambda: storage.connection).result()
+                self.assertIsNot(other, storage.connection)
+                self.assertIs(other.meta.client, client)
+
+    def test_not_configured(self):
+        with mock.patch.dict(os.environ, {'AWS_STORAGE_BUCKET_NAME': ''}):
+            self.assertIsNone(self.s3.get_s3_client())
+
+    @unittest.skipUnless(os.environ.get('S3_TEST_ENDPOINT_URL'), 'set S3_TEST_ENDPOINT_URL to a local S3-compatible server (e.g. MinIO)')
+    def test_round_trip_against_local_server(self):
+        env = {'AWS_S3_ENDPOINT_URL': os.environ['S3_TEST_ENDPOINT_URL']}
+        with mock.patch.dict(os.environ, env):
+            client = self.s3.shared_client()
+            bucket = self.s3.get_bucket() or 'test-bucket'
+            try:
+                client.create_bucket(Bucket=bucket)
+            except client.exceptions.ClientError:
+                pass
+            client.put_object(Bucket=bucket, Key='pool-test.txt', Body=b'ok')
+            self.assertEqual(client.get_object(Bucket=bucket, Key='pool-test.txt')['Body'].read(), b'ok')
+            client.delete_object(Bucket=bucket, Key='pool-test.txt')
+
+
+class RecordingS3Client:
+    """Stands in for the network: reads request bodies the way botocore sends them and keeps only sizes."""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _consume(self, body):
+        if isinstance(body, bytes):
+            return len(body)
+        size = 0
+        while True:
+            chunk = body.read(64 * 1024)
+            if not chunk:
+                return size
+            size += len(chunk)
+
+    def put_object(self, Body, **kwargs):
+        self.calls.append(('put_object', self._consume(Body)))
+        return {'ETag': '"put"'}
+
+    def create_multipart_upload(self, **kwargs):
+        self.calls.append(('create_multipart_upload', kwargs.get('ContentType')))
+        return {'UploadId': 'upload-1'}
+
+    def upload_part(self, Body, PartNumber, **kwargs):
+        size = self._consume(Body)
+        with self.lock:
+            self.calls.append(('upload_part', size))
+        return {'ETag': f'"part-{PartNumber}"'}
+
+    def complete_multipart_upload(self, MultipartUpload, **kwargs):
+        self.calls.append(('complete_multipart_upload', [p['PartNumber'] for p in MultipartUpload['Parts']]))
+
+    def abort_multipart_upload(self, **kwargs):
+        self.calls.append(('abort_multipart_upload', kwargs['UploadId']))
+
+
+class StreamingUploadTest(SimpleTestCase):
+    # the upload job looks up the rows that reference the key, to queue their variants
+    databases = {'default'}
+    MB = 1024 * 1024
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+
+    def _file(self, size):
+        path = os.path.join(self.tmp, f'{size}.bin')
+        with open(path, 'wb') as fh:
+            for _ in range(size // self.MB):
+                fh.write(os.urandom(self.MB))
+        return path
+
+    def _upload(self, path, client):
+        from .s3 import upload_stream
+        with open(path, 'rb') as fh:
+            return upload_stream(fh, 'cert/scan.jpg', content_type='image/jpeg', client=client, bucket='bucket',
+                                 threshold=2 * self.MB, part_size=self.MB, concurrency=2)
+
+    def test_small_file_single_put(self):
+        client = RecordingS3Client()
+        self._upload(self._file(self.MB), client)
+        self.assertEqual(client.calls, [('put_object', self.MB)])
+
+    def test_large_file_multipart(self):
+        client = RecordingS3Client()
+        result = self._upload(self._file(5 * self.MB), client)
+        self.assertEqual(result['parts'], 5)
+        self.assertEqual(client.calls[0], ('create_multipart_upload', 'image/jpeg'))
+        self.assertEqual([c for c in client.calls if c[0] == 'upload_part'], [('upload_part', self.MB)] * 5)
+        self.assertEqual(client.calls[-1], ('complete_multipart_upload', [1, 2, 3, 4, 5]))
+
+    def test_failed_part_aborts_upload(self):
+        client = RecordingS3Client()
+        client.upload_part = mock.Mock(side_effect=RuntimeError('connection reset'))
+        with self.assertRaises(RuntimeError):
+            self._upload(self._file(4 * self.MB), client)
+        self.assertEqual(client.calls[-1], ('abort_multipart_upload', 'upload-1'))
+
+    def test_peak_memory_flat_as_file_grows(self):
+        peaks = []
+        for size in (4 * self.MB, 32 * self.MB):
+            path = self._file(size)
+            tracemalloc.start()
+            try:
+                self._upload(path, RecordingS3Client())
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+        # (concurrency + 1) parts of 1 MB at most, independent of the 8x larger file
+        for peak in peaks:
+            self.assertLess(peak, 4 * self.MB)
+        self.assertLess(peaks[1], peaks[0] * 1.5)
+
+    def test_upload_job_streams_staged_file(self):
+        from .tasks import upload_to_s3
+        client = RecordingS3Client()
+        path = self._file(3 * self.MB)
+        env = dict(S3_ENV, AWS_S3_MULTIPART_THRESHOLD_MB='2', AWS_S3_MULTIPART_CHUNK_MB='5')
+        with mock.patch.dict(os.environ, env), mock.patch('content.tasks.get_s3_client', return_value=client):
+            result = upload_to_s3({'path': path, 'key': 'hero/a.jpg', 'content_type': 'image/jpeg'})
+        self.assertEqual(result, {'key': 'hero/a.jpg', 'parts': 1})
+        self.assertFalse(os.path.exists(path))
+
+
+class InMemoryS3Client(RecordingS3Client):
+    """Keeps ETag and size of every object, lists them like list_objects_v2 and copies/deletes them."""
+    page_size = 2
+    LONG_AGO = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+
+    class exceptions:
+        from botocore.exceptions import ClientError
+
+    def __init__(self):
+        super().__init__()
+        self.objects = {}
+        self.sizes = {}
+        self.params = {}
+        self.modified = {}
+
+    def put_object(self, Key, Body, **kwargs):
+        data = Body if isinstance(Body, bytes) else Body.read()
+        with self.lock:
+            self.calls.append(('put_object', Key))
+            self.objects[Key] = hashlib.md5(data).hexdigest()
+            self.sizes[Key] = len(data)
+            self.params[Key] = kwargs
+
+    def list_objects_v2(self, Bucket, Prefix='', ContinuationToken=None):
+        # like S3, the token marks a position in key order, so deleting listed keys does not skip any
+        keys = sorted(k for k in self.objects if k.startswith(Prefix) and k > (ContinuationToken or ''))
+        page = keys[:self.page_size]
+        response = {'Contents': [{'Key': k, 'ETag': f'"{self.objects[k]}"', 'Size': self.sizes.get(k, 0),
+                                  'LastModified': self.modified.get(k, self.LONG_AGO)} for k in page],
+                    'IsTruncated': len(keys) > self.page_size}
+        if response['IsTruncated']:
+            response['NextContinuationToken'] = page[-1]
+        return response
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise self.exceptions.ClientError({'Error': {'Code': '404', 'Message': 'Not Found'}}, 'HeadObject')
+        return {'ContentLength': self.sizes[Key], 'ContentType': 'image/jpeg', 'ETag': f'"{self.objects[Key]}"'}
+
+    def copy_object(self, Bucket, CopySource, Key):
+        with self.lock:
+            self.calls.append(('copy_object', Key))
+            self.objects[Key] = self.objects[CopySource['Key']]
+            self.sizes[Key] = self.sizes.get(CopySource['Key'], 0)
+
+    def upload_part_copy(self, PartNumber, CopySourceRange, **kwargs):
+        with self.lock:
+            self.calls.append(('upload_part_copy', CopySourceRange))
+        return {'CopyPartResult': {'ETag': f'"copy-{PartNumber}"'}}
+
+    def delete_objects(self, Bucket, Delete):
+        keys = [o['Key'] for o in Delete['Objects']]
+        self.calls.append(('delete_objects', len(keys)))
+        for key in keys:
+            self.objects.pop(key, None)
+            self.sizes.pop(key, None)
+        return {}
+
+    def uploaded(self):
+        return sorted(key for name, key in self.calls if name == 'put_object')
+
+
+class SyncMediaTest(SimpleTestCase):
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source, ignore_errors=True)
+        for rel, data in (('hero/a.jpg', b'a'), ('hero/b.jpg', b'b'), ('about/c.png', b'c'), ('d.txt', b'd')):
+            self._write(rel, data)
+
+    def _write(self, rel, data):
+        path = os.path.join(self.source, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as fh:
+            fh.write(data)
+
+    def _sync(self, client, **kwargs):
+        from .media_sync import sync_directory
+        return sync_directory(self.source, prefix='media', bucket='bucket', client=client, workers=4, **kwargs)
+
+    def test_only_new_or_changed_files_uploaded(self):
+        client = InMemoryS3Client()
+        first = self._sync(client)
+        self.assertEqual((first.scanned, first.uploaded), (4, 4))
+        self.assertEqual(client.uploaded(), ['media/about/c.png', 'media/d.txt', 'media/hero/a.jpg', 'media/hero/b.jpg'])
+
+        client.calls.clear()
+        self._write('hero/a.jpg', b'changed')
+        self._write('new/e.jpg', b'e')
+        second = self._sync(client)
+        self.assertEqual(client.uploaded(), ['media/hero/a.jpg', 'media/new/e.jpg'])
+        self.assertEqual((second.uploaded, second.unchanged), (2, 3))
+
+    def test_remote_etags_avoid_reupload_without_manifest(self):
+        client = InMemoryS3Client()
+        self._sync(client)
+        os.remove(os.path.join(self.source, '.sync_manifest.json'))
+        client.calls.clear()
+        result = self._sync(client)
+        self.assertEqual(client.uploaded(), [])
+        self.assertEqual(result.unchanged, 4)
+        # the manifest is rebuilt, so the next run does not even hash the files
+        with mock.patch('content.media_sync.local_etag') as etag:
+            self._sync(client)
+        etag.assert_not_called()
+
+    def test_resume_after_failure(self):
+        client = InMemoryS3Client()
+        put = client.put_object
+
+        def flaky(Key, Body, **kwargs):
+            if Key.endswith('b.jpg'):
+                raise ConnectionError('connection reset')
+            return put(Key=Key, Body=Body, **kwargs)
+
+        with mock.patch.object(client, 'put_object', flaky):
+            result = self._sync(client)
+        self.assertEqual((result.uploaded, result.failed), (3, 1))
+        client.calls.clear()
+        result = self._sync(client)
+        self.assertEqual(client.uploaded(), ['media/hero/b.jpg'])
+        self.assertEqual(result.unchanged, 3)
+
+    def test_command_dry_run(self):
+        out = io.StringIO()
+        with mock.patch.dict(os.environ, S3_ENV), \
+                mock.patch('content.management.commands.sync_media.shared_client', return_value=InMemoryS3Client()):
+            call_command('sync_media', source=self.source, dry_run=True, stdout=out)
+        self.assertIn('Would upload 4 of 4 files', out.getvalue())
+        self.assertFalse(os.path.exists(os.path.join(self.source, '.sync_manifest.json')))
+
+    def test_alias_command_writes_to_given_stdout(self):
+        out = io.StringIO()
+        with mock.patch.dict(os.environ, S3_ENV), self.settings(MEDIA_ROOT=self.source), \
+                mock.patch('content.management.commands.sync_media.shared_client', return_value=InMemoryS3Client()):
+            call_command('upload_media_s3', stdout=out)
+        self.assertIn('Uploaded 4 of 4 files', out.getvalue())
+
+    def test_front_files_uploaded_through_sync(self):
+        from content.management.commands import upload_media_to_s3 as command
+        self._write('modern-school-students.jpg', b'hero')
+        self._write('123.JPG', b'about')
+        client = InMemoryS3Client()
+        manifest = os.path.join(self.source, 'front.json')
+        with mock.patch.dict(os.environ, S3_ENV), mock.patch.object(command, 'FRONT_PUBLIC', self.source), \
+                mock.patch.object(command, 'MANIFEST_PATH', manifest), \
+                mock.patch.object(command, 'shared_client', return_value=client):
+            call_command('upload_media_to_s3', stdout=io.StringIO())
+            self.assertEqual(client.uploaded(), ['about/123.JPG', 'hero/modern-school-students.jpg'])
+            client.calls.clear()
+            call_command('upload_media_to_s3', stdout=io.StringIO())
+        self.assertEqual(client.uploaded(), [])
+        self.assertTrue(os.path.exists(manifest))
+
+
+class S3MoveTest(APITestCase):
+    def _bucket(self, keys):
+        client = InMemoryS3Client()
+        client.page_size = 1000
+        for key in keys:
+            client.put_object(Key=key, Body=key.encode())
+        client.calls.clear()
+        return client
+
+    def test_prefix_rewrite_copies_in_parallel_and_deletes_in_batches(self):
+        from .s3 import copy_objects, delete_keys
+        from tools.move_s3_objects import plan_prefix_moves
+        client = self._bucket([f'certificates/{i}.jpg' for i in range(2500)] + ['hero/a.jpg'])
+        moves = plan_prefix_moves(client, 'bucket', 'certificates/', 'media/certificates/')
+        self.assertEqual(len(moves), 2500)
+        copied, failed = copy_objects(client, 'bucket', moves, workers=8)
+        self.assertEqual((len(copied), failed), (2500, []))
+        self.assertEqual(delete_keys(client, 'bucket', [src for src, _ in copied]), [])
+        self.assertEqual([c for c in client.calls if c[0] == 'delete_objects'],
+                         [('delete_objects', 1000), ('delete_objects', 1000), ('delete_objects', 500)])
+        self.assertEqual(sorted(k.split('/')[0] for k in client.objects).count('media'), 2500)
+        self.assertIn('hero/a.jpg', client.objects)
+
+    def test_nested_target_prefix_is_not_moved_twice(self):
+        from tools.move_s3_objects import plan_prefix_moves
+        client = self._bucket(['hero/a.jpg', 'hero/2024/b.jpg'])
+        self.assertEqual(plan_prefix_moves(client, 'bucket', 'hero/', 'hero/2024/'),
+                         [('hero/a.jpg', 'hero/2024/a.jpg', len(b'hero/a.jpg'))])
+
+    def test_multipart_copy_above_5gb(self):
+        from .s3 import copy_object
+        client = self._bucket(['big.tif'])
+        client.sizes['big.tif'] = 6 * 1024 ** 3
+        copy_object(client, 'bucket', 'big.tif', 'archive/big.tif', part_size=2 * 1024 ** 3, concurrency=2)
+        ranges = sorted(r for name, r in client.calls if name == 'upload_part_copy')
+        self.assertEqual(ranges, [f'bytes={start}-{start + 2 * 1024 ** 3 - 1}' for start in (0, 2 * 1024 ** 3, 4 * 1024 ** 3)])
+        self.assertEqual(client.calls[-1], ('complete_multipart_upload', [1, 2, 3]))
+        self.assertNotIn('copy_object', [name for name, _ in client.calls])
+
+    def _main(self, *argv):
+        from tools import move_s3_objects
+        client = self._bucket(['certificates/1.jpg'])
+        with mock.patch.object(sys, 'argv', ['move_s3_objects.py', '--bucket', 'bucket', *argv]), \
+                mock.patch.object(move_s3_objects, 'shared_client', return_value=client), \
+                contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()), \
+                self.assertRaises(SystemExit) as exit_:
+            move_s3_objects.main()
+        return exit_.exception.code, client
+
+    def test_apply_refused_without_db_update_or_kept_source(self):
+        code, client = self._main('--from', 'certificates/', '--to', 'media/certificates/', '--apply')
+        self.assertEqual(code, 2)
+        self.assertEqual(client.calls, [])
+
+    def test_update_db_refused_against_sqlite(self):
+        # unset, the settings fall back to db.sqlite3; set, the test database is still SQLite
+        for url in (None, 'postgres://db/school'):
+            env = {k: v for k, v in os.environ.items() if k != 'DATABASE_URL'}
+            if url:
+                env['DATABASE_URL'] = url
+            with mock.patch.dict(os.environ, env, clear=True):
+                code, client = self._main('--from', 'certificates/', '--to', 'media/certificates/', '--apply', '--update-db')
+            self.assertEqual(code, 2)
+            self.assertEqual(client.calls, [])
+
+    @override_settings(IMAGE_VARIANTS_ON_SAVE=False)
+    def test_rename_media_updates_names_and_variants(self):
+        from .media_refs import rename_media
+        slide = HeroSlide.objects.create(title='a', image='hero/a.jpg', image_variants={
+            'source': 'hero/a.jpg', 'webp': {'640': 'hero/variants/a-640w.webp'}})
+        other = HeroSlide.objects.create(title='b', image='hero/b.jpg')
+        # savepoint, one SELECT per media model, one UPDATE and one revision bump for HeroSlide
+        with self.assertNumQueries(10):
+            updated = rename_media({'hero/a.jpg': 'media/hero/a.jpg',
+                                    'hero/variants/a-640w.webp': 'media/hero/variants/a-640w.webp'})
+        self.assertEqual(updated, {'content.HeroSlide': 1})
+        slide.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(slide.image.name, 'media/hero/a.jpg')
+        self.assertEqual(slide.image_variants, {'source': 'media/hero/a.jpg',
+                                                'webp': {'640': 'media/hero/variants/a-640w.webp'}})
+        self.assertEqual(other.image.name, 'hero/b.jpg')
+
+
+class ContentAddressedMediaTest(APITestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+
+    def test_storage_names_by_content_and_deduplicates(self):
+        from .storage import ContentAddressedFileSystemStorage
+        storage = ContentAddressedFileSystemStorage(location=self.tmp)
+        first = storage.save('certificates/1.jpg', ContentFile(b'scan'))
+        again = storage.save('certificates/1_3KX6GtC.JPG', ContentFile(b'scan'))
+        other = storage.save('certificates/1.jpg', ContentFile(b'other scan'))
+        self.assertEqual(first, again)
+        self.assertRegex(first, r'^certificates/[0-9a-f]{32}\.jpg$')
+        self.assertNotEqual(first, other)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.tmp, 'certificates'))), sorted([first[13:], other[13:]]))
+
+    def test_s3_storage_sets_immutable_cache_control(self):
+        from .s3_storage import ContentAddressedS3Storage
+        storage = ContentAddressedS3Storage(bucket_name='bucket', access_key='test', secret_key='test')
+        self.assertEqual(storage.get_object_parameters('certificates/a.jpg')['CacheControl'],
+                         'public, max-age=31536000, immutable')
+
+    @override_settings(MEDIA_CONTENT_ADDRESSED=True, JOBS_EAGER=True)
+    def test_admin_upload_reuses_existing_object(self):
+        from django.contrib.admin.sites import site
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from achievements.models import Certificate
+        admin = site._registry[Certificate]
+        field = Certificate._meta.get_field('image')
+        client = InMemoryS3Client()
+        with override_settings(JOBS_STAGING_DIR=self.tmp), mock.patch.dict(os.environ, S3_ENV), \
+                mock.patch('content.tasks.get_s3_client', return_value=client), \
+                mock.patch('content.admin.get_s3_client', return_value=client):
+            keys = [admin._upload_file_to_s3(SimpleUploadedFile(name, b'scan', 'image/jpeg'), Certificate(), field)[0]
+                    for name in ('1.jpg', '1_3KX6GtC.jpg')]
+        self.assertEqual(keys[0], keys[1])
+        self.assertEqual(client.uploaded(), [keys[0]])
+        self.assertEqual(client.params[keys[0]]['CacheControl'], 'public, max-age=31536000, immutable')
+        # the second staged copy was dropped, not left behind
+        self.assertEqual(os.listdir(self.tmp), [])
+
+
+class StagingS3Client(InMemoryS3Client):
+    """InMemoryS3Client that also keeps the bytes, for staged files read back by a job."""
+
+    def __init__(self):
+        super().__init__()
+        self.data = {}
+
+    def put_object(self, Key, Body, **kwargs):
+        data = Body if isinstance(Body, bytes) else Body.read()
+        super().put_object(Key=Key, Body=data, **kwargs)
+        self.data[Key] = data
+
+    def download_fileobj(self, Bucket, Key, Fileobj):
+        Fileobj.write(self.data[Key])
+
+    def delete_object(self, Bucket, Key):
+        self.calls.append(('delete_object', Key))
+        self.objects.pop(Key, None)
+        self.data.pop(Key, None)
+
+
+@override_settings(JOBS_EAGER=False, JOBS_STAGING_SHARED=False)
+class SeparateWorkerStagingTest(APITestCase):
+    """With run_jobs in its own container, uploads are staged in the bucket, not on the web container's disk."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.client_s3 = StagingS3Client()
+        staging_dir = override_settings(JOBS_STAGING_DIR=self.tmp)
+        staging_dir.enable()
+        self.addCleanup(staging_dir.disable)
+        for patch in (mock.patch.dict(os.environ, S3_ENV),
+                      mock.patch('content.tasks.get_s3_client', return_value=self.client_s3),
+                      mock.patch('content.staging.get_s3_client', return_value=self.client_s3)):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_admin_upload_staged_in_bucket(self):
+        from django.contrib.admin.sites import site
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from jobs.models import Job
+        from .tasks import upload_to_s3
+        admin = site._registry[HeroSlide]
+        key, err = admin._upload_file_to_s3(SimpleUploadedFile('a.jpg', b'slide', 'image/jpeg'), HeroSlide(),
+                                            HeroSlide._meta.get_field('image'))
+        self.assertIsNone(err)
+        job = Job.objects.get(name='media.upload_to_s3')
+        self.assertEqual(job.status, Job.QUEUED)
+        staged = job.payload['staged']
+        self.assertTrue(staged.startswith('s3:_staging/'))
+        self.assertEqual(self.client_s3.params[staged[3:]]['ContentType'], 'image/jpeg')
+        self.assertEqual(os.listdir(self.tmp), [])
+
+        # what the worker runs in its own container
+        self.assertEqual(upload_to_s3(job.payload)['copied'], True)
+        self.assertEqual(self.client_s3.objects[key], hashlib.md5(b'slide').hexdigest())
+        self.assertNotIn(staged[3:], self.client_s3.objects)
+
+    @override_settings(MEDIA_CONTENT_ADDRESSED=True)
+    def test_duplicate_upload_not_staged(self):
+        from django.contrib.admin.sites import site
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from jobs.models import Job
+        from .tasks import upload_to_s3
+        admin = site._registry[HeroSlide]
+        field = HeroSlide._meta.get_field('image')
+        with mock.patch('content.admin.get_s3_client', return_value=self.client_s3):
+            key, _ = admin._upload_file_to_s3(SimpleUploadedFile('a.jpg', b'slide', 'image/jpeg'), HeroSlide(), field)
+            upload_to_s3(Job.objects.get(name='media.upload_to_s3').payload)
+            self.client_s3.calls.clear()
+            again, err = admin._upload_file_to_s3(SimpleUploadedFile('b.jpg', b'slide', 'image/jpeg'), HeroSlide(), field)
+        self.assertEqual((again, err), (key, None))
+        # nothing put under _staging/ and no second upload job
+        self.assertEqual(self.client_s3.calls, [])
+        self.assertEqual(Job.objects.filter(name='media.upload_to_s3').count(), 1)
+
+    def test_staged_file_read_back(self):
+        from .staging import discard, open_staged, stage
+        ref, digest = stage(ContentFile(b'zip bytes', name='a.zip'), '.zip')
+        self.assertEqual(digest, hashlib.sha256(b'zip bytes').hexdigest())
+        with open_staged(ref) as fh:
+            self.assertEqual(fh.read(), b'zip bytes')
+        discard(ref)
+        self.assertEqual(self.client_s3.data, {})
+
+    def test_variants_wait_for_upload(self):
+        from django.contrib.admin.sites import site
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from jobs.models import Job
+        from .tasks import generate_variants, upload_to_s3
+        admin = site._registry[HeroSlide]
+        key, _ = admin._upload_file_to_s3(SimpleUploadedFile('a.jpg', b'slide', 'image/jpeg'), HeroSlide(),
+                                          HeroSlide._meta.get_field('image'))
+        slide = HeroSlide.objects.create(title='S', image=key)
+        payload = {'model': 'content.heroslide', 'pk': slide.pk}
+        self.assertEqual(generate_variants(payload), {'skipped': 'upload pending'})
+
+        upload = Job.objects.get(name='media.upload_to_s3')
+        upload_to_s3(upload.payload)
+        Job.objects.filter(pk=upload.pk).update(status=Job.SUCCEEDED)
+        queued = Job.objects.filter(name='images.generate_variants', idempotency_key__isnull=True)
+        self.assertEqual([job.payload for job in queued], [payload])
+        # with no upload left to wait for, a missing file is an error again
+        HeroSlide.objects.filter(pk=slide.pk).update(image='hero/gone.jpg')
+        with self.assertRaises(FileNotFoundError):
+            generate_variants(payload)
+
+    def test_refused_without_s3(self):
+        from django.core.exceptions import ImproperlyConfigured
+        from .staging import stage
+        with mock.patch('content.staging.get_s3_client', return_value=None):
+            with self.assertRaises(ImproperlyConfigured):
+                stage(ContentFile(b'x', name='a.zip'))
+
+
+class GcMediaTest(APITestCase):
+    @override_settings(IMAGE_VARIANTS_ON_SAVE=False)
+    def setUp(self):
+        HeroSlide.objects.create(title='a', image='hero/a.jpg', image_variants={
+            'source': 'hero/a.jpg', 'webp': {'640': 'hero/variants/a-640w.webp'}})
+        self.client_s3 = InMemoryS3Client()
+        self.client_s3.page_size = 1000
+        keys = ['hero/a.jpg', 'hero/variants/a-640w.webp', 'hero/old.jpg', 'hero/just-uploaded.jpg', 'index.html']
+        keys += [f'certificates/{i}.jpg' for i in range(2500)]
+        for key in keys:
+            self.client_s3.put_object(Key=key, Body=b'x')
+        from django.utils import timezone
+        self.client_s3.modified['hero/just-uploaded.jpg'] = timezone.now()
+        self.client_s3.calls.clear()
+
+    def _run(self, *args):
+        out = io.StringIO()
+        with mock.patch.dict(os.environ, S3_ENV), \
+                mock.patch('content.management.commands.gc_media.shared_client', return_value=self.client_s3):
+            call_command('gc_media', *args, stdout=out)
+        return out.getvalue()
+
+    def test_referenced_names_include_variants(self):
+        from .media_refs import referenced_names
+        names = referenced_names()
+        self.assertIn('hero/a.jpg', names)
+        self.assertIn('hero/variants/a-640w.webp', names)
+        self.assertNotIn('hero/old.jpg', names)
+
+    def test_dry_run_reports_without_deleting(self):
+        out = self._run('--dry-run')
+        self.assertIn('2501 orphaned', out)
+        self.assertIn('none deleted (dry run)', out)
+        self.assertEqual(len(self.client_s3.objects), 2505)
+
+    def test_deletes_old_orphans_in_batches(self):
+        out = self._run()
+        self.assertIn('2501 deleted', out)
+        self.assertEqual(sorted(self.client_s3.objects),
+                         ['hero/a.jpg', 'hero/just-uploaded.jpg', 'hero/variants/a-640w.webp', 'index.html'])
+        self.assertEqual([n for name, n in self.client_s3.calls if name == 'delete_objects'], [1000, 1000, 501])
+
+    def test_refuses_without_references(self):
+        HeroSlide.objects.all().delete()
+        with self.assertRaisesMessage(CommandError, 'No media references'):
+            self._run()
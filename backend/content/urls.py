@@ -2,7 +2,8 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     NavLinkViewSet, HeaderViewSet, HeroSlideViewSet, AboutViewSet,
-    StatViewSet, DirectorViewSet, ContactInfoViewSet, FooterViewSet, PageViewSet, ImageBlockViewSet
+    StatViewSet, DirectorViewSet, ContactInfoViewSet, FooterViewSet, PageViewSet, ImageBlockViewSet,
+    HomeView
 )
 
 router = DefaultRouter()
@@ -18,6 +19,7 @@ router.register(r'pages', PageViewSet)
 router.register(r'image-blocks', ImageBlockViewSet)
 
 urlpatterns = [
+    path('home/', HomeView.as_view(), name='content-home'),
     path('', include(router.urls)),
 ]
 
@@ -1,5 +1,7 @@
 from rest_framework import viewsets
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from .models import (
     NavLink, Header, HeroSlide, About, Stat, Director, ContactInfo, Footer, Page, ImageBlock
 )
@@ -8,8 +10,10 @@ from .serializers import (
     StatSerializer, DirectorSerializer, ContactInfoSerializer, FooterSerializer,
     PageSerializer, ImageBlockSerializer
 )
+from .cache import CachedResponseMixin, cached_response
+from .fastpath import FastReadMixin, serialize_list
 
-class ReadOnlyViewSet(viewsets.ReadOnlyModelViewSet):
+class ReadOnlyViewSet(CachedResponseMixin, FastReadMixin, viewsets.ReadOnlyModelViewSet):
     permission_classes = [AllowAny]
 
 class NavLinkViewSet(ReadOnlyViewSet):
@@ -17,8 +21,9 @@ class NavLinkViewSet(ReadOnlyViewSet):
     serializer_class = NavLinkSerializer
 
 class HeaderViewSet(ReadOnlyViewSet):
-    queryset = Header.objects.all()
+    queryset = Header.objects.prefetch_related('nav_links')
     serializer_class = HeaderSerializer
+    cache_models = (Header, NavLink)
 
 class HeroSlideViewSet(ReadOnlyViewSet):
     queryset = HeroSlide.objects.all()
@@ -45,9 +50,40 @@ class FooterViewSet(ReadOnlyViewSet):
     serializer_class = FooterSerializer
 
 class PageViewSet(ReadOnlyViewSet):
-    queryset = Page.objects.all()
+    queryset = Page.objects.prefetch_related('images')
     serializer_class = PageSerializer
+    cache_models = (Page, ImageBlock)
 
 class ImageBlockViewSet(ReadOnlyViewSet):
     queryset = ImageBlock.objects.all()
     serializer_class = ImageBlockSerializer
+
+
+class HomeView(APIView):
+    """All homepage sections in one response (one query per section, relations prefetched)."""
+    permission_classes = [AllowAny]
+    cache_models = (Header, NavLink, HeroSlide, About, Stat, Director, ContactInfo, Footer, Page, ImageBlock)
+    # (key, queryset, serializer, many); single sections hold the first row or None
+    sections = (
+        ('header', Header.objects.prefetch_related('nav_links'), HeaderSerializer, False),
+        ('hero_slides', HeroSlide.objects.all(), HeroSlideSerializer, True),
+        ('about', About.objects.all(), AboutSerializer, False),
+        ('stats', Stat.objects.all(), StatSerializer, True),
+        ('director', Director.objects.order_by('-id'), DirectorSerializer, False),
+        ('contact', ContactInfo.objects.all(), ContactInfoSerializer, False),
+        ('footer', Footer.objects.all(), FooterSerializer, False),
+        ('pages', Page.objects.prefetch_related('images'), PageSerializer, True),
+    )
+
+    def get(self, request, *args, **kwargs):
+        return cached_response(request, self.cache_models, self._get, *args, **kwargs)
+
+    def _get(self, request, *args, **kwargs):
+        data = {}
+        for key, queryset, serializer_class, many in self.sections:
+            if many:
+                data[key] = serialize_list(queryset.all(), serializer_class, request)
+            else:
+                obj = queryset.first()
+                data[key] = serializer_class(obj, context={'request': request}).data if obj else None
+        return Response(data)
@@ -0,0 +1,64 @@
+"""Prime the API payload cache and the per-process lookup caches before serving.
+
+Run from the gunicorn `when_ready` hook (config/gunicorn_conf.py) in the
+master process: with preload_app the primed in-process caches (local-memory
+payload cache, image URL LRU, serializer plans) are inherited by every forked
+worker, and a shared cache (Redis) is filled before the first real request.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import reverse
+
+logger = logging.getLogger(__name__)
+
+
+def warmup_host():
+    host = getattr(settings, 'API_WARMUP_HOST', '')
+    if host:
+        return host
+    for candidate in settings.ALLOWED_HOSTS:
+        if candidate and candidate != '*' and not candidate.startswith('.'):
+            return candidate
+    return 'localhost'
+
+
+def endpoints():
+    """(path, sync view) of the home endpoint and every public list endpoint."""
+    from achievements.urls import router as achievements_router
+    from .urls import router as content_router
+    from .views import HomeView
+
+    yield reverse('content-home'), HomeView.as_view()
+    for router in (content_router, achievements_router):
+        for prefix, viewset, basename in router.registry:
+            yield reverse(f'{basename}-list'), viewset.as_view({'get': 'list'})
+
+
+def warm_up(close_connections=True):
+    """Request every endpoint once so its payload is cached; returns {path: seconds}."""
+    factory = RequestFactory(HTTP_HOST=warmup_host(), HTTP_ACCEPT='application/json')
+    secure = bool(getattr(settings, 'SECURE_PROXY_SSL_HEADER', None))
+    timings = {}
+    try:
+        for path, view in endpoints():
+            start = time.perf_counter()
+            try:
+                response = view(factory.get(path, secure=secure))
+                if hasattr(response, 'render'):
+                    response.render()
+            except Exception:
+                logger.exception('Warm-up request to %s failed', path)
+                continue
+            timings[path] = time.perf_counter() - start
+    finally:
+        if close_connections:
+            # connections opened here must not be shared with forked workers
+            connections.close_all()
+            for cache in caches.all(initialized_only=True):
+                cache.close()
+    return timings
@@ -0,0 +1,17 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'status', 'attempts', 'max_attempts', 'created_at', 'finished_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'idempotency_key']
+    readonly_fields = [f.name for f in Job._meta.fields]
+    actions = ['requeue']
+
+    @admin.action(description='Повторить выбранные задачи')
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(status=Job.RUNNING).update(status=Job.QUEUED, attempts=0, run_after=timezone.now())
+        self.message_user(request, f'Requeued {updated} jobs')
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class JobsConfig(AppConfig):
+    name = 'jobs'
+    verbose_name = 'Фоновые задачи'
+
+    def ready(self):
+        # import `tasks` modules of all apps so their @register handlers are known
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules('tasks')
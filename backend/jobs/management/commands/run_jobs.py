@@ -0,0 +1,96 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs import worker as pool_worker
+from jobs.queue import claim_batch, release, requeue_stale, worker_id
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (image processing, S3 uploads) on a process pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=getattr(settings, 'JOBS_PROCESSES', 2))
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds between polls when idle')
+        parser.add_argument('--stale-timeout', type=int, default=getattr(settings, 'JOBS_STALE_TIMEOUT', 900),
+                            help='Requeue running jobs locked longer than this many seconds')
+        parser.add_argument('--requeue-interval', type=float, default=60,
+                            help='Seconds between checks for stale jobs of workers that disappeared')
+        parser.add_argument('--once', action='store_true', help='Process currently due jobs and exit')
+
+    def _new_pool(self, processes):
+        context = multiprocessing.get_context('spawn')
+        return ProcessPoolExecutor(max_workers=processes, mp_context=context, initializer=pool_worker.init_process)
+
+    def _requeue_stale(self, timeout, worker):
+        # this worker's own jobs are tracked in `running` and released when its pool breaks
+        requeued = requeue_stale(timeout, exclude_worker=worker)
+        if requeued:
+            self.stdout.write(self.style.WARNING(f'Requeued {requeued} stale jobs'))
+
+    def _release(self, pks, error):
+        if pks:
+            requeued = release(pks, f'Pool process died: {error}')
+            self.stderr.write(self.style.ERROR(f'Released jobs {sorted(pks)} ({requeued} requeued): {error}'))
+
+    def _restart_pool(self, pool, processes, lost, error):
+        """Release the jobs of a broken pool (all of them are lost) and return a fresh pool."""
+        self._release(lost, error)
+        pool.shutdown(wait=False, cancel_futures=True)
+        return self._new_pool(processes)
+
+    def handle(self, *args, **options):
+        processes = max(1, options['processes'])
+        worker = worker_id()
+        self.stdout.write(f'Job worker {worker} started with {processes} processes')
+        self._requeue_stale(options['stale_timeout'], worker)
+        last_requeue = time.monotonic()
+
+        running = {}
+        pool = self._new_pool(processes)
+        try:
+            while True:
+                if time.monotonic() - last_requeue >= options['requeue_interval']:
+                    self._requeue_stale(options['stale_timeout'], worker)
+                    last_requeue = time.monotonic()
+                free = processes - len(running)
+                if free > 0:
+                    claimed = claim_batch(free, worker)
+                    try:
+                        for pk in claimed:
+                            running[pool.submit(pool_worker.run, pk)] = pk
+                    except BrokenProcessPool as e:
+                        pool = self._restart_pool(pool, processes, set(running.values()) | set(claimed), e)
+                        running.clear()
+                        continue
+                if not running:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                done, _ = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                broken = None
+                for future in done:
+                    pk = running.pop(future)
+                    try:
+                        status = future.result()
+                    except BrokenProcessPool as e:
+                        broken = e
+                        self._release([pk], e)
+                    except Exception as e:
+                        # the result could not be sent back (e.g. not picklable); the job itself may have run
+                        self._release([pk], e)
+                    else:
+                        self.stdout.write(f'Job #{pk}: {status}')
+                if broken is not None:
+                    # a dead pool process breaks the whole pool: none of its other jobs will complete
+                    pool = self._restart_pool(pool, processes, list(running.values()), broken)
+                    running.clear()
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping, waiting for running jobs...')
+        finally:
+            pool.shutdown(wait=True)
@@ -0,0 +1,39 @@
+from django.db import models
+
+
+class Job(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (SUCCEEDED, 'Выполнено'),
+        (FAILED, 'Ошибка'),
+    ]
+
+    name = models.CharField("Задача", max_length=100)
+    payload = models.JSONField("Параметры", default=dict, blank=True)
+    idempotency_key = models.CharField("Ключ идемпотентности", max_length=255, unique=True, null=True, blank=True)
+    status = models.CharField("Статус", max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField("Попытки", default=0)
+    max_attempts = models.PositiveIntegerField("Макс. попыток", default=3)
+    run_after = models.DateTimeField("Не раньше")
+    locked_by = models.CharField("Воркер", max_length=100, blank=True)
+    locked_at = models.DateTimeField("Взята в работу", null=True, blank=True)
+    result = models.JSONField("Результат", null=True, blank=True)
+    last_error = models.TextField("Последняя ошибка", blank=True)
+    created_at = models.DateTimeField("Создана", auto_now_add=True)
+    finished_at = models.DateTimeField("Завершена", null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
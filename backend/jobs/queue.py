@@ -0,0 +1,163 @@
+"""DB-backed job queue.
+
+Handlers are registered with `@register('name')` in an app's `tasks.py` and
+enqueued with `enqueue('name', payload)`. `manage.py run_jobs` claims queued
+rows and runs them on a process pool. With JOBS_EAGER enabled (default when
+DEBUG) jobs run inline in `enqueue`, so development needs no worker.
+"""
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def register(name):
+    """Decorator registering handler(payload) -> JSON-serializable result under name."""
+    def decorator(fn):
+        _registry[name] = fn
+        return fn
+    return decorator
+
+
+def get_handler(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f'No job handler registered as {name!r}')
+
+
+def is_eager():
+    return getattr(settings, 'JOBS_EAGER', False)
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def enqueue(name, payload=None, idempotency_key=None, max_attempts=None, delay=0):
+    """Queue a job and return it.
+
+    If a job with the same idempotency_key already exists it is returned
+    unchanged instead of creating a duplicate, unless it FAILED: then it is
+    queued again with the new payload and a fresh set of attempts.
+    """
+    get_handler(name)
+    payload = payload or {}
+    if idempotency_key:
+        existing = Job.objects.filter(idempotency_key=idempotency_key).first()
+        if existing is not None:
+            if existing.status == Job.FAILED and _retry_failed(existing, payload, max_attempts, delay):
+                existing.refresh_from_db()
+                return _run_eager(existing)
+            return existing
+    job = Job(
+        name=name, payload=payload, idempotency_key=idempotency_key or None,
+        max_attempts=max_attempts or getattr(settings, 'JOBS_MAX_ATTEMPTS', 3),
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        return Job.objects.get(idempotency_key=idempotency_key)
+    return _run_eager(job)
+
+
+def _retry_failed(job, payload, max_attempts, delay):
+    """Queue a FAILED job again in place (its idempotency key is taken); False if it is not FAILED."""
+    return Job.objects.filter(pk=job.pk, status=Job.FAILED).update(
+        status=Job.QUEUED, payload=payload, attempts=0, last_error='', result=None, finished_at=None,
+        max_attempts=max_attempts or getattr(settings, 'JOBS_MAX_ATTEMPTS', 3),
+        run_after=timezone.now() + timedelta(seconds=delay),
+    ) == 1
+
+
+def _run_eager(job):
+    if is_eager():
+        # retries happen immediately; the loop ends once the job succeeds or runs out of attempts
+        while _claim(job.pk, 'eager'):
+            execute(job.pk)
+        job.refresh_from_db()
+    return job
+
+
+def _claim(pk, worker):
+    return Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+        status=Job.RUNNING, attempts=F('attempts') + 1, locked_by=worker, locked_at=timezone.now(),
+    ) == 1
+
+
+def claim_batch(limit, worker=None):
+    """Atomically mark up to limit due jobs as running and return their ids."""
+    worker = worker or worker_id()
+    candidates = Job.objects.filter(status=Job.QUEUED, run_after__lte=timezone.now()).order_by('run_after', 'pk')
+    claimed = []
+    for pk in candidates.values_list('pk', flat=True)[:limit]:
+        # conditional update: a concurrent worker that got there first makes this a no-op
+        if _claim(pk, worker):
+            claimed.append(pk)
+    return claimed
+
+
+def requeue_stale(timeout, exclude_worker=None):
+    """Put back jobs whose worker disappeared while running them.
+
+    exclude_worker skips the jobs of a live worker, which tracks its own (see release).
+    """
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff)
+    if exclude_worker:
+        stale = stale.exclude(locked_by=exclude_worker)
+    return stale.update(status=Job.QUEUED, locked_by='', locked_at=None, run_after=timezone.now())
+
+
+def release(pks, error=''):
+    """Give back claimed jobs whose pool process died: queued again, or failed once out of attempts.
+
+    Returns the number requeued. Jobs that finished before the crash are left alone.
+    """
+    now = timezone.now()
+    running = Job.objects.filter(pk__in=pks, status=Job.RUNNING)
+    running.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, last_error=error, locked_by='', locked_at=None, finished_at=now,
+    )
+    return running.filter(attempts__lt=F('max_attempts')).update(
+        status=Job.QUEUED, last_error=error, locked_by='', locked_at=None, run_after=now,
+    )
+
+
+def _retry_delay(attempts):
+    base = getattr(settings, 'JOBS_RETRY_BASE_DELAY', 5)
+    return base * (2 ** (attempts - 1))
+
+
+def execute(pk):
+    """Run a claimed job and record the outcome. Safe to call in a pool process."""
+    job = Job.objects.get(pk=pk)
+    try:
+        result = get_handler(job.name)(job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Job %s #%s failed (attempt %s/%s)', job.name, job.pk, job.attempts, job.max_attempts)
+        if job.attempts < job.max_attempts:
+            Job.objects.filter(pk=pk).update(
+                status=Job.QUEUED, last_error=error, locked_by='', locked_at=None,
+                run_after=timezone.now() + timedelta(seconds=_retry_delay(job.attempts)),
+            )
+            return Job.QUEUED
+        Job.objects.filter(pk=pk).update(status=Job.FAILED, last_error=error, finished_at=timezone.now())
+        return Job.FAILED
+    Job.objects.filter(pk=pk).update(status=Job.SUCCEEDED, result=result, finished_at=timezone.now())
+    return Job.SUCCEEDED
@@ -0,0 +1,146 @@
+import io
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .models import Job
+from .queue import register, enqueue, claim_batch, execute, release, requeue_stale
+
+calls = []
+
+
+@register('tests.record')
+def record(payload):
+    calls.append(payload)
+    return {'ok': True}
+
+
+@register('tests.flaky')
+def flaky(payload):
+    calls.append(payload)
+    if len(calls) < payload['fail_times'] + 1:
+        raise RuntimeError('boom')
+    return {'ok': True}
+
+
+@override_settings(JOBS_EAGER=False, JOBS_RETRY_BASE_DELAY=0)
+class QueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_idempotency_key_deduplicates(self):
+        first = enqueue('tests.record', {'n': 1}, idempotency_key='k1')
+        second = enqueue('tests.record', {'n': 2}, idempotency_key='k1')
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_failed_job_queued_again_for_same_key(self):
+        first = enqueue('tests.flaky', {'fail_times': 5}, idempotency_key='k2', max_attempts=1)
+        claim_batch(1)
+        self.assertEqual(execute(first.pk), Job.FAILED)
+        second = enqueue('tests.flaky', {'fail_times': 0}, idempotency_key='k2')
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual((second.status, second.attempts, second.last_error), (Job.QUEUED, 0, ''))
+        self.assertEqual(second.payload, {'fail_times': 0})
+
+    def test_claim_and_execute(self):
+        job = enqueue('tests.record', {'n': 1})
+        self.assertEqual(claim_batch(10), [job.pk])
+        self.assertEqual(claim_batch(10), [])
+        self.assertEqual(execute(job.pk), Job.SUCCEEDED)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.result), (Job.SUCCEEDED, 1, {'ok': True}))
+
+    def test_retries_then_fails(self):
+        job = enqueue('tests.flaky', {'fail_times': 5}, max_attempts=2)
+        for expected in (Job.QUEUED, Job.FAILED):
+            claim_batch(1)
+            self.assertEqual(execute(job.pk), expected)
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+        self.assertIn('boom', job.last_error)
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager_mode_retries_inline(self):
+        job = enqueue('tests.flaky', {'fail_times': 1})
+        self.assertEqual((job.status, job.attempts), (Job.SUCCEEDED, 2))
+
+
+class FakePool:
+    """Stands in for ProcessPoolExecutor: runs jobs inline, or dies like a pool whose process was killed."""
+
+    def __init__(self, broken=False):
+        self.broken = broken
+        self.submitted = []
+
+    def submit(self, fn, pk):
+        if self.broken and self.submitted:
+            raise BrokenProcessPool('pool is broken')
+        self.submitted.append(pk)
+        future = Future()
+        if self.broken:
+            future.set_exception(BrokenProcessPool('process terminated abruptly'))
+        else:
+            future.set_result(execute(pk))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+@override_settings(JOBS_EAGER=False, JOBS_RETRY_BASE_DELAY=0)
+class WorkerRecoveryTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_release_requeues_or_fails(self):
+        retry = enqueue('tests.record', max_attempts=2)
+        last = enqueue('tests.record', max_attempts=1)
+        claim_batch(2)
+        self.assertEqual(release([retry.pk, last.pk], 'killed'), 1)
+        retry.refresh_from_db()
+        last.refresh_from_db()
+        self.assertEqual((retry.status, retry.locked_by), (Job.QUEUED, ''))
+        self.assertEqual((last.status, last.last_error), (Job.FAILED, 'killed'))
+
+    def test_requeue_stale_skips_live_worker(self):
+        mine = enqueue('tests.record')
+        lost = enqueue('tests.record')
+        claim_batch(1, 'me')
+        claim_batch(1, 'gone')
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(requeue_stale(60, exclude_worker='me'), 1)
+        self.assertEqual(Job.objects.get(pk=lost.pk).status, Job.QUEUED)
+        self.assertEqual(Job.objects.get(pk=mine.pk).status, Job.RUNNING)
+
+    def test_broken_pool_is_replaced_and_jobs_released(self):
+        jobs = [enqueue('tests.record', {'n': n}) for n in range(3)]
+        pools = [FakePool(broken=True), FakePool()]
+        err = io.StringIO()
+        with mock.patch('jobs.management.commands.run_jobs.ProcessPoolExecutor', side_effect=pools):
+            call_command('run_jobs', '--once', '--processes', '3', '--poll-interval', '0', stdout=io.StringIO(), stderr=err)
+        # the first job was on the dying process, the other two were claimed but never started
+        self.assertEqual(pools[0].submitted, [jobs[0].pk])
+        self.assertIn('Released jobs', err.getvalue())
+        for job in jobs:
+            job.refresh_from_db()
+            self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(Job.objects.get(pk=jobs[0].pk).attempts, 2)
+        self.assertEqual(len(calls), 3)
+
+
+class JobStatusAPITest(APITestCase):
+    def test_requires_staff(self):
+        job = Job.objects.create(name='tests.record', run_after='2026-01-01T00:00:00Z')
+        self.assertEqual(self.client.get(f'/api/jobs/{job.pk}/').status_code, 403)
+        admin = get_user_model().objects.create_superuser('admin', 'a@example.com', 'pw')
+        self.client.force_authenticate(admin)
+        response = self.client.get(f'/api/jobs/{job.pk}/')
+        self.assertEqual(response.json()['status'], Job.QUEUED)
@@ -0,0 +1,22 @@
+from rest_framework import viewsets
+from rest_framework.permissions import IsAdminUser
+from .models import Job
+from .serializers import JobSerializer
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Job status for staff users. Filters: ?status=, ?name=, ?key= (idempotency key)."""
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [IsAdminUser]
+
+    def get_queryset(self):
+        queryset = Job.objects.all()
+        params = self.request.query_params
+        if params.get('status'):
+            queryset = queryset.filter(status=params['status'])
+        if params.get('name'):
+            queryset = queryset.filter(name=params['name'])
+        if params.get('key'):
+            queryset = queryset.filter(idempotency_key=params['key'])
+        return queryset[:200] if self.action == 'list' else queryset
@@ -0,0 +1,19 @@
+"""Entry points executed inside run_jobs pool processes.
+
+Pool processes are started with the "spawn" method (fresh interpreters, the
+only method on Windows), so nothing here may touch models at import time.
+"""
+
+
+def init_process():
+    import django
+    django.setup()
+
+
+def run(pk):
+    from django.db import connections
+    from .queue import execute
+    try:
+        return execute(pk)
+    finally:
+        connections.close_all()
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class SearchConfig(AppConfig):
+    name = 'search'
+    verbose_name = 'Поиск'
+
+    def ready(self):
+        from .index import connect_index
+        connect_index()
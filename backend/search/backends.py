@@ -0,0 +1,94 @@
+"""Full-text queries over SearchDocument, per database vendor.
+
+Both backends prefix-match every word of the query (all must occur), rank
+title matches above body matches and return the title and a body snippet with
+the matches between MARK_START/MARK_END. Only the returned rows are
+highlighted, so the cost of highlighting does not grow with the index.
+"""
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.utils.html import escape
+
+from .index import MARK_END, MARK_START
+
+MAX_TERMS = 8
+SNIPPET_WORDS = 24
+
+TERMS_RE = re.compile(r'\w+')
+
+SQLITE_SQL = """
+SELECT d.type, d.object_id, -bm25(search_searchdocument_fts, 10.0, 1.0) AS rank,
+       highlight(search_searchdocument_fts, 0, %s, %s),
+       snippet(search_searchdocument_fts, 1, %s, %s, '…', %s)
+FROM search_searchdocument_fts
+JOIN search_searchdocument d ON d.id = search_searchdocument_fts.rowid
+WHERE search_searchdocument_fts MATCH %s AND d.type IN ({types})
+ORDER BY rank DESC, d.id
+LIMIT %s
+"""
+
+POSTGRES_SQL = """
+WITH q AS (SELECT to_tsquery('simple', %s) AS query),
+hits AS (
+    SELECT d.id, ts_rank(d.search_vector, q.query) AS rank
+    FROM search_searchdocument d, q
+    WHERE d.search_vector @@ q.query AND d.type IN ({types})
+    ORDER BY rank DESC, d.id
+    LIMIT %s
+)
+SELECT d.type, d.object_id, hits.rank,
+       ts_headline('simple', d.title, q.query, %s),
+       ts_headline('simple', d.body, q.query, %s)
+FROM hits JOIN search_searchdocument d ON d.id = hits.id, q
+ORDER BY hits.rank DESC, d.id
+"""
+
+
+def parse_terms(query):
+    """Lowercased words of a user query; punctuation and query operators are dropped."""
+    return TERMS_RE.findall(query.lower())[:MAX_TERMS]
+
+
+def render_highlight(text):
+    """HTML-escape indexed text and turn the match markers into <mark> tags."""
+    return escape(text).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+def _sqlite(cursor, terms, types, limit):
+    # quoted terms are plain strings to FTS5, the trailing * makes them prefixes
+    match = ' '.join(f'"{term}"*' for term in terms)
+    sql = SQLITE_SQL.format(types=', '.join(['%s'] * len(types)))
+    cursor.execute(sql, [MARK_START, MARK_END, MARK_START, MARK_END, SNIPPET_WORDS, match, *types, limit])
+    return cursor.fetchall()
+
+
+def _postgres(cursor, terms, types, limit):
+    query = ' & '.join(f'{term}:*' for term in terms)
+    selection = f'StartSel={MARK_START}, StopSel={MARK_END}'
+    title_options = f'{selection}, HighlightAll=true'
+    body_options = f'{selection}, MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}, MaxFragments=2, FragmentDelimiter=" … "'
+    sql = POSTGRES_SQL.format(types=', '.join(['%s'] * len(types)))
+    cursor.execute(sql, [query, *types, limit, title_options, body_options])
+    return cursor.fetchall()
+
+
+BACKENDS = {
+    'sqlite': _sqlite,
+    'postgresql': _postgres,
+}
+
+
+def search(terms, types, limit):
+    """Ranked matches of terms among documents of types: [{type, id, title, snippet, rank}]."""
+    try:
+        backend = BACKENDS[connection.vendor]
+    except KeyError:
+        raise ImproperlyConfigured(f'Full-text search is not available on {connection.vendor}')
+    with connection.cursor() as cursor:
+        rows = backend(cursor, terms, types, limit)
+    return [
+        {'type': type_, 'id': object_id, 'title': render_highlight(title), 'snippet': render_highlight(snippet), 'rank': rank}
+        for type_, object_id, rank, title, snippet in rows
+    ]
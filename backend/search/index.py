@@ -0,0 +1,123 @@
+"""What /api/search/ indexes and how the index follows model changes.
+
+SOURCES maps a result type to a model and a function returning the (title,
+body) text of an instance. post_save/post_delete keep single objects current,
+bulk writes are picked up through content.cache.bulk_saved, and
+`manage.py rebuild_search_index` rebuilds everything.
+"""
+import html
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.utils.html import strip_tags
+
+from content.cache import bulk_saved, mark_changed
+from .models import SearchDocument
+
+BATCH_SIZE = 500
+# private-use characters wrapping matches in highlighted text (see backends.py)
+MARK_START = '\ue000'
+MARK_END = '\ue001'
+
+
+def plain_text(value):
+    """Text of an HTML fragment with whitespace collapsed and the match markers removed."""
+    text = html.unescape(strip_tags(value or ''))
+    return ' '.join(text.replace(MARK_START, '').replace(MARK_END, '').split())
+
+
+def _page(page):
+    return page.title, page.body
+
+
+def _about(about):
+    return about.title, about.body
+
+
+def _director(director):
+    return director.name, f'{director.title} {director.bio}'
+
+
+def _certificate(certificate):
+    return certificate.title, f'{certificate.year} {certificate.get_category_display()} {certificate.get_level_display()}'
+
+
+# result type -> (model label, (title, body) of an instance)
+SOURCES = {
+    'page': ('content.Page', _page),
+    'about': ('content.About', _about),
+    'director': ('content.Director', _director),
+    'certificate': ('achievements.Certificate', _certificate),
+}
+
+
+def document_values(type_, objs):
+    """SearchDocument field values for instances of the model of type_."""
+    text = SOURCES[type_][1]
+    max_length = SearchDocument._meta.get_field('title').max_length
+    for obj in objs:
+        title, body = text(obj)
+        yield {'type': type_, 'object_id': obj.pk, 'title': plain_text(title)[:max_length], 'body': plain_text(body)}
+
+
+def source_type(model):
+    """Result type indexing model, or None."""
+    label = model._meta.label_lower
+    return next((type_ for type_, (source, _) in SOURCES.items() if source.lower() == label), None)
+
+
+def index_objects(model, objs):
+    """Insert or refresh the documents of objs (instances of model) with batched upserts."""
+    type_ = source_type(model)
+    docs = [SearchDocument(**values) for values in document_values(type_, objs)]
+    if not docs:
+        return 0
+    SearchDocument.objects.bulk_create(
+        docs, batch_size=BATCH_SIZE, update_conflicts=True,
+        unique_fields=['type', 'object_id'], update_fields=['title', 'body', 'updated_at'],
+    )
+    # bulk_create sends no post_save, so invalidate the cached search payloads here
+    mark_changed(SearchDocument)
+    return len(docs)
+
+
+def remove_object(model, pk):
+    if SearchDocument.objects.filter(type=source_type(model), object_id=pk).delete()[0]:
+        mark_changed(SearchDocument)
+
+
+def rebuild(types=None):
+    """Recreate the documents of types (default: all) from the database; returns {type: documents}."""
+    counts = {}
+    with transaction.atomic():
+        for type_ in types or SOURCES:
+            model = apps.get_model(SOURCES[type_][0])
+            SearchDocument.objects.filter(type=type_).delete()
+            docs = (SearchDocument(**values) for values in document_values(type_, model._default_manager.order_by().iterator(chunk_size=BATCH_SIZE)))
+            counts[type_] = len(SearchDocument.objects.bulk_create(docs, batch_size=BATCH_SIZE))
+        mark_changed(SearchDocument)
+    return counts
+
+
+def _on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_objects(sender, [instance])
+
+
+def _on_delete(sender, instance, **kwargs):
+    remove_object(sender, instance.pk)
+
+
+def _on_bulk_saved(sender, objs, **kwargs):
+    index_objects(sender, objs)
+
+
+def connect_index():
+    """Keep the documents of every SOURCES model in step with its rows."""
+    for type_, (label, _) in SOURCES.items():
+        model = apps.get_model(label)
+        uid = f'search:{type_}'
+        post_save.connect(_on_save, sender=model, dispatch_uid=f'{uid}:save')
+        post_delete.connect(_on_delete, sender=model, dispatch_uid=f'{uid}:delete')
+        bulk_saved.connect(_on_bulk_saved, sender=model, dispatch_uid=f'{uid}:bulk')
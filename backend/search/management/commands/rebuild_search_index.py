@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from search.index import SOURCES, rebuild
+
+
+class Command(BaseCommand):
+    help = ('Rebuild the full-text search documents from the database. Saves and deletes keep the index '
+            'current; this is for data written around the ORM signals (raw SQL, loaddata, restores).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', action='append', dest='types', choices=sorted(SOURCES),
+                            help='Only rebuild this result type (repeatable)')
+
+    def handle(self, *args, **options):
+        for type_, count in rebuild(options['types']).items():
+            self.stdout.write(f'{type_}: {count} documents')
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-18 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(max_length=20, verbose_name='Тип')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID объекта')),
+                ('title', models.CharField(blank=True, max_length=255, verbose_name='Заголовок')),
+                ('body', models.TextField(blank=True, verbose_name='Текст')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Обновлён')),
+            ],
+            options={
+                'verbose_name': 'Поисковый документ',
+                'verbose_name_plural': 'Поисковые документы',
+                'constraints': [models.UniqueConstraint(fields=('type', 'object_id'), name='search_document_unique_object')],
+            },
+        ),
+    ]
@@ -0,0 +1,91 @@
+"""Full-text index over SearchDocument.title/body, and documents for the existing rows.
+
+Postgres: a generated tsvector column (title weighted A, body B) with a GIN
+index. SQLite: an external-content FTS5 table kept in sync by triggers. Note
+that SQLite rebuilds a table for most ALTERs, which drops its triggers, so a
+later schema change of SearchDocument must recreate them.
+"""
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE search_searchdocument ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX search_document_vector_idx ON search_searchdocument USING gin (search_vector)',
+]
+POSTGRES_BACKWARD = [
+    'DROP INDEX IF EXISTS search_document_vector_idx',
+    'ALTER TABLE search_searchdocument DROP COLUMN IF EXISTS search_vector',
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE search_searchdocument_fts USING fts5(
+        title, body, content='search_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER search_searchdocument_fts_insert AFTER INSERT ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER search_searchdocument_fts_delete AFTER DELETE ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts(search_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER search_searchdocument_fts_update AFTER UPDATE ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts(search_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO search_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS search_searchdocument_fts_insert',
+    'DROP TRIGGER IF EXISTS search_searchdocument_fts_delete',
+    'DROP TRIGGER IF EXISTS search_searchdocument_fts_update',
+    'DROP TABLE IF EXISTS search_searchdocument_fts',
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(sql)
+
+
+def create_index(apps, schema_editor):
+    _run(schema_editor, {'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD})
+
+
+def drop_index(apps, schema_editor):
+    _run(schema_editor, {'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD})
+
+
+def index_existing(apps, schema_editor):
+    from search.index import BATCH_SIZE, SOURCES, document_values
+    SearchDocument = apps.get_model('search', 'SearchDocument')
+    for type_, (label, _) in SOURCES.items():
+        rows = apps.get_model(label)._default_manager.order_by().iterator(chunk_size=BATCH_SIZE)
+        docs = (SearchDocument(**values) for values in document_values(type_, rows))
+        SearchDocument.objects.bulk_create(docs, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+        ('achievements', '0004_image_metadata'),
+        ('content', '0005_image_metadata'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+        migrations.RunPython(index_existing, migrations.RunPython.noop),
+    ]
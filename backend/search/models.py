@@ -0,0 +1,25 @@
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """Searchable text of one indexed object (see search/index.py).
+
+    The full-text index over title and body lives outside the ORM: a generated
+    tsvector column with a GIN index on Postgres, an FTS5 table kept in sync by
+    triggers on SQLite (migration 0002).
+    """
+    type = models.CharField("Тип", max_length=20)
+    object_id = models.PositiveBigIntegerField("ID объекта")
+    title = models.CharField("Заголовок", max_length=255, blank=True)
+    body = models.TextField("Текст", blank=True)
+    updated_at = models.DateTimeField("Обновлён", auto_now=True)
+
+    class Meta:
+        verbose_name = 'Поисковый документ'
+        verbose_name_plural = 'Поисковые документы'
+        constraints = [
+            models.UniqueConstraint(fields=['type', 'object_id'], name='search_document_unique_object'),
+        ]
+
+    def __str__(self):
+        return f"{self.type} #{self.object_id}"
@@ -0,0 +1,99 @@
+import io
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from achievements.models import Certificate
+from content.cache import bulk_saved
+from content.models import About, Director, Page
+from .models import SearchDocument
+
+
+def _certificate(title, level='city'):
+    return Certificate(title=title, year='2024', image='certificates/a.jpg', category='students', level=level)
+
+
+class SearchAPITest(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def search(self, query, **params):
+        response = self.client.get('/api/search/', {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_index_follows_saves_and_deletes(self):
+        page = Page.objects.create(slug='history', title='Мектеп тарихы', body='<p>Біздің мектеп 1960 жылы ашылды</p>')
+        self.assertEqual([(r['type'], r['id']) for r in self.search('тарих')], [('page', page.pk)])
+        page.title = 'Мектеп өмірі'
+        page.save()
+        self.assertEqual(self.search('тарих'), [])
+        self.assertEqual(len(self.search('өмір')), 1)
+        page.delete()
+        self.assertEqual(self.search('өмір'), [])
+        self.assertFalse(SearchDocument.objects.exists())
+
+    def test_ranked_and_highlighted(self):
+        Director.objects.create(name='Айгүл Серікова', title='Директор', bio='Математика пәнінің мұғалімі')
+        _certificate('Математика олимпиадасы').save()
+        About.objects.create(title='Біз туралы', body='Мектепте <script>alert(1)</script> математика & физика')
+        results = self.search('матем')
+        # the title match ranks above the body matches
+        self.assertEqual(results[0]['type'], 'certificate')
+        self.assertEqual(results[0]['title'], '<mark>Математика</mark> олимпиадасы')
+        self.assertEqual({r['type'] for r in results}, {'certificate', 'director', 'about'})
+        about = next(r for r in results if r['type'] == 'about')
+        self.assertNotIn('<script>', about['snippet'])
+        self.assertIn('<mark>математика</mark> &amp; физика', about['snippet'])
+
+    def test_all_terms_must_match(self):
+        _certificate('Қалалық олимпиада').save()
+        _certificate('Аудандық олимпиада', level='district').save()
+        self.assertEqual(len(self.search('олимпиада')), 2)
+        self.assertEqual([r['title'] for r in self.search('олимп қала')], ['<mark>Қалалық</mark> <mark>олимпиада</mark>'])
+        # FTS operators and quotes in the query are plain words
+        self.assertEqual(self.search('"олимп* OR NEAR('), [])
+        self.assertEqual(self.search(''), [])
+
+    def test_type_and_limit(self):
+        Page.objects.create(slug='olymp', title='Олимпиада', body='')
+        for i in range(3):
+            _certificate(f'Олимпиада {i}').save()
+        self.assertEqual({r['type'] for r in self.search('олимпиада', type='page')}, {'page'})
+        self.assertEqual(len(self.search('олимпиада', limit=2)), 2)
+        response = self.client.get('/api/search/', {'q': 'олимпиада', 'type': 'news'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_writes_are_indexed(self):
+        created = Certificate.objects.bulk_create([_certificate('Спорт жарысы'), _certificate('Шахмат турнирі')])
+        self.assertEqual(self.search('шахмат'), [])
+        bulk_saved.send(sender=Certificate, objs=created)
+        self.assertEqual(len(self.search('шахмат')), 1)
+
+    def test_cached_results_invalidated(self):
+        _certificate('Робототехника').save()
+        self.assertEqual(len(self.search('робот')), 1)
+        _certificate('Робот құрастыру').save()
+        self.assertEqual(len(self.search('робот')), 2)
+
+    def test_query_count_independent_of_index_size(self):
+        counts = []
+        for size in (10, 1000):
+            objs = Certificate.objects.bulk_create(_certificate(f'Сертификат {i}') for i in range(size))
+            bulk_saved.send(sender=Certificate, objs=objs)
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(len(self.search('сертификат', limit=5)), 5)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_rebuild_command(self):
+        Page.objects.create(slug='a', title='Кітапхана', body='')
+        SearchDocument.objects.all().delete()
+        out = io.StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('page: 1 documents', out.getvalue())
+        self.assertEqual(len(self.search('кітап')), 1)
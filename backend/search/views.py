@@ -0,0 +1,41 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from content.cache import cached_response
+from .backends import parse_terms, search
+from .index import SOURCES
+from .models import SearchDocument
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+
+
+class SearchView(APIView):
+    """Ranked full-text search over pages, about, director and certificates.
+
+    ?q= words to find (prefix match, all must occur), ?type= comma-separated
+    result types (page, about, director, certificate), ?limit= (20, at most 50).
+    `title` and `snippet` are HTML-escaped text with the matches in <mark>.
+    """
+    permission_classes = [AllowAny]
+    # the index is updated with every indexed model, so its generation covers them all
+    cache_models = (SearchDocument,)
+
+    def get(self, request, *args, **kwargs):
+        return cached_response(request, self.cache_models, self._get, *args, **kwargs)
+
+    def _get(self, request, *args, **kwargs):
+        params = request.query_params
+        query = params.get('q', '').strip()
+        types = [t.strip() for t in params.get('type', '').split(',') if t.strip()] or list(SOURCES)
+        unknown = sorted(set(types) - set(SOURCES))
+        if unknown:
+            raise ValidationError({'type': f'Unknown type: {", ".join(unknown)}'})
+        try:
+            limit = min(max(int(params.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        except ValueError:
+            raise ValidationError({'limit': 'Must be a number'})
+        terms = parse_terms(query)
+        return Response({'query': query, 'results': search(terms, types, limit) if terms else []})
@@ -1,26 +1,34 @@
 """
-Move/copy S3 objects from bucket root into folder prefixes (hero/, about/, director/)
+Move S3 objects to new keys by rewriting a key prefix, and update the media names stored in the database.
 Usage (PowerShell):
 $env:AWS_ACCESS_KEY_ID="..."
 $env:AWS_SECRET_ACCESS_KEY="..."
 $env:AWS_S3_REGION_NAME="eu-north-1"
 $env:AWS_STORAGE_BUCKET_NAME="59school-media-123"
-py backend\tools\move_s3_objects.py --dry-run
-py backend\tools\move_s3_objects.py --apply
+py backend\tools\move_s3_objects.py --from certificates/ --to media/certificates/ --dry-run
+py backend\tools\move_s3_objects.py --from certificates/ --to media/certificates/ --apply --update-db
+py backend\tools\move_s3_objects.py --files-map --apply
 
 Script behavior:
-- Scans bucket for objects with no '/' in key (root-level objects).
-- If basename matches a known filename (case-insensitive) in FILES_MAP, it will copy the object to prefix/<basename> and, when --apply is used, delete the original object.
-- By default runs in dry-run mode printing planned operations.
-- Safe: does copy first, then delete only after successful copy.
-
-Note: if filenames on S3 don't match expected basenames, you can modify FILES_MAP to include them or run manual aws s3 mv commands.
+- --from/--to: every object whose key starts with --from is moved to --to + the rest of the key
+  (variants under <dir>/variants/ move along with their images).
+- --files-map: the original mode; root-level objects whose basename is in FILES_MAP go to prefix/<basename>.
+- By default runs in dry-run mode printing planned operations. --apply needs --update-db (the stored names
+  follow the objects) or --keep-source (the originals stay, so nothing that references them breaks).
+- Copies run in parallel (--workers) as server-side copies; objects over 5 GB use a multipart copy.
+- With --update-db, ImageField names (and their variants JSON) pointing at moved keys are rewritten in bulk
+  in one transaction. This needs the Django settings (DATABASE_URL etc.) of the target environment; it refuses
+  to run against SQLite (the local db.sqlite3 a missing DATABASE_URL falls back to) before anything is copied.
+- Safe: sources are deleted only after their copy succeeded and the database was updated, with batched
+  delete_objects calls (up to 1000 keys per request).
 """
 import os
 import sys
 import argparse
-import boto3
-from botocore.exceptions import ClientError
+import time
+# shared pooled S3 client from the backend (content/s3.py does not need Django)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from content.s3 import copy_objects, delete_keys, list_objects, shared_client  # noqa: E402
 
 # Map of target prefix -> list of possible filenames (exact basenames)
 FILES_MAP = {
@@ -36,36 +44,60 @@ for prefix, names in FILES_MAP.items():
         lookup[n.lower()] = prefix
 
 
-def iter_root_objects(s3, bucket):
-    paginator = s3.get_paginator('list_objects_v2')
-    for page in paginator.paginate(Bucket=bucket):
-        for obj in page.get('Contents', []):
-            key = obj['Key']
-            if '/' not in key:
-                yield key
+def plan_prefix_moves(s3, bucket, src_prefix, dst_prefix):
+    """[(src, dst, size)] for every object under src_prefix."""
+    moves = []
+    for obj in list_objects(s3, bucket, src_prefix):
+        key = obj['Key']
+        # with --to nested inside --from (a/ -> a/b/), objects already moved are left alone
+        if dst_prefix.startswith(src_prefix) and key.startswith(dst_prefix):
+            continue
+        moves.append((key, dst_prefix + key[len(src_prefix):], obj['Size']))
+    return moves
+
+
+def plan_files_map_moves(s3, bucket):
+    """[(src, dst, size)] of root-level objects whose basename is in FILES_MAP."""
+    moves = []
+    for obj in list_objects(s3, bucket):
+        key = obj['Key']
+        if '/' in key:
+            continue
+        prefix = lookup.get(key.lower())
+        if prefix:
+            moves.append((key, f'{prefix}/{key}', obj['Size']))
+    return moves
 
 
-def move_object(s3, bucket, key, dest_key):
-    copy_source = {'Bucket': bucket, 'Key': key}
-    try:
-        # copy without ACL to respect BucketOwnerEnforced
-        s3.copy_object(Bucket=bucket, CopySource=copy_source, Key=dest_key)
-        return True, None
-    except ClientError as e:
-        return False, e
+def setup_database():
+    """Set up Django for --update-db; returns an error message when the database is not the deployed one."""
+    if not os.environ.get('DATABASE_URL'):
+        return 'DATABASE_URL is not set, the settings would use the local SQLite database'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+    from django.db import connection
+    if connection.vendor == 'sqlite':
+        return f'the database is SQLite ({connection.settings_dict["NAME"]}), not the environment the bucket serves'
+    return None
 
 
-def delete_object(s3, bucket, key):
-    try:
-        s3.delete_object(Bucket=bucket, Key=key)
-        return True, None
-    except ClientError as e:
-        return False, e
+def update_database(copied):
+    """Rewrite ImageField names of the copied objects; returns {model label: rows updated}."""
+    from content.media_refs import rename_media
+    return rename_media(dict(copied))
 
 
 def main():
-    parser = argparse.ArgumentParser(description='Move root S3 objects into folder prefixes according to FILES_MAP')
+    parser = argparse.ArgumentParser(description='Move S3 objects by rewriting a key prefix (or according to FILES_MAP)')
+    parser.add_argument('--from', dest='src_prefix', help='Key prefix to move, e.g. certificates/')
+    parser.add_argument('--to', dest='dst_prefix', help='New key prefix, e.g. media/certificates/')
+    parser.add_argument('--files-map', action='store_true', help='Move root objects listed in FILES_MAP into their folders')
     parser.add_argument('--apply', action='store_true', help='Perform copy+delete (default is dry-run)')
+    parser.add_argument('--dry-run', action='store_true', help='Only print planned moves (default)')
+    parser.add_argument('--update-db', action='store_true', help='Rewrite ImageField names in the database to the new keys')
+    parser.add_argument('--keep-source', action='store_true', help='Copy only, do not delete the original objects')
+    parser.add_argument('--workers', type=int, default=16, help='Parallel copies')
     parser.add_argument('--bucket', type=str, default=os.environ.get('AWS_STORAGE_BUCKET_NAME'), help='Bucket name (env AWS_STORAGE_BUCKET_NAME)')
     parser.add_argument('--region', type=str, default=os.environ.get('AWS_S3_REGION_NAME') or os.environ.get('AWS_REGION'), help='AWS region')
     args = parser.parse_args()
@@ -73,68 +105,68 @@ def main():
     if not args.bucket:
         print('ERROR: bucket not specified (pass --bucket or set AWS_STORAGE_BUCKET_NAME)')
         sys.exit(2)
-
-    session = boto3.session.Session(region_name=args.region)
-    s3 = session.client('s3')
-
-    root_keys = list(iter_root_objects(s3, args.bucket))
-    if not root_keys:
-        print('No root-level objects found in bucket')
-        return
-
-    planned = []
-    for key in root_keys:
-        basename = os.path.basename(key)
-        prefix = lookup.get(basename.lower())
-        if prefix:
-            dest_key = f"{prefix}/{basename}"
-            planned.append((key, dest_key))
-        else:
-            # no mapping found
-            pass
-
+    if args.files_map == bool(args.src_prefix is not None or args.dst_prefix is not None):
+        parser.error('pass either --from and --to, or --files-map')
+    if not args.files_map and (not args.src_prefix or args.dst_prefix is None or args.src_prefix == args.dst_prefix):
+        parser.error('--from and --to must both be set and differ')
+    if args.apply and not args.dry_run and not (args.update_db or args.keep_source):
+        parser.error('--apply needs --update-db or --keep-source, otherwise the stored names point at deleted objects')
+    if args.update_db:
+        error = setup_database()
+        if error:
+            print(f'ERROR: refusing --update-db: {error}')
+            sys.exit(2)
+
+    s3 = shared_client(args.region)
+
+    if args.files_map:
+        planned = plan_files_map_moves(s3, args.bucket)
+    else:
+        planned = plan_prefix_moves(s3, args.bucket, args.src_prefix, args.dst_prefix)
     if not planned:
-        print('No matching root objects to move based on FILES_MAP. Found root keys:')
-        for k in root_keys:
-            print(' -', k)
-        print('\nIf your files have different names, update FILES_MAP in this script or move manually.')
+        print('No matching objects to move')
         return
 
-    print('Planned moves:')
-    for src, dst in planned:
+    total_bytes = sum(size for _, _, size in planned)
+    print(f'Planned moves ({len(planned)} objects, {total_bytes / (1024 * 1024):.1f} MiB):')
+    for src, dst, _ in planned[:50]:
         print(f'  {src} -> {dst}')
+    if len(planned) > 50:
+        print(f'  ... and {len(planned) - 50} more')
 
-    if not args.apply:
+    if not args.apply or args.dry_run:
         print('\nDRY-RUN: to perform actions run with --apply')
         return
 
-    # apply changes: copy then delete
-    succeeded = []
-    failed = []
-    for src, dst in planned:
-        ok, err = move_object(s3, args.bucket, src, dst)
-        if ok:
-            print(f'Copied: {src} -> {dst}')
-            # delete original
-            ok_del, err_del = delete_object(s3, args.bucket, src)
-            if ok_del:
-                print(f'Deleted original: {src}')
-                succeeded.append((src, dst))
-            else:
-                print(f'ERROR deleting original {src}: {err_del}')
-                failed.append((src, dst, f'delete error: {err_del}'))
-        else:
-            print(f'ERROR copying {src} -> {dst}: {err}')
-            failed.append((src, dst, f'copy error: {err}'))
+    start = time.perf_counter()
+    copied, failed = copy_objects(s3, args.bucket, planned, workers=args.workers)
+    print(f'Copied {len(copied)} objects in {time.perf_counter() - start:.1f}s')
+
+    if args.update_db and copied:
+        try:
+            updated = update_database(copied)
+        except Exception as e:
+            # the copies are in place and the sources untouched, so the site keeps working
+            print(f'ERROR updating the database, originals were not deleted: {e}')
+            sys.exit(1)
+        for label, count in updated.items():
+            print(f'Updated {count} {label} rows')
+
+    delete_errors = []
+    if copied and not args.keep_source:
+        delete_errors = delete_keys(s3, args.bucket, [src for src, _ in copied])
+        print(f'Deleted {len(copied) - len(delete_errors)} originals')
 
     print('\nSummary:')
-    print('  succeeded:', len(succeeded))
-    print('  failed   :', len(failed))
-    if failed:
-        print('Failed entries:')
-        for f in failed:
-            print(' ', f)
+    print('  moved  :', len(copied) - len(delete_errors))
+    print('  failed :', len(failed) + len(delete_errors))
+    for src, dst, err in failed:
+        print(f'  ERROR copying {src} -> {dst}: {err}')
+    for key, err in delete_errors:
+        print(f'  ERROR deleting original {key}: {err}')
+    if failed or delete_errors:
+        sys.exit(1)
+
 
 if __name__ == '__main__':
     main()
-
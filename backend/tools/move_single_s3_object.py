@@ -17,8 +17,10 @@ Behavior:
 import os
 import sys
 import argparse
-import boto3
 from botocore.exceptions import ClientError
+# shared pooled S3 client from the backend (content/s3.py does not need Django)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from content.s3 import shared_client  # noqa: E402
 
 
 def head_exists(s3, bucket, key):
@@ -64,8 +66,7 @@ def main():
         print('ERROR: bucket not specified (use --bucket or set AWS_STORAGE_BUCKET_NAME)')
         sys.exit(2)
 
-    session = boto3.session.Session(region_name=args.region)
-    s3 = session.client('s3')
+    s3 = shared_client(args.region)
 
     src = args.src
     dst = args.dst
@@ -11,9 +11,10 @@
 
 import os
 import sys
-import boto3
 import mimetypes
-from botocore.exceptions import ClientError
+# shared pooled S3 client from the backend (content/s3.py does not need Django)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from content.s3 import shared_client  # noqa: E402
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 FRONT_PUBLIC = os.path.join(BASE_DIR, 'front', 'public')
@@ -32,8 +33,7 @@ if __name__ == '__main__':
         print(f'ERROR: front/public not found at expected path: {FRONT_PUBLIC}')
         sys.exit(2)
 
-    session = boto3.session.Session(aws_access_key_id=aws_key, aws_secret_access_key=aws_secret, region_name=region)
-    s3 = session.client('s3')
+    s3 = shared_client(region)
 
     uploaded = 0
     errors = 0
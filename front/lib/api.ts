@@ -15,11 +15,20 @@ function ensureImageUrl(img: string | null | undefined) {
     return `${BACKEND_BASE}/media/${img}`;
 }
 
+// srcset strings per format, e.g. { webp: "https://... 640w, https://... 1280w" }
+export type ImageSrcSet = Partial<Record<'webp' | 'jpeg', string>>;
+
 export interface Certificate {
     id: number;
     title: string;
     year: string;
     image: string;
+    image_srcset?: ImageSrcSet;
+    image_width?: number | null;
+    image_height?: number | null;
+    image_color?: string;
+    // tiny base64 WebP, usable as next/image blurDataURL
+    image_placeholder?: string;
     category: 'teachers' | 'students';
     level: 'district' | 'city';
     order: number;
@@ -30,6 +39,12 @@ export interface HeroSlide {
     title?: string;
     subtitle?: string;
     image: string;
+    image_srcset?: ImageSrcSet;
+    image_width?: number | null;
+    image_height?: number | null;
+    image_color?: string;
+    // tiny base64 WebP, usable as next/image blurDataURL
+    image_placeholder?: string;
     order: number;
 }
 
@@ -47,7 +62,30 @@ export interface Page {
     body?: string;
 }
 
+// Homepage sections are loaded with a single request to /api/content/home/ and shared
+// between components; the promise is reset on failure so the next call retries.
+let _homePromise: Promise<any> | null = null;
+
+function fetchHome(): Promise<any> {
+    if (!_homePromise) {
+        _homePromise = fetch(`${API_URL}/home/`)
+            .then(res => {
+                if (!res.ok) throw new Error('Failed to fetch home');
+                return res.json();
+            })
+            .catch(err => {
+                _homePromise = null;
+                throw err;
+            });
+    }
+    return _homePromise;
+}
+
 export const apiService = {
+    async getHome(): Promise<any> {
+        return fetchHome();
+    },
+
     async getCertificates(category?: string, level?: string) {
         const params = new URLSearchParams();
         if (category) params.append('category', category);
@@ -65,66 +103,38 @@ export const apiService = {
     },
 
     async getHeroSlides(): Promise<HeroSlide[]> {
-        const res = await fetch(`${API_URL}/hero-slides/`);
-        if (!res.ok) throw new Error('Failed to fetch hero slides');
-        const data = await res.json();
+        const data = (await fetchHome()).hero_slides || [];
         return data.map((d: any) => ({ ...d, image: ensureImageUrl(d.image) }));
     },
 
     async getStats(): Promise<Stat[]> {
-        const res = await fetch(`${API_URL}/stats/`);
-        if (!res.ok) throw new Error('Failed to fetch stats');
-        return res.json();
+        return (await fetchHome()).stats || [];
     },
 
     async getAbout(): Promise<any> {
-        const res = await fetch(`${API_URL}/about/`);
-        if (!res.ok) throw new Error('Failed to fetch about');
-        const data = await res.json();
-        if (Array.isArray(data)) {
-            if (data[0]) data[0].image = ensureImageUrl(data[0].image);
-            return data[0];
-        }
+        const data = (await fetchHome()).about;
         if (data) data.image = ensureImageUrl(data.image);
         return data;
     },
 
     async getDirector(): Promise<any> {
-        const res = await fetch(`${API_URL}/director/`);
-        if (!res.ok) throw new Error('Failed to fetch director');
-        const data = await res.json();
-        if (Array.isArray(data)) {
-            if (data[0]) data[0].image = ensureImageUrl(data[0].image);
-            return data[0];
-        }
+        const data = (await fetchHome()).director;
         if (data) data.image = ensureImageUrl(data.image);
         return data;
     },
 
     async getHeader(): Promise<any> {
-        const res = await fetch(`${API_URL}/headers/`);
-        if (!res.ok) throw new Error('Failed to fetch header');
-        const data = await res.json();
-        if (Array.isArray(data)) {
-            if (data[0] && data[0].logo) data[0].logo = ensureImageUrl(data[0].logo);
-            return data[0];
-        }
+        const data = (await fetchHome()).header;
         if (data && data.logo) data.logo = ensureImageUrl(data.logo);
         return data;
     },
 
     async getContact(): Promise<any> {
-        const res = await fetch(`${API_URL}/contact/`);
-        if (!res.ok) throw new Error('Failed to fetch contact');
-        const data = await res.json();
-        return Array.isArray(data) ? data[0] : data;
+        return (await fetchHome()).contact;
     },
 
     async getFooter(): Promise<any> {
-        const res = await fetch(`${API_URL}/footers/`);
-        if (!res.ok) throw new Error('Failed to fetch footer');
-        const data = await res.json();
-        return Array.isArray(data) ? data[0] : data;
+        return (await fetchHome()).footer;
     },
 
     async getPages(): Promise<Page[]> {